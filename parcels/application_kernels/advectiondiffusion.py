@@ -6,7 +6,8 @@ import math
 import parcels.rng as ParcelsRandom
 
 
-__all__ = ['DiffusionUniformKh', 'AdvectionDiffusionM1', 'AdvectionDiffusionEM', ]
+__all__ = ['DiffusionUniformKh', 'AdvectionDiffusionM1', 'AdvectionDiffusionEM',
+           'AdvectionDiffusionM1_GradKh', 'AdvectionDiffusionEM_GradKh', ]
 
 
 def AdvectionDiffusionM1(particle, fieldset, time):
@@ -83,6 +84,69 @@ def AdvectionDiffusionEM(particle, fieldset, time):
     particle.lat += ay * particle.dt + by * dWy
 
 
+def AdvectionDiffusionM1_GradKh(particle, fieldset, time):
+    """Kernel for 2D advection-diffusion, solved using the Milstein scheme
+    at first order (M1), with precomputed diffusivity gradients.
+
+    This kernel is the same as :func:`AdvectionDiffusionM1`, but instead of
+    sampling `Kh_zonal` and `Kh_meridional` at a distance `fieldset.dres` around
+    the particle, it samples the gradient fields `dKh_zonal_dx` and
+    `dKh_meridional_dy`. These can be added via e.g.
+        fieldset.add_gradient_field('Kh_zonal', 'x')
+
+        fieldset.add_gradient_field('Kh_meridional', 'y')
+    and are computed on the grid of the diffusivity fields, once for every
+    snapshot that is loaded.
+
+    The Wiener increment `dW` is normally distributed with zero
+    mean and a standard deviation of sqrt(dt).
+    """
+    # Wiener increment with zero mean and std of sqrt(dt)
+    dWx = ParcelsRandom.normalvariate(0, math.sqrt(math.fabs(particle.dt)))
+    dWy = ParcelsRandom.normalvariate(0, math.sqrt(math.fabs(particle.dt)))
+
+    dKdx = fieldset.dKh_zonal_dx[time, particle.depth, particle.lat, particle.lon]
+    u = fieldset.U[time, particle.depth, particle.lat, particle.lon]
+    bx = math.sqrt(2 * fieldset.Kh_zonal[time, particle.depth, particle.lat, particle.lon])
+
+    dKdy = fieldset.dKh_meridional_dy[time, particle.depth, particle.lat, particle.lon]
+    v = fieldset.V[time, particle.depth, particle.lat, particle.lon]
+    by = math.sqrt(2 * fieldset.Kh_meridional[time, particle.depth, particle.lat, particle.lon])
+
+    # Particle positions are updated only after evaluating all terms.
+    particle.lon += u * particle.dt + 0.5 * dKdx * (dWx**2 + particle.dt) + bx * dWx
+    particle.lat += v * particle.dt + 0.5 * dKdy * (dWy**2 + particle.dt) + by * dWy
+
+
+def AdvectionDiffusionEM_GradKh(particle, fieldset, time):
+    """Kernel for 2D advection-diffusion, solved using the Euler-Maruyama
+    scheme (EM), with precomputed diffusivity gradients.
+
+    This kernel is the same as :func:`AdvectionDiffusionEM`, but samples the
+    gradient fields `dKh_zonal_dx` and `dKh_meridional_dy` (see
+    :func:`AdvectionDiffusionM1_GradKh`) instead of estimating the gradients
+    from samples of `Kh_zonal` and `Kh_meridional` around the particle.
+
+    The Wiener increment `dW` is normally distributed with zero
+    mean and a standard deviation of sqrt(dt).
+    """
+    # Wiener increment with zero mean and std of sqrt(dt)
+    dWx = ParcelsRandom.normalvariate(0, math.sqrt(math.fabs(particle.dt)))
+    dWy = ParcelsRandom.normalvariate(0, math.sqrt(math.fabs(particle.dt)))
+
+    dKdx = fieldset.dKh_zonal_dx[time, particle.depth, particle.lat, particle.lon]
+    ax = fieldset.U[time, particle.depth, particle.lat, particle.lon] + dKdx
+    bx = math.sqrt(2 * fieldset.Kh_zonal[time, particle.depth, particle.lat, particle.lon])
+
+    dKdy = fieldset.dKh_meridional_dy[time, particle.depth, particle.lat, particle.lon]
+    ay = fieldset.V[time, particle.depth, particle.lat, particle.lon] + dKdy
+    by = math.sqrt(2 * fieldset.Kh_meridional[time, particle.depth, particle.lat, particle.lon])
+
+    # Particle positions are updated only after evaluating all terms.
+    particle.lon += ax * particle.dt + bx * dWx
+    particle.lat += ay * particle.dt + by * dWy
+
+
 def DiffusionUniformKh(particle, fieldset, time):
     """Kernel for simple 2D diffusion where diffusivity (Kh) is assumed uniform.
 
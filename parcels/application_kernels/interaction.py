@@ -1,12 +1,15 @@
 """Collection of pre-built interaction kernels"""
 import numpy as np
 
-from parcels.tools.statuscodes import OperationCode, StateCode
+from parcels.tools.statuscodes import StateCode
 
 
 __all__ = ['AsymmetricAttraction', 'NearestNeighborWithinRange',
            'MergeWithNearestNeighbor']
 
+# Attraction velocity parameter of AsymmetricAttraction, shared with its C implementation
+attraction_velocity_param = 0.04
+
 
 def NearestNeighborWithinRange(particle, fieldset, time, neighbors, mutator):
     """Computes the nearest neighbor within range for each particle
@@ -28,9 +31,7 @@ def NearestNeighborWithinRange(particle, fieldset, time, neighbors, mutator):
             min_dist = dist
             neighbor_id = n.id
 
-    def f(p, neighbor):
-        p.nearest_neighbor = neighbor
-    mutator[particle.id].append((f, [neighbor_id]))
+    mutator.set(particle.id, 'nearest_neighbor', neighbor_id)
 
     return StateCode.Success
 
@@ -43,24 +44,13 @@ def MergeWithNearestNeighbor(particle, fieldset, time, neighbors, mutator):
     properties. Only pairs of particles that have each other as nearest
     neighbors will be merged.
     """
-    def delete_particle(p):
-        p.state = OperationCode.Delete
-
-    def merge_with_neighbor(p, nlat, nlon, ndepth, nmass):
-        p.lat = (p.mass * p.lat + nmass * nlat) / (p.mass + nmass)
-        p.lon = (p.mass * p.lon + nmass * nlon) / (p.mass + nmass)
-        p.depth = (p.mass * p.depth + nmass * ndepth) / (p.mass + nmass)
-        p.mass = p.mass + nmass
-
     for n in neighbors:
         if n.id == particle.nearest_neighbor:
             if n.nearest_neighbor == particle.id and particle.id < n.id:
-                # Merge particles:
-                # Delete neighbor
-                mutator[n.id].append((delete_particle, ()))
-                # Take position at the mid point and sum of masses
-                args = np.array([n.lat, n.lon, n.depth, n.mass])
-                mutator[particle.id].append((merge_with_neighbor, args))
+                # Merge particles: take the mass-weighted position and
+                # the sum of masses, and delete the neighbor.
+                mutator.merge(particle.id, n.id, weight='mass',
+                              variables=('lat', 'lon', 'depth'))
 
                 return StateCode.Success
             else:
@@ -85,7 +75,7 @@ def AsymmetricAttraction(particle, fieldset, time, neighbors, mutator):
             continue
         na_neighbors.append(n)
 
-    velocity_param = 0.04
+    velocity_param = attraction_velocity_param
     for n in na_neighbors:
         assert n.dt == particle.dt
         dx = np.array([particle.lat-n.lat, particle.lon-n.lon,
@@ -96,11 +86,8 @@ def AsymmetricAttraction(particle, fieldset, time, neighbors, mutator):
         distance = velocity*n.dt
         d_vec = distance*dx/dx_norm
 
-        def f(n, dlat, dlon, ddepth):
-            n.lat += dlat
-            n.lon += dlon
-            n.depth += ddepth
-
-        mutator[n.id].append((f, d_vec))
+        mutator.add(n.id, 'lat', d_vec[0])
+        mutator.add(n.id, 'lon', d_vec[1])
+        mutator.add(n.id, 'depth', d_vec[2])
 
     return StateCode.Success
@@ -1,8 +1,6 @@
 from datetime import timedelta as delta
 from operator import attrgetter
 from ctypes import Structure, POINTER
-from bisect import bisect_left
-from math import floor
 
 import numpy as np
 
@@ -173,14 +171,14 @@ class ParticleCollectionSOA(ParticleCollection):
                     continue
 
                 if isinstance(v.initial, Field):
-                    for i in range(self.ncount):
-                        if (time[i] is None) or (np.isnan(time[i])):
-                            raise RuntimeError('Cannot initialise a Variable with a Field if no time provided (time-type: {} values: {}). Add a "time=" to ParticleSet construction'.format(type(time), time))
-                        v.initial.fieldset.computeTimeChunk(time[i], 0)
-                        self._data[v.name][i] = v.initial[
-                            time[i], depth[i], lat[i], lon[i]
-                        ]
-                        logger.warning_once("Particle initialisation from field can be very slow as it is computed in scipy mode.")
+                    ptime = np.array(time, dtype=np.float64)
+                    if np.any(np.isnan(ptime)):
+                        raise RuntimeError('Cannot initialise a Variable with a Field if no time provided (time-type: {} values: {}). Add a "time=" to ParticleSet construction'.format(type(time), time))
+                    # load the FieldSet data once per release time, and sample all particles released then at once
+                    for t in np.unique(ptime):
+                        group = np.nonzero(ptime == t)[0]
+                        v.initial.fieldset.computeTimeChunk(t, 0)
+                        self._data[v.name][group] = v.initial.eval_vectorised(t, depth[group], lat[group], lon[group])
                 elif isinstance(v.initial, attrgetter):
                     self._data[v.name][:] = v.initial(self)
                 else:
@@ -191,6 +189,10 @@ class ParticleCollectionSOA(ParticleCollection):
             raise ValueError("Latitude and longitude required for generating ParticleSet")
         self._iterator = None
         self._riterator = None
+        self._buffer = None
+        self.clear_reserved()
+        self.invalidate_active_indices()
+        self.invalidate_ID_index()
 
     def __del__(self):
         """
@@ -278,20 +280,12 @@ class ParticleCollectionSOA(ParticleCollection):
         In cases where a get-by-ID would result in a performance malus, it is highly-advisable to use a different
         get function, e.g. get-by-index.
 
-        This function uses binary search if we know the ID list to be sorted, and linear search otherwise. We assume
-        IDs are unique.
+        This function looks up the ID in the maintained ID index (see :meth:`indices_by_IDs`). We assume IDs are
+        unique.
         """
         super().get_single_by_ID(id)
 
-        # Use binary search if the collection is sorted, linear search otherwise
-        index = -1
-        if self._sorted:
-            index = bisect_left(self._data['id'], id)
-            if index == len(self._data['id']) or self._data['id'][index] != id:
-                raise ValueError("Trying to access a particle with a non-existing ID: %s." % id)
-        else:
-            index = np.where(self._data['id'] == id)[0][0]
-
+        index = self._index_by_ID(id, "Trying to access a particle with a non-existing ID: %s.")
         return self.get_single_by_index(index)
 
     def get_same(self, same_class):
@@ -341,11 +335,9 @@ class ParticleCollectionSOA(ParticleCollection):
         strategy would require a collection transformation or by-ID parsing, it is advisable to rather apply a get-
         by-objects or get-by-indices scheme.
 
-        Note that this implementation assumes that IDs of particles are strictly increasing with increasing index. So
-        a particle with a larger index will always have a larger ID as well. The assumption often holds for this
-        datastructure as new particles always get a larger ID than any existing particle (IDs are not recycled)
-        and their data are appended at the end of the list (largest index). This allows for the use of binary search
-        in the look-up. The collection maintains a `sorted` flag to indicate whether this assumption holds.
+        The IDs are resolved in one vectorised look-up in the maintained ID index (see :meth:`indices_by_IDs`), so
+        no assumption is made on the order of the IDs in the collection. IDs that are not in the collection are
+        ignored.
         """
         super().get_multi_by_IDs(ids)
         if type(ids) is dict:
@@ -354,51 +346,72 @@ class ParticleCollectionSOA(ParticleCollection):
         if len(ids) == 0:
             return None
 
-        # Use binary search if the collection is sorted, linear search otherwise
-        indices = np.empty(len(ids), dtype=np.int32)
-        if self._sorted:
-            # This is efficient if len(ids) << self.len
-            sorted_ids = np.sort(np.array(ids))
-            indices = self._recursive_ID_lookup(0, len(self._data['id']), sorted_ids)
-        else:
-            indices = np.where(np.in1d(self._data['id'], ids))[0]
+        indices, found = self.indices_by_IDs(ids)
+        indices = np.sort(indices[found])
 
         return self.get_multi_by_indices(indices)
 
-    def _recursive_ID_lookup(self, low, high, sublist):
-        """Identify the middle element of the sublist and perform binary
-        search on it.
-
-        :param low: Lowerbound on the indices to search for IDs.
-        :param high: Upperbound on the indices to search for IDs.
-        :param sublist: (Sub)list of IDs to look for.
-        """
-        median = floor(len(sublist) / 2)
-        index = bisect_left(self._data['id'][low:high], sublist[median])
-        if len(sublist) == 1:
-            # edge case
-            if index == len(self._data['id']) or \
-               self._data['id'][index] != sublist[median]:
-                return np.array([])
-            return np.array([index])
-
-        # The edge-cases have to be handled slightly differently
-        if index == len(self._data['id']):
-            # Continue with the same bounds, but drop the median.
-            return self._recursive_ID_lookup(low, high, np.delete(sublist, median))
-        elif self._data['id'][index] != sublist[median]:
-            # We can split, because we received the index that the median
-            # ID would have been inserted in, but we do not return the
-            # index and keep it in our search space.
-            left = self._recursive_ID_lookup(low, index, sublist[:median])
-            right = self._recursive_ID_lookup(index, high, sublist[median + 1:])
-            return np.concatenate((left, right))
-
-        # Otherwise, we located the median, so we include it in our
-        # result, and split the search space on it, without including it.
-        left = self._recursive_ID_lookup(low, index, sublist[:median])
-        right = self._recursive_ID_lookup(index + 1, high, sublist[median + 1:])
-        return np.concatenate((left, np.array(index), right))
+    def invalidate_ID_index(self):
+        """Discard the ID index, so that it is rebuilt from all particles by the next look-up by ID.
+        This is required when the particle IDs are changed outside of this collection"""
+        self._sorted_ids = None
+        self._id_sorter = None
+
+    def _ID_index(self):
+        """The ID index of this collection: the sorted particle IDs and the indices of the particles
+        in that order, built on first use and maintained incrementally afterwards"""
+        if self._sorted_ids is None:
+            ids = self._data['id']
+            self._id_sorter = np.argsort(ids, kind='stable').astype(np.int64)
+            self._sorted_ids = ids[self._id_sorter]
+        return self._sorted_ids, self._id_sorter
+
+    def _add_to_ID_index(self, ids, offset, shift=0):
+        """Merge the particles with IDs `ids`, stored from index `offset` on, into the ID index,
+        after moving the indices of the particles that are already indexed by `shift`"""
+        if self._sorted_ids is None:
+            return
+        order = np.argsort(ids, kind='stable')
+        new_ids = ids[order]
+        pos = np.searchsorted(self._sorted_ids, new_ids, side='right')
+        self._sorted_ids = np.insert(self._sorted_ids, pos, new_ids)
+        self._id_sorter = np.insert(self._id_sorter + shift, pos, order + offset)
+
+    def _remove_from_ID_index(self, indices):
+        """Remap the ID index for the removal of the particles at `indices`,
+        which has to be called before they are removed"""
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if self._sorted_ids is None or len(indices) == 0:
+            return
+        removed = np.zeros(self._ncount, dtype=bool)
+        removed[indices] = True
+        shift = np.cumsum(removed)
+        keep = ~removed[self._id_sorter]
+        self._id_sorter = self._id_sorter[keep]
+        self._id_sorter -= shift[self._id_sorter]
+        self._sorted_ids = self._sorted_ids[keep]
+
+    def indices_by_IDs(self, ids):
+        """Resolve particle IDs to the indices of the particles in this collection, with a binary search
+        in the maintained ID index (O(log N) per ID, regardless of the order of the IDs in the collection).
+
+        :param ids: ID or array-like of IDs to look up
+        :return: tuple (indices, found) of arrays with the shape of `ids`, where `found` flags the IDs
+                 that are in the collection; the `indices` of the other IDs are meaningless
+        """
+        sorted_ids, sorter = self._ID_index()
+        ids = np.asarray(ids, dtype=sorted_ids.dtype)
+        if len(sorted_ids) == 0:
+            return np.zeros(ids.shape, dtype=np.int64), np.zeros(ids.shape, dtype=bool)
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids)-1)
+        return sorter[pos], sorted_ids[pos] == ids
+
+    def _index_by_ID(self, id, message):
+        """Index of the particle with ID `id`; raises a ValueError with `message` if it is not in the collection"""
+        index, found = self.indices_by_IDs(id)
+        if not found:
+            raise ValueError(message % id)
+        return int(index)
 
     def add_collection(self, pcollection):
         """
@@ -430,22 +443,179 @@ class ParticleCollectionSOA(ParticleCollection):
         if self._ncount == 0:
             self._data = same_class._data
             self._ncount = same_class.ncount
+            self._sorted = same_class._sorted
+            self.invalidate_active_indices()
+            self.invalidate_ID_index()
             return
 
         # Determine order of concatenation and update the sorted flag
         if self._sorted and same_class._sorted \
            and self._data['id'][0] > same_class._data['id'][-1]:
+            self._add_to_ID_index(same_class._data['id'], 0, shift=same_class.ncount)
             for d in self._data:
                 self._data[d] = np.concatenate((same_class._data[d], self._data[d]))
             self._ncount += same_class.ncount
+            self.invalidate_active_indices()
         else:
             if not (same_class._sorted
                     and self._data['id'][-1] < same_class._data['id'][0]):
                 self._sorted = False
+            self._add_to_ID_index(same_class._data['id'], self._ncount)
             for d in self._data:
                 self._data[d] = np.concatenate((self._data[d], same_class._data[d]))
             self._ncount += same_class.ncount
 
+    def replace_data(self, data):
+        """
+        Replaces all particles of this collection by the particle data in `data`, a dictionary holding an
+        array per Variable as this collection stores them internally. This is used to gather particles that
+        have been advanced outside of this collection, e.g. by worker processes.
+        """
+        self._data = data
+        self._ncount = len(data['id'])
+        self._sorted = np.all(np.diff(data['id']) >= 0)
+        self._iterator = None
+        self._riterator = None
+        self.clear_reserved()
+        self.invalidate_active_indices()
+        self.invalidate_ID_index()
+
+    @property
+    def nreserved(self):
+        """Number of reserved particles, see :meth:`reserve`"""
+        return 0 if self._reserved is None else len(self._reserved['id']) - self._reserved_start
+
+    def reserve(self, same_class):
+        """
+        Reserves the particles of another, equi-structured ParticleCollection in this collection, after the particles
+        that are already reserved. Reserved particles are not part of the collection (they are not counted, iterated
+        or returned by the getters) until they are added by :meth:`activate_reserved`.
+
+        The reserved particles are stored behind the particles of this collection in the same arrays, of which the
+        collection holds views of the leading part. Activating reserved particles then only extends these views,
+        as long as the particles of this collection have not been replaced (e.g. by an addition or removal) since.
+        """
+        reserved = {d: self._reserved[d][self._reserved_start:] for d in self._data} if self._reserved is not None else None
+        self._buffer = {}
+        for d in self._data:
+            parts = [self._data[d]] + ([reserved[d]] if reserved is not None else []) + [same_class._data[d]]
+            self._buffer[d] = np.concatenate(parts)
+            self._data[d] = self._buffer[d][:self._ncount]
+        self._reserved = dict(self._buffer)
+        self._reserved_start = self._ncount
+
+    def activate_reserved(self, n):
+        """
+        Adds the next `n` reserved particles (see :meth:`reserve`) to this collection.
+
+        The particles are appended by extending the views on the arrays in which they are reserved or, if the
+        particles of this collection are no longer stored in these arrays, by copying them into the free capacity
+        of the arrays of this collection, which is doubled when it runs out. The cost is thereby independent of the
+        number of particles that remain reserved.
+        """
+        n = min(n, self.nreserved)
+        if n <= 0:
+            return
+        start = self._reserved_start
+        end = self._ncount + n
+        if self._buffer is None:
+            self._buffer = {}
+        for d in self._data:
+            buffer = self._buffer.get(d)
+            attached = buffer is not None and self._data[d].base is buffer
+            if not (attached and buffer is self._reserved[d] and start == self._ncount):
+                if not attached or len(buffer) < end:
+                    buffer = np.empty((2 * end,) + self._data[d].shape[1:], dtype=self._data[d].dtype)
+                    buffer[:self._ncount] = self._data[d]
+                    self._buffer[d] = buffer
+                buffer[self._ncount:end] = self._reserved[d][start:start + n]
+            self._data[d] = buffer[:end]
+
+        self._sorted = self._sorted and np.all(np.diff(self._data['id'][max(self._ncount - 1, 0):]) >= 0)
+        self._add_to_ID_index(self._data['id'][self._ncount:], self._ncount)
+        self._ncount = end
+        self._reserved_start += n
+        if self.nreserved == 0:
+            self.clear_reserved()
+
+    def clear_reserved(self):
+        """Discards all reserved particles (see :meth:`reserve`)"""
+        self._reserved = None
+        self._reserved_start = 0
+
+    def invalidate_active_indices(self):
+        """Discard the active-index array, so that it is rebuilt from all particles by the next
+        call of :meth:`active_indices`. This is required when the particle times are changed
+        outside of the kernels, e.g. at the start of each ParticleSet.execute()"""
+        self._active_idx = None
+        self._active_sign = None
+        self._pending_idx = None
+        self._pending_time = None
+        self._unclassified = 0
+
+    def active_indices(self, endtime, dt):
+        """Sorted indices of the particles that the kernel loop to `endtime` with time step `dt`
+        has to visit: all particles that have started, leaving out the particles whose time is at
+        or beyond `endtime` (e.g. that are released later).
+
+        The array is maintained incrementally: particles that have not started yet are kept
+        sorted by time, and move to the active indices once `endtime` passes their time; added
+        particles are classified once; the indices are remapped when particles are removed.
+
+        :param endtime: End time of the kernel loop
+        :param dt: Time step of the kernel loop
+        :return: array of indices (int32), or None if all particles have to be visited (dt is zero)
+        """
+        if dt == 0:
+            return None
+        sign = 1 if dt > 0 else -1
+        if self._active_idx is None or self._active_sign != sign:
+            self.invalidate_active_indices()
+            self._active_sign = sign
+            self._active_idx = np.zeros(0, dtype=np.int32)
+            self._pending_idx = np.zeros(0, dtype=np.int32)
+            self._pending_time = np.zeros(0, dtype=np.float64)
+
+        if self._unclassified < self._ncount:
+            new = np.arange(self._unclassified, self._ncount, dtype=np.int32)
+            ptime = sign * self._data['time'][new].astype(np.float64)
+            # Particles with a zero dt are evaluated by the kernel loop regardless of their time
+            waiting = (ptime >= sign * endtime) & (self._data['dt'][new] != 0)
+            self._active_idx = np.concatenate((self._active_idx, new[~waiting]))
+            pending_idx = np.concatenate((self._pending_idx, new[waiting]))
+            pending_time = np.concatenate((self._pending_time, ptime[waiting]))
+            order = np.argsort(pending_time, kind='stable')
+            self._pending_idx = pending_idx[order]
+            self._pending_time = pending_time[order]
+            self._unclassified = self._ncount
+
+        nstarted = np.searchsorted(self._pending_time, sign * endtime, side='left')
+        if nstarted > 0:
+            started = np.sort(self._pending_idx[:nstarted])
+            self._active_idx = np.insert(self._active_idx, np.searchsorted(self._active_idx, started), started)
+            self._pending_idx = self._pending_idx[nstarted:]
+            self._pending_time = self._pending_time[nstarted:]
+        return self._active_idx
+
+    def _remove_active_indices(self, indices):
+        """Remap the active-index array for the removal of the particles at `indices`,
+        which has to be called before they are removed"""
+        indices = np.asarray(indices).reshape(-1)
+        if self._active_idx is None or len(indices) == 0:
+            return
+        removed = np.zeros(self._ncount, dtype=bool)
+        removed[indices] = True
+        shift = np.cumsum(removed)
+
+        def remap(idx):
+            keep = ~removed[idx]
+            return (idx[keep] - shift[idx[keep]]).astype(np.int32), keep
+
+        self._active_idx, _ = remap(self._active_idx)
+        self._pending_idx, keep = remap(self._pending_idx)
+        self._pending_time = self._pending_time[keep]
+        self._unclassified -= np.count_nonzero(removed[:self._unclassified])
+
     def __iadd__(self, same_class):
         """
         Performs an incremental addition of the equi-structured ParticleCollections, such to allow
@@ -533,16 +703,7 @@ class ParticleCollectionSOA(ParticleCollection):
         """
         super().delete_by_ID(id)
 
-        # Use binary search if the collection is sorted, linear search otherwise
-        index = -1
-        if self._sorted:
-            index = bisect_left(self._data['id'], id)
-            if index == len(self._data['id']) or \
-               self._data['id'][index] != id:
-                raise ValueError("Trying to delete a particle with a non-existing ID: %s." % id)
-        else:
-            index = np.where(self._data['id'] == id)[0][0]
-
+        index = self._index_by_ID(id, "Trying to delete a particle with a non-existing ID: %s.")
         self.delete_by_index(index)
 
     def remove_single_by_index(self, index):
@@ -556,6 +717,8 @@ class ParticleCollectionSOA(ParticleCollection):
         removal functions, e.g. remove-by-object or remove-by-ID.
         """
         super().remove_single_by_index(index)
+        self._remove_active_indices([index])
+        self._remove_from_ID_index([index])
 
         for d in self._data:
             self._data[d] = np.delete(self._data[d], index, axis=0)
@@ -589,16 +752,7 @@ class ParticleCollectionSOA(ParticleCollection):
         """
         super().remove_single_by_ID(id)
 
-        # Use binary search if the collection is sorted, linear search otherwise
-        index = -1
-        if self._sorted:
-            index = bisect_left(self._data['id'], id)
-            if index == len(self._data['id']) or \
-               self._data['id'][index] != id:
-                raise ValueError("Trying to remove a particle with a non-existing ID: %s." % id)
-        else:
-            index = np.where(self._data['id'] == id)[0][0]
-
+        index = self._index_by_ID(id, "Trying to remove a particle with a non-existing ID: %s.")
         self.remove_single_by_index(index)
 
     def remove_same(self, same_class):
@@ -645,6 +799,8 @@ class ParticleCollectionSOA(ParticleCollection):
         if type(indices) is dict:
             indices = list(indices.values())
 
+        self._remove_active_indices(indices)
+        self._remove_from_ID_index(indices)
         for d in self._data:
             self._data[d] = np.delete(self._data[d], indices, axis=0)
 
@@ -663,14 +819,8 @@ class ParticleCollectionSOA(ParticleCollection):
         if len(ids) == 0:
             return
 
-        # Use binary search if the collection is sorted, linear search otherwise
-        indices = np.empty(len(ids), dtype=np.int32)
-        if self._sorted:
-            # This is efficient if len(ids) << self.len
-            sorted_ids = np.sort(np.array(ids))
-            indices = self._recursive_ID_lookup(0, len(self._data['id']), sorted_ids)
-        else:
-            indices = np.where(np.in1d(self._data['id'], ids))[0]
+        indices, found = self.indices_by_IDs(ids)
+        indices = np.sort(indices[found])
 
         self.remove_multi_by_indices(indices)
 
@@ -1,2 +1,3 @@
 from .codegenerator import *  # noqa
 from .codecompiler import *  # noqa
+from .prebuilt import *  # noqa
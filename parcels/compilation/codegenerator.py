@@ -488,6 +488,23 @@ class AbstractKernelGenerator(ABC, ast.NodeVisitor):
     def _check_FieldSamplingArguments(ccode):
         return None
 
+    @staticmethod
+    def _nested_field_sampling(fields, field_stmts, args):
+        """Combines the sampling statements of the Fields of a NestedField. The Fields are tried
+        in order, but a Field (other than the last) is skipped without searching its grid if
+        the location lies outside of the bounding box of its grid."""
+        _, _, y, x = args
+        check_break = c.If("err != ERROR_OUT_OF_BOUNDS ", c.Block([c.Statement("CHECKSTATUS(err)"), c.Statement("break")]))
+        cstat = []
+        for i, (fld, stmts) in enumerate(zip(fields, field_stmts)):
+            stmts = stmts + [check_break]
+            if i < len(fields) - 1:
+                grid_field = fld.U if isinstance(fld, VectorField) else fld
+                stmts = [c.If("!outside_bounding_box(%s, %s, %s)" % (x, y, grid_field.ccode_name), c.Block(stmts))]
+            cstat += stmts
+        cstat += [c.Statement("CHECKSTATUS(err)"), c.Statement("break")]
+        return c.While("1==1", c.Block(cstat))
+
     @abstractmethod
     def visit_FunctionDef(self, node):
         pass
@@ -961,11 +978,8 @@ class ArrayKernelGenerator(AbstractKernelGenerator):
             ccode_eval = fld.ccode_eval_array(node.var, *args)
             ccode_conv = fld.ccode_convert(*args)
             conv_stat = c.Statement("%s *= %s" % (node.var, ccode_conv))
-            cstat += [c.Assign("err", ccode_eval),
-                      conv_stat,
-                      c.If("err != ERROR_OUT_OF_BOUNDS ", c.Block([c.Statement("CHECKSTATUS(err)"), c.Statement("break")]))]
-        cstat += [c.Statement("CHECKSTATUS(err)"), c.Statement("break")]
-        node.ccode = c.While("1==1", c.Block(cstat))
+            cstat.append([c.Assign("err", ccode_eval), conv_stat])
+        node.ccode = self._nested_field_sampling(node.fields.obj, cstat, args)
 
     def visit_NestedVectorFieldEvalNode(self, node):
         self.visit(node.fields)
@@ -985,11 +999,8 @@ class ArrayKernelGenerator(AbstractKernelGenerator):
             if fld.vector_type == '3D':
                 ccode_conv3 = fld.W.ccode_convert(*args)
                 statements.append(c.Statement("%s *= %s" % (node.var3, ccode_conv3)))
-            cstat += [c.Assign("err", ccode_eval),
-                      c.Block(statements),
-                      c.If("err != ERROR_OUT_OF_BOUNDS ", c.Block([c.Statement("CHECKSTATUS(err)"), c.Statement("break")]))]
-        cstat += [c.Statement("CHECKSTATUS(err)"), c.Statement("break")]
-        node.ccode = c.While("1==1", c.Block(cstat))
+            cstat.append([c.Assign("err", ccode_eval), c.Block(statements)])
+        node.ccode = self._nested_field_sampling(node.fields.obj, cstat, args)
 
 
 class ObjectKernelGenerator(AbstractKernelGenerator):
@@ -1111,11 +1122,8 @@ class ObjectKernelGenerator(AbstractKernelGenerator):
             ccode_eval = fld.ccode_eval_object(node.var, *args)
             ccode_conv = fld.ccode_convert(*args)
             conv_stat = c.Statement("%s *= %s" % (node.var, ccode_conv))
-            cstat += [c.Assign("err", ccode_eval),
-                      conv_stat,
-                      c.If("err != ERROR_OUT_OF_BOUNDS ", c.Block([c.Statement("CHECKSTATUS(err)"), c.Statement("break")]))]
-        cstat += [c.Statement("CHECKSTATUS(err)"), c.Statement("break")]
-        node.ccode = c.While("1==1", c.Block(cstat))
+            cstat.append([c.Assign("err", ccode_eval), conv_stat])
+        node.ccode = self._nested_field_sampling(node.fields.obj, cstat, args)
 
     def visit_NestedVectorFieldEvalNode(self, node):
         self.visit(node.fields)
@@ -1134,11 +1142,8 @@ class ObjectKernelGenerator(AbstractKernelGenerator):
             if fld.vector_type == '3D':
                 ccode_conv3 = fld.W.ccode_convert(*args)
                 statements.append(c.Statement("%s *= %s" % (node.var3, ccode_conv3)))
-            cstat += [c.Assign("err", ccode_eval),
-                      c.Block(statements),
-                      c.If("err != ERROR_OUT_OF_BOUNDS ", c.Block([c.Statement("CHECKSTATUS(err)"), c.Statement("break")]))]
-        cstat += [c.Statement("CHECKSTATUS(err)"), c.Statement("break")]
-        node.ccode = c.While("1==1", c.Block(cstat))
+            cstat.append([c.Assign("err", ccode_eval), c.Block(statements)])
+        node.ccode = self._nested_field_sampling(node.fields.obj, cstat, args)
 
 
 class LoopGenerator(object):
@@ -1211,7 +1216,8 @@ class LoopGenerator(object):
         ccode += [str(kernel_ast)]
 
         # Generate outer loop for repeated kernel invocation
-        args = [c.Value("int", "num_particles"),
+        # The loop visits the particles in active_indices, or all particles if it is NULL
+        args = [c.Value("int", "num_particles"), c.Pointer(c.Value("int", "active_indices")),
                 c.Pointer(c.Value(pname, "particles")),
                 c.Value("double", "endtime"), c.Value("double", "dt")]
         for field, _ in field_args.items():
@@ -1276,14 +1282,15 @@ class LoopGenerator(object):
                       )]
 
         time_loop = c.While("(particles->state[pnum] == EVALUATE || particles->state[pnum] == REPEAT) || is_zero_dbl(particles->dt[pnum])", c.Block(body))
-        part_loop = c.For("pnum = 0", "pnum < num_particles", "++pnum",
-                          c.Block([sign_end_part, reset_res_state, dt_pos, notstarted_continue, time_loop]))
-        fbody = c.Block([c.Value("int", "pnum, sign_dt, sign_end_part"),
+        active_pnum = c.Assign("pnum", "active_indices == NULL ? i : active_indices[i]")
+        part_loop = c.For("i = 0", "i < num_particles", "++i",
+                          c.Block([active_pnum, sign_end_part, reset_res_state, dt_pos, notstarted_continue, time_loop]))
+        fbody = c.Block([c.Value("int", "i, pnum, sign_dt, sign_end_part"),
                          c.Value("StatusCode", "res"),
                          c.Value("double", "reset_dt"),
                          c.Value("double", "__pdt_prekernels"),
                          c.Value("double", "__dt"),  # 1e-8 = built-in tolerance for np.isclose()
-                         sign_dt, particle_backup, part_loop])
+                         sign_dt, particle_backup, c.Statement("reset_search_cache()"), part_loop])
         fdecl = c.FunctionDeclaration(c.Value("void", "particle_loop"), args)
         ccode += [str(c.FunctionBody(fdecl, fbody))]
         return "\n\n".join(ccode)
@@ -1432,7 +1439,7 @@ class ParticleObjectLoopGenerator(object):
                          c.Value("int", "reset_dt"),
                          c.Value("double", "__pdt_prekernels"),
                          c.Value("double", "__dt"),  # 1e-8 = built-in tolerance for np.isclose()
-                         sign_dt, particle_backup, part_loop])
+                         sign_dt, particle_backup, c.Statement("reset_search_cache()"), part_loop])
         fdecl = c.FunctionDeclaration(c.Value("void", "particle_loop"), args)
         ccode += [str(c.FunctionBody(fdecl, fbody))]
         return "\n\n".join(ccode)
@@ -0,0 +1,132 @@
+"""Prebuilt shared libraries of the stock kernels
+
+The generated C code of a kernel only depends on the kernel function, the particle
+class, the coordinate precision and the names and units of the Fields it samples,
+not on the size of the FieldSet. The libraries of the stock kernels for the standard
+JITParticle can therefore be built once (e.g. at install time, or with
+`parcels_build_kernels` on a machine with a compiler) and looked up by a hash of the
+generated C code and the compiler flags, instead of calling the compiler for every run.
+"""
+import os
+from functools import lru_cache
+from glob import glob
+from hashlib import md5
+from sys import platform
+from tempfile import TemporaryDirectory
+
+from parcels.tools.global_statics import get_package_dir
+from parcels.tools.loggers import logger
+
+__all__ = ['get_prebuilt_dir', 'prebuilt_library', 'build_prebuilt_kernels']
+
+
+def get_prebuilt_dir():
+    """Directory of the prebuilt kernel libraries, which can be changed with the
+    environment variable PARCELS_PREBUILT_DIR (an empty value disables them)"""
+    directory = os.getenv('PARCELS_PREBUILT_DIR')
+    if directory is None:
+        directory = os.path.join(get_package_dir(), 'prebuilt')
+    return directory if len(directory) > 0 else None
+
+
+@lru_cache(maxsize=1)
+def _include_hash():
+    """Hash of the Parcels C header files, which are included in all kernels"""
+    key = md5()
+    for header in sorted(glob(os.path.join(get_package_dir(), 'include', '*.h'))):
+        with open(header, 'rb') as f:
+            key.update(f.read())
+    return key.hexdigest()
+
+
+def prebuilt_key(ccode, compiler):
+    """Key of the library of C code `ccode` compiled with `compiler`
+
+    The include directories are not part of the key, as these depend on where
+    Parcels is installed; the content of the Parcels headers is used instead.
+    """
+    flags = [arg for arg in compiler._cppargs + compiler._ldargs if not arg.startswith('-I')]
+    key = "\n".join([ccode, str(compiler._cc)] + flags + [_include_hash()])
+    return md5(key.encode('utf-8')).hexdigest()
+
+
+def _library_path(directory, ccode, compiler):
+    return os.path.join(directory, "lib%s.%s" % (prebuilt_key(ccode, compiler), 'dll' if platform == 'win32' else 'so'))
+
+
+def prebuilt_library(ccode, compiler):
+    """Returns the path of the prebuilt library of C code `ccode` compiled
+    with `compiler`, or None if it has not been built"""
+    directory = get_prebuilt_dir()
+    if directory is None:
+        return None
+    lib_file = _library_path(directory, ccode, compiler)
+    return lib_file if os.path.isfile(lib_file) else None
+
+
+def _stock_fieldsets(mesh):
+    """FieldSets with the Fields that the stock kernels sample, by name"""
+    import numpy as np
+    from parcels.fieldset import FieldSet
+
+    lon = np.linspace(0., 1., 2, dtype=np.float32)
+    lat = np.linspace(0., 1., 2, dtype=np.float32)
+    depth = np.linspace(0., 1., 2, dtype=np.float32)
+    zeros2d = np.zeros((2, 2), dtype=np.float32)
+    zeros3d = np.zeros((2, 2, 2), dtype=np.float32)
+
+    fieldsets = {}
+    fieldsets['UV'] = FieldSet.from_data({'U': zeros2d, 'V': zeros2d}, {'lon': lon, 'lat': lat}, mesh=mesh)
+    fieldsets['UVW'] = FieldSet.from_data({'U': zeros3d, 'V': zeros3d, 'W': zeros3d},
+                                          {'lon': lon, 'lat': lat, 'depth': depth}, mesh=mesh)
+    fieldsets['UVKh'] = FieldSet.from_data({'U': zeros2d, 'V': zeros2d}, {'lon': lon, 'lat': lat}, mesh=mesh)
+    fieldsets['UVKh'].add_constant_field('Kh_zonal', 1., mesh=mesh)
+    fieldsets['UVKh'].add_constant_field('Kh_meridional', 1., mesh=mesh)
+    return fieldsets
+
+
+def build_prebuilt_kernels(directory=None, kernels=None, meshes=('spherical', 'flat')):
+    """Builds the libraries of the stock kernels for the standard ParticleSet and JITParticle, with
+    float32 and float64 coordinates, on flat and spherical meshes
+
+    :param directory: directory to store the libraries in (default: :func:`get_prebuilt_dir`)
+    :param kernels: list of the stock kernel functions to build (default: all)
+    :param meshes: meshes to build the kernels for
+    :returns: list of the paths of the libraries
+    """
+    import numpy as np
+    from parcels.application_kernels.advection import AdvectionEE
+    from parcels.application_kernels.advection import AdvectionRK4
+    from parcels.application_kernels.advection import AdvectionRK45
+    from parcels.application_kernels.advection import AdvectionRK4_3D
+    from parcels.application_kernels.advectiondiffusion import DiffusionUniformKh
+    from parcels.particle import JITParticle
+    from parcels.particleset import ParticleSet
+
+    stock_kernels = [(AdvectionRK4, 'UV'), (AdvectionEE, 'UV'), (AdvectionRK45, 'UV'),
+                     (AdvectionRK4, 'UVW'), (AdvectionRK4_3D, 'UVW'), (DiffusionUniformKh, 'UVKh')]
+
+    if kernels is not None:
+        stock_kernels = [(pyfunc, fieldset_name) for pyfunc, fieldset_name in stock_kernels if pyfunc in kernels]
+
+    directory = get_prebuilt_dir() if directory is None else directory
+    os.makedirs(directory, exist_ok=True)
+    lib_files = []
+    with TemporaryDirectory() as tmp_dir:
+        for mesh in meshes:
+            fieldsets = _stock_fieldsets(mesh)
+            for pyfunc, fieldset_name in stock_kernels:
+                for lonlatdepth_dtype in [np.float32, np.float64]:
+                    pset = ParticleSet(fieldsets[fieldset_name], pclass=JITParticle, lon=[0.5], lat=[0.5],
+                                       lonlatdepth_dtype=lonlatdepth_dtype)
+                    kernel = pset.Kernel(pyfunc)
+                    compiler = pset._jit_compiler()
+                    lib_file = _library_path(directory, kernel.ccode, compiler)
+                    if not os.path.isfile(lib_file):
+                        basename = os.path.join(tmp_dir, os.path.splitext(os.path.basename(lib_file))[0])
+                        with open(basename + '.c', 'w') as f:
+                            f.write(kernel.ccode)
+                        compiler.compile(basename + '.c', lib_file, basename + '.log')
+                        logger.info("Prebuilt %s (%s mesh, %s) ==> %s" % (kernel.name, mesh, np.dtype(lonlatdepth_dtype).name, lib_file))
+                    lib_files.append(lib_file)
+    return lib_files
@@ -18,8 +18,6 @@ from .fieldfilebuffer import (NetcdfFileBuffer, DeferredNetcdfFileBuffer,
 from .grid import CGrid
 from .grid import Grid
 from .grid import GridCode
-from parcels.tools.converters import Geographic
-from parcels.tools.converters import GeographicPolar
 from parcels.tools.converters import TimeConverter
 from parcels.tools.converters import UnitConverter
 from parcels.tools.converters import unitconverters_map
@@ -40,6 +38,36 @@ def _isParticle(key):
         return False
 
 
+def _masked_difference(data, coord, axis, land):
+    """Derivative of data with respect to coord along axis, with central differences where
+    both neighbours are wet, one-sided differences where only one of them is, and zero on land"""
+    coord = np.moveaxis(np.broadcast_to(coord, data.shape), axis, 0)
+    data = np.moveaxis(data, axis, 0)
+    wet = ~np.moveaxis(land, axis, 0)
+    wet_p = np.zeros_like(wet)
+    wet_p[:-1] = wet[1:]
+    wet_m = np.zeros_like(wet)
+    wet_m[1:] = wet[:-1]
+    f_p, f_m = np.roll(data, -1, axis=0), np.roll(data, 1, axis=0)
+    c_p, c_m = np.roll(coord, -1, axis=0), np.roll(coord, 1, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grad = np.where(wet_p & wet_m, (f_p - f_m) / (c_p - c_m),
+                        np.where(wet_p, (f_p - data) / (c_p - coord),
+                                 np.where(wet_m, (data - f_m) / (coord - c_m), 0.)))
+    grad[~wet] = 0.
+    return np.moveaxis(grad, 0, axis)
+
+
+# Ctypes struct corresponding to the type definition in parcels.h
+class CField(Structure):
+    _fields_ = [('xdim', c_int), ('ydim', c_int), ('zdim', c_int),
+                ('tdim', c_int), ('igrid', c_int),
+                ('allow_time_extrapolation', c_int),
+                ('time_periodic', c_int),
+                ('data_chunks', POINTER(POINTER(POINTER(c_float)))),
+                ('grid', POINTER(CGrid))]
+
+
 class Field(object):
     """Class that encapsulates access to field data.
 
@@ -91,6 +119,17 @@ class Field(object):
 
     * `Summed Fields <https://nbviewer.jupyter.org/github/OceanParcels/parcels/blob/master/parcels/examples/tutorial_SummedFields.ipynb>`_
     """
+    # Attributes that are (pointed to) in the C struct of the Field
+    _cstruct_attrs = frozenset(['grid', 'igrid', 'allow_time_extrapolation', 'time_periodic', 'data_chunks', 'c_data_chunks'])
+    _cstruct = None
+    _cstruct_dirty = True
+    _cstruct_grid_version = None
+
+    def __setattr__(self, name, value):
+        if name in Field._cstruct_attrs:
+            self.__dict__['_cstruct_dirty'] = True
+        super().__setattr__(name, value)
+
     def __init__(self, name, data, lon=None, lat=None, depth=None, time=None, grid=None, mesh='flat', timestamps=None,
                  fieldtype=None, transpose=False, vmin=None, vmax=None, cast_data_dtype='float32', time_origin=None,
                  interp_method='linear', allow_time_extrapolation=None, time_periodic=False, gridindexingtype='nemo',
@@ -210,6 +249,8 @@ class Field(object):
         self.nchunks = []
         self.chunk_set = False
         self.filebuffers = [None] * 2
+        self.shared_memory = None
+        self._shared_key = None
         if len(kwargs) > 0:
             raise SyntaxError('Field received an unexpected keyword argument "%s"' % list(kwargs.keys())[0])
 
@@ -574,32 +615,68 @@ class Field(object):
 
     def calc_cell_edge_sizes(self):
         """Method to calculate cell sizes based on numpy.gradient method
-                Currently only works for Rectilinear Grids"""
+
+        On spherical meshes, the distances in degrees are converted to metres with the
+        :meth:`parcels.grid.Grid.metric_factors` of the Grid. For curvilinear grids, the
+        cell edges are the distances to the neighbouring nodes along the grid axes."""
         if not self.grid.cell_edge_sizes:
-            if self.grid.gtype in (GridCode.RectilinearZGrid, GridCode.RectilinearSGrid):
-                self.grid.cell_edge_sizes['x'] = np.zeros((self.grid.ydim, self.grid.xdim), dtype=np.float32)
-                self.grid.cell_edge_sizes['y'] = np.zeros((self.grid.ydim, self.grid.xdim), dtype=np.float32)
-
-                x_conv = GeographicPolar() if self.grid.mesh == 'spherical' else UnitConverter()
-                y_conv = Geographic() if self.grid.mesh == 'spherical' else UnitConverter()
-                for y, (lat, dy) in enumerate(zip(self.grid.lat, np.gradient(self.grid.lat))):
-                    for x, (lon, dx) in enumerate(zip(self.grid.lon, np.gradient(self.grid.lon))):
-                        self.grid.cell_edge_sizes['x'][y, x] = x_conv.to_source(dx, lon, lat, self.grid.depth[0])
-                        self.grid.cell_edge_sizes['y'][y, x] = y_conv.to_source(dy, lon, lat, self.grid.depth[0])
-                self.cell_edge_sizes = self.grid.cell_edge_sizes
+            grid = self.grid
+            x_factor, y_factor = grid.metric_factors()
+            if grid.gtype in (GridCode.RectilinearZGrid, GridCode.RectilinearSGrid):
+                dx = np.gradient(grid.lon).reshape(1, -1) * x_factor
+                dy = np.gradient(grid.lat).reshape(-1, 1) * y_factor
             else:
-                logger.error(('Field.cell_edge_sizes() not implemented for ', self.grid.gtype, 'grids.',
-                              'You can provide Field.grid.cell_edge_sizes yourself',
-                              'by in e.g. NEMO using the e1u fields etc from the mesh_mask.nc file'))
-                exit(-1)
+                (dlon_y, dlon_x), (dlat_y, dlat_x) = np.gradient(grid.lon), np.gradient(grid.lat)
+                if grid.mesh == 'spherical':
+                    dlon_x = (dlon_x + 180) % 360 - 180
+                    dlon_y = (dlon_y + 180) % 360 - 180
+                dx = np.hypot(dlon_x * x_factor, dlat_x * y_factor)
+                dy = np.hypot(dlon_y * x_factor, dlat_y * y_factor)
+            shape = (grid.ydim, grid.xdim)
+            grid.cell_edge_sizes['x'] = np.broadcast_to(dx, shape).astype(np.float32)
+            grid.cell_edge_sizes['y'] = np.broadcast_to(dy, shape).astype(np.float32)
+            self.cell_edge_sizes = grid.cell_edge_sizes
 
     def cell_areas(self):
-        """Method to calculate cell sizes based on cell_edge_sizes
-                Currently only works for Rectilinear Grids"""
+        """Method to calculate cell sizes based on cell_edge_sizes"""
         if not self.grid.cell_edge_sizes:
             self.calc_cell_edge_sizes()
         return self.grid.cell_edge_sizes['x'] * self.grid.cell_edge_sizes['y']
 
+    def central_difference(self, direction, data=None, landmask=None):
+        """Method to calculate the derivative of the data of this Field with respect to
+        longitude ('x') or latitude ('y') on its grid (or to x and y in metres on a flat mesh)
+
+        Central differences are used in the interior, one-sided differences at the edges of the
+        domain and next to land, and the derivative is zero on land. For curvilinear grids, the
+        derivatives along the grid axes are converted with the Jacobian of the grid coordinates.
+
+        :param direction: direction of the derivative, either 'x' or 'y'
+        :param data: data to differentiate, with the grid in its last two dimensions (default: Field.data)
+        :param landmask: boolean array that is True on land, broadcastable to data
+               (default: where data is zero, as NaNs in the Field data are set to zero)
+        """
+        if direction not in ['x', 'y']:
+            raise ValueError("direction must be either 'x' or 'y'")
+        data = np.asarray(self.data if data is None else data)
+        land = (data == 0) if landmask is None else np.broadcast_to(landmask, data.shape)
+        grid = self.grid
+        if grid.gtype in (GridCode.RectilinearZGrid, GridCode.RectilinearSGrid):
+            if direction == 'x':
+                return _masked_difference(data, grid.lon, -1, land).astype(data.dtype)
+            return _masked_difference(data, grid.lat.reshape(-1, 1), -2, land).astype(data.dtype)
+
+        dfdi = _masked_difference(data, np.arange(grid.xdim), -1, land)
+        dfdj = _masked_difference(data, np.arange(grid.ydim).reshape(-1, 1), -2, land)
+        (dlon_dj, dlon_di), (dlat_dj, dlat_di) = np.gradient(grid.lon), np.gradient(grid.lat)
+        if grid.mesh == 'spherical':
+            dlon_di = (dlon_di + 180) % 360 - 180
+            dlon_dj = (dlon_dj + 180) % 360 - 180
+        jacobian = dlon_di * dlat_dj - dlon_dj * dlat_di
+        if direction == 'x':
+            return ((dfdi * dlat_dj - dfdj * dlat_di) / jacobian).astype(data.dtype)
+        return ((dfdj * dlon_di - dfdi * dlon_dj) / jacobian).astype(data.dtype)
+
     def search_indices_vertical_z(self, z):
         grid = self.grid
         z = np.float32(z)
@@ -700,6 +777,23 @@ class Field(object):
                 xi = xdim - xi
         return xi, yi
 
+    def outside_bounding_box(self, x, y):
+        """Whether location (x, y) lies outside of the bounding box of the grid of this Field,
+        in which case sampling the Field raises a FieldOutOfBoundError"""
+        grid = self.grid
+        if grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid]:
+            if grid.xdim > 1 and (not grid.zonal_periodic):
+                if x < grid.lonlat_minmax[0] or x > grid.lonlat_minmax[1]:
+                    return True
+            return grid.ydim > 1 and (y < grid.lonlat_minmax[2] or y > grid.lonlat_minmax[3])
+        if not grid.zonal_periodic:
+            if x < grid.lonlat_minmax[0] or x > grid.lonlat_minmax[1]:
+                if grid.lon[0, 0] < grid.lon[0, -1]:
+                    return True
+                elif x < grid.lon[0, 0] and x > grid.lon[0, -1]:
+                    return True
+        return y < grid.lonlat_minmax[2] or y > grid.lonlat_minmax[3]
+
     def search_indices_rectilinear(self, x, y, z, ti=-1, time=-1, particle=None, search2D=False):
         grid = self.grid
 
@@ -887,6 +981,118 @@ class Field(object):
         else:
             return self.search_indices_curvilinear(x, y, z, ti, time, particle=particle, search2D=search2D)
 
+    def search_indices_2d(self, x, y, xi=None, yi=None):
+        """Vectorised horizontal index search of arrays of locations
+
+        :param x: array of longitudes (or x-coordinates on a flat mesh)
+        :param y: array of latitudes (or y-coordinates on a flat mesh)
+        :param xi: optional array of first guesses of the zonal indices (e.g. the particle xi
+               of the grid of this Field), from which the search of curvilinear grids starts
+        :param yi: optional array of first guesses of the meridional indices
+        :return: arrays xi, yi of the indices of the cells that contain the locations, and
+                 a boolean array of whether the locations lie within the grid
+        """
+        grid = self.grid
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid]:
+            found = np.isfinite(x) & np.isfinite(y)
+            xi = np.zeros(x.shape, dtype=np.int32)
+            if grid.xdim > 1:
+                lon = grid.lon.astype(np.float64)
+                if grid.mesh == 'spherical':
+                    indices = lon >= lon[0]
+                    if not indices.all():
+                        lon[indices.argmin():] += 360
+                    x = np.where(x < lon[0], x + 360, x)
+                xi = np.clip(np.searchsorted(lon, x, side='right') - 1, 0, grid.xdim-2).astype(np.int32)
+                if not grid.zonal_periodic:
+                    found &= (x >= lon[0]) & (x <= lon[-1])
+            yi = np.zeros(y.shape, dtype=np.int32)
+            if grid.ydim > 1:
+                yi = np.clip(np.searchsorted(grid.lat, y, side='right') - 1, 0, grid.ydim-2).astype(np.int32)
+                found &= (y >= grid.lonlat_minmax[2]) & (y <= grid.lonlat_minmax[3])
+            return xi, yi, found
+        return self._search_indices_curvilinear_2d(x, y, xi, yi)
+
+    def _search_indices_curvilinear_2d(self, x, y, xi=None, yi=None):
+        """Vectorised version of the cell walk of :meth:`search_indices_curvilinear`, which stops
+        the walk of the locations that lie beyond the boundary of the grid (only wrapping
+        around zonally periodic grids)"""
+        grid = self.grid
+        xi = np.full(x.shape, int(grid.xdim / 2) - 1) if xi is None else np.clip(xi, 0, grid.xdim-2)
+        yi = np.full(y.shape, int(grid.ydim / 2) - 1) if yi is None else np.clip(yi, 0, grid.ydim-2)
+        xi, yi = xi.astype(np.int32), yi.astype(np.int32)
+
+        found = np.isfinite(x) & np.isfinite(y) & (y >= grid.lonlat_minmax[2]) & (y <= grid.lonlat_minmax[3])
+        if not grid.zonal_periodic:
+            outside_x = (x < grid.lonlat_minmax[0]) | (x > grid.lonlat_minmax[1])
+            if grid.lon[0, 0] < grid.lon[0, -1]:
+                found &= ~outside_x
+            else:
+                found &= ~(outside_x & (x < grid.lon[0, 0]) & (x > grid.lon[0, -1]))
+
+        invA = np.array([[1, 0, 0, 0],
+                         [-1, 1, 0, 0],
+                         [-1, 0, 0, 1],
+                         [1, -1, 1, -1]])
+        maxIterSearch = 1e6
+        it = 0
+        tol = 1.e-10
+        eta = np.full(x.shape, -1.)
+        active = found.copy()
+        while active.any():
+            idx = np.nonzero(active)[0]
+            i, j, xa, ya = xi[idx], yi[idx], x[idx], y[idx]
+            px = np.stack([grid.lon[j, i], grid.lon[j, i+1], grid.lon[j+1, i+1], grid.lon[j+1, i]], axis=-1).astype(np.float64)
+            if grid.mesh == 'spherical':
+                px[:, 0] = np.where(px[:, 0] < xa-225, px[:, 0]+360, px[:, 0])
+                px[:, 0] = np.where(px[:, 0] > xa+225, px[:, 0]-360, px[:, 0])
+                px[:, 1:] = np.where(px[:, 1:] - px[:, :1] > 180, px[:, 1:]-360, px[:, 1:])
+                px[:, 1:] = np.where(-px[:, 1:] + px[:, :1] > 180, px[:, 1:]+360, px[:, 1:])
+            py = np.stack([grid.lat[j, i], grid.lat[j, i+1], grid.lat[j+1, i+1], grid.lat[j+1, i]], axis=-1).astype(np.float64)
+            a = np.dot(px, invA.T).T
+            b = np.dot(py, invA.T).T
+
+            aa = a[3]*b[2] - a[2]*b[3]
+            bb = a[3]*b[0] - a[0]*b[3] + a[1]*b[2] - a[2]*b[1] + xa*b[3] - ya*a[3]
+            cc = a[1]*b[0] - a[0]*b[1] + xa*b[1] - ya*a[1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                det2 = bb*bb-4*aa*cc
+                e = np.where(np.abs(aa) < 1e-12, -cc / bb,
+                             np.where(det2 > 0, (-bb+np.sqrt(np.maximum(det2, 0)))/(2*aa), eta[idx]))
+                s = np.where(np.abs(a[1]+a[3]*e) < 1e-12,
+                             ((ya-py[:, 0])/(py[:, 1]-py[:, 0]) + (ya-py[:, 3])/(py[:, 2]-py[:, 3])) * .5,
+                             (xa-a[0]-a[2]*e) / (a[1]+a[3]*e))
+            eta[idx] = e
+            xsi_in = (s >= -tol) & (s <= 1+tol)
+            eta_in = (e >= -tol) & (e <= 1+tol)
+            inside = xsi_in & eta_in
+            # locations beyond the edge of a cell on the boundary of the grid lie outside of it
+            out = xsi_in & (((e < -tol) & (j == 0)) | ((e > 1+tol) & (j == grid.ydim-2)))
+            if not grid.zonal_periodic:
+                out |= eta_in & (((s < -tol) & (i == 0)) | ((s > 1+tol) & (i == grid.xdim-2)))
+
+            i = i + (s > 1+tol) - (s < -tol)
+            j = j + (e > 1+tol) - (e < -tol)
+            if grid.zonal_periodic:
+                i = np.where(i < 0, grid.xdim-2, np.where(i > grid.xdim-2, 0, i))
+            i = np.clip(i, 0, grid.xdim-2)
+            j = np.clip(j, 0, grid.ydim-2)
+            # as well as the locations for which the walk would leave the grid
+            out |= ~inside & (i == xi[idx]) & (j == yi[idx])
+            moved = ~(inside | out)
+            xi[idx[moved]] = i[moved]
+            yi[idx[moved]] = j[moved]
+
+            found[idx[out]] = False
+            active[idx[~moved]] = False
+            it += 1
+            if it > maxIterSearch:
+                found &= ~active
+                break
+        return xi, yi, found
+
     def interpolator2D(self, ti, z, y, x, particle=None):
         (xsi, eta, _, xi, yi, _) = self.search_indices(x, y, z, particle=particle)
         if self.interp_method == 'nearest':
@@ -1111,6 +1317,113 @@ class Field(object):
         else:
             return value
 
+    def eval_vectorised(self, time, z, y, x, applyConversion=True):
+        """Vectorised version of :meth:`eval`, interpolating the field at arrays of locations at one `time`.
+
+        The interpolation is vectorised for rectilinear z-grids (with increasing coordinates) and
+        'nearest', 'linear', 'cgrid_tracer' and 'bgrid_tracer' interpolation. Other Fields, and the
+        locations for which the vectorised interpolation fails (e.g. because they are out of bounds),
+        are evaluated one at a time with :meth:`eval`, so that the same errors are raised.
+
+        :param time: Time at which to interpolate
+        :param z: array of depths
+        :param y: array of latitudes (or y-coordinates on a flat mesh)
+        :param x: array of longitudes (or x-coordinates on a flat mesh)
+        :param applyConversion: Boolean whether to apply the unit conversion of the Field
+        :return: array of the interpolated values
+        """
+        z, y, x = np.broadcast_arrays(*[np.asarray(c, dtype=np.float64) for c in (z, y, x)])
+        values = np.full(x.shape, np.nan)
+        valid = np.zeros(x.shape, dtype=bool)
+        if self._vectorised_eval_supported(applyConversion) and x.size > 0:
+            (ti, periods) = self.time_index(time)
+            ftime = time - periods*(self.grid.time_full[-1]-self.grid.time_full[0])
+            if ti < self.grid.tdim-1 and ftime > self.grid.time[ti]:
+                f0, valid0 = self._spatial_interpolation_vectorised(ti, z, y, x)
+                f1, valid1 = self._spatial_interpolation_vectorised(ti + 1, z, y, x)
+                t0 = self.grid.time[ti]
+                t1 = self.grid.time[ti + 1]
+                values = f0 + (f1 - f0) * ((ftime - t0) / (t1 - t0))
+                valid = valid0 & valid1
+            else:
+                values, valid = self._spatial_interpolation_vectorised(ti, z, y, x)
+            valid &= ~np.isnan(values)
+        for i in zip(*np.nonzero(~valid)):
+            values[i] = self.eval(time, z[i], y[i], x[i], applyConversion=applyConversion)
+        return values
+
+    def _vectorised_eval_supported(self, applyConversion):
+        """Whether :meth:`eval_vectorised` can interpolate this Field vectorised"""
+        grid = self.grid
+        if grid.gtype != GridCode.RectilinearZGrid or (applyConversion and type(self.units) is not UnitConverter):
+            return False
+        if self.interp_method not in ['nearest', 'linear', 'cgrid_tracer', 'bgrid_tracer']:
+            return False
+        if grid.zdim > 1 and (self.gridindexingtype == 'pop' or np.any(np.diff(grid.depth) <= 0)):
+            return False
+        return not (np.any(np.diff(grid.lat) <= 0) or (grid.mesh != 'spherical' and np.any(np.diff(grid.lon) <= 0)))
+
+    def _spatial_interpolation_vectorised(self, ti, z, y, x):
+        """Interpolation of time level `ti` at arrays of locations for :meth:`eval_vectorised`, with
+        the cell indices of :meth:`search_indices_rectilinear`. Returns the values, and a boolean
+        array of the locations that lie within their cell and within the bounds of the grid"""
+        grid = self.grid
+        valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(z)
+
+        def cell_indices(coords, c, dim):
+            if dim == 1:
+                return np.full(c.shape, -1), np.zeros(c.shape)
+            ci = np.clip(np.searchsorted(coords, c, side='left') - 1, 0, dim-2)
+            return ci, (c - coords[ci]) / (coords[ci+1] - coords[ci])
+
+        if grid.xdim > 1 and not grid.zonal_periodic:
+            valid &= (x >= grid.lonlat_minmax[0]) & (x <= grid.lonlat_minmax[1])
+        if grid.ydim > 1:
+            valid &= (y >= grid.lonlat_minmax[2]) & (y <= grid.lonlat_minmax[3])
+        lon = grid.lon.astype(np.float64)
+        if grid.mesh == 'spherical' and grid.xdim > 1:
+            indices = lon >= lon[0]
+            if not indices.all():
+                lon[indices.argmin():] += 360
+            x = np.where(x < lon[0], x + 360, x)
+        with np.errstate(invalid='ignore'):
+            xi, xsi = cell_indices(lon, x, grid.xdim)
+            yi, eta = cell_indices(grid.lat.astype(np.float64), y, grid.ydim)
+            valid &= (xsi >= 0) & (xsi <= 1) & (eta >= 0) & (eta <= 1)
+            if grid.zdim > 1:
+                depth = grid.depth.astype(np.float64)
+                z = z.astype(np.float32).astype(np.float64)
+                zi = np.clip(np.searchsorted(depth, z, side='right') - 1, 0, grid.zdim-2)
+                zeta = (z - depth[zi]) / (depth[zi+1] - depth[zi])
+                valid &= (z >= depth[0]) & (z <= depth[-1])
+        xi, yi = np.where(valid, xi, 0), np.where(valid, yi, 0)
+
+        data = np.asarray(self.data[ti])
+        if grid.zdim == 1 and data.ndim == 3:
+            data = data[0]
+        if grid.zdim > 1:
+            zi = np.where(valid, zi, 0)
+            layers = [(zi, 1 - zeta), (zi + 1, zeta)]
+        else:
+            layers = [(None, 1)]
+        if self.interp_method == 'nearest':
+            xi, yi = np.where(xsi <= .5, xi, xi+1), np.where(eta <= .5, yi, yi+1)
+            if grid.zdim > 1:
+                layers = [(np.where(zeta <= .5, zi, zi+1), 1)]
+            corners = [(yi, xi, 1)]
+        elif self.interp_method == 'linear':
+            corners = [(yi, xi, (1-xsi)*(1-eta)), (yi, xi+1, xsi*(1-eta)),
+                       (yi+1, xi+1, xsi*eta), (yi+1, xi, (1-xsi)*eta)]
+        else:
+            layers = [(zi, 1)] if grid.zdim > 1 else layers
+            corners = [(yi+1, xi+1, 1)]
+
+        values = np.zeros(x.shape)
+        for k, wz in layers:
+            for j, i, wxy in corners:
+                values += wz * wxy * (data[k, j, i] if grid.zdim > 1 else data[j, i])
+        return values, valid
+
     def ccode_eval_array(self, var, t, z, y, x):
         # Casting interp_methd to int as easier to pass on in C-code
         ccode_str = "temporal_interpolation(%s, %s, %s, %s, %s, &particles->xi[pnum*ngrid], &particles->yi[pnum*ngrid], &particles->zi[pnum*ngrid], &particles->ti[pnum*ngrid], &%s, %s, %s)" \
@@ -1168,34 +1481,59 @@ class Field(object):
                         or g.load_chunk[block_id] in g.chunk_loaded and self.data_chunks[block_id] is None:
                     block = self.get_block(block_id)
                     self.data_chunks[block_id] = np.array(self.data.blocks[(slice(self.grid.tdim),) + block])
+                    self._cstruct_dirty = True
                 elif g.load_chunk[block_id] == g.chunk_not_loaded:
+                    if self.data_chunks[block_id] is not None:
+                        self._cstruct_dirty = True
                     if isinstance(self.data_chunks, list):
                         self.data_chunks[block_id] = None
                     else:
                         self.data_chunks[block_id, :] = None
                     self.c_data_chunks[block_id] = None
         else:
+            self.grid.load_chunk[0] = g.chunk_loaded_touched
+            if self.shared_memory is not None or (isinstance(self.data, np.ndarray) and self.data.flags.c_contiguous):
+                # Data in node-shared memory and contiguous data are used in place, so that
+                # c_data_chunks only has to point to a new array when the data is replaced
+                if self.data_chunks[0] is not self.data:
+                    self.data_chunks[0] = self.data
+                    self._cstruct_dirty = True
+                return
             if isinstance(self.data_chunks, list):
                 self.data_chunks[0] = None
             else:
                 self.data_chunks[0, :] = None
             self.c_data_chunks[0] = None
-            self.grid.load_chunk[0] = g.chunk_loaded_touched
             self.data_chunks[0] = np.array(self.data)
+            self._cstruct_dirty = True
+
+    def set_shared_memory(self, shared_memory):
+        """Keep the data of this Field in node-shared memory, so that the processes on a
+        node use a single copy of the data. Data that is already loaded is moved to the shared
+        buffer; data loaded later by :meth:`parcels.fieldset.FieldSet.computeTimeChunk` is read
+        only by the leading process of each node.
+
+        :param shared_memory: :class:`parcels.tools.sharedmemory.SharedFieldMemory` object holding the buffers
+        """
+        if self.chunksize not in [False, None] or isinstance(self.data, da.core.Array):
+            raise NotImplementedError('Node-shared memory is not supported for Fields with dask chunking. Use chunksize=False')
+        self.shared_memory = shared_memory
+        self._shared_key = shared_memory.new_key(self.name)
+        if isinstance(self.data, np.ndarray):
+            self.data = shared_memory.share(self._shared_key, self.data if shared_memory.is_leader else None)
 
     @property
     def ctypes_struct(self):
         """Returns a ctypes struct object containing all relevant
-        pointers and sizes for this field."""
+        pointers and sizes for this field.
 
-        # Ctypes struct corresponding to the type definition in parcels.h
-        class CField(Structure):
-            _fields_ = [('xdim', c_int), ('ydim', c_int), ('zdim', c_int),
-                        ('tdim', c_int), ('igrid', c_int),
-                        ('allow_time_extrapolation', c_int),
-                        ('time_periodic', c_int),
-                        ('data_chunks', POINTER(POINTER(POINTER(c_float)))),
-                        ('grid', POINTER(CGrid))]
+        The struct is cached, and only rebuilt when the data chunks, the Grid struct
+        or one of the other attributes in the struct have changed since the last call.
+        """
+        grid_struct = self.grid.ctypes_struct
+        if self._cstruct is not None and not self._cstruct_dirty \
+                and self._cstruct_grid_version == self.grid._cstruct_version:
+            return self._cstruct
 
         # Create and populate the c-struct object
         allow_time_extrapolation = 1 if self.allow_time_extrapolation else 0
@@ -1210,11 +1548,13 @@ class Field(object):
             else:
                 self.c_data_chunks[i] = None
 
-        cstruct = CField(self.grid.xdim, self.grid.ydim, self.grid.zdim,
-                         self.grid.tdim, self.igrid, allow_time_extrapolation, time_periodic,
-                         (POINTER(POINTER(c_float)) * len(self.c_data_chunks))(*self.c_data_chunks),
-                         pointer(self.grid.ctypes_struct))
-        return cstruct
+        self._cstruct = CField(self.grid.xdim, self.grid.ydim, self.grid.zdim,
+                               self.grid.tdim, self.igrid, allow_time_extrapolation, time_periodic,
+                               (POINTER(POINTER(c_float)) * len(self.c_data_chunks))(*self.c_data_chunks),
+                               pointer(grid_struct))
+        self._cstruct_dirty = False
+        self._cstruct_grid_version = self.grid._cstruct_version
+        return self._cstruct
 
     def show(self, animation=False, show_time=None, domain=None, depth_level=0, projection=None, land=True,
              vmin=None, vmax=None, savefile=None, **kwargs):
@@ -1935,12 +2275,17 @@ class NestedField(list):
         if isinstance(key, int):
             return list.__getitem__(self, key)
         else:
+            (y, x) = (key.lat, key.lon) if _isParticle(key) else key[2:4]
             for iField in range(len(self)):
+                field = list.__getitem__(self, iField)
+                # Skip the Fields (except the last) whose grid doesn't contain the location, without searching it
+                if iField < len(self)-1 and (field.U if isinstance(field, VectorField) else field).outside_bounding_box(x, y):
+                    continue
                 try:
                     if _isParticle(key):
-                        val = list.__getitem__(self, iField).eval(key.time, key.depth, key.lat, key.lon, particle=None)
+                        val = field.eval(key.time, key.depth, key.lat, key.lon, particle=None)
                     else:
-                        val = list.__getitem__(self, iField).eval(*key)
+                        val = field.eval(*key)
                     break
                 except (FieldOutOfBoundError, FieldSamplingError):
                     if iField == len(self)-1:
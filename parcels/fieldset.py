@@ -15,6 +15,7 @@ from parcels.gridset import GridSet
 from parcels.grid import GridCode
 from parcels.tools.converters import TimeConverter, convert_xarray_time_units
 from parcels.tools.statuscodes import TimeExtrapolationError
+from parcels.tools.sharedmemory import SharedFieldMemory
 from parcels.tools.loggers import logger
 try:
     from mpi4py import MPI
@@ -47,6 +48,8 @@ class FieldSet(object):
                 self.add_field(field, name)
 
         self.compute_on_defer = None
+        self.shared_memory = None
+        self._derived_fields = []
 
     @staticmethod
     def checkvaliddimensionsdict(dims):
@@ -175,6 +178,118 @@ class FieldSet(object):
         """
         self.add_field(Field(name, value, lon=0, lat=0, mesh=mesh))
 
+    def add_gradient_field(self, fieldname, direction, name=None, landmask=None):
+        """Add a Field with the derivative of a Field with respect to longitude ('x') or
+        latitude ('y'), on the grid of that Field (see :meth:`parcels.field.Field.central_difference`).
+        The derivative is computed for every snapshot that is loaded, so that kernels can sample
+        it instead of sampling the Field at a distance around the particles, as e.g. in
+        :func:`parcels.application_kernels.advectiondiffusion.AdvectionDiffusionM1_GradKh`
+
+        The derivative Field has the unit converter of the original Field, so that on a spherical
+        mesh the derivative of e.g. Kh_zonal is sampled in degree2/s per degree
+
+        :param fieldname: Name of the :class:`parcels.field.Field` to differentiate
+        :param direction: Direction of the derivative, either 'x' or 'y'
+        :param name: Name of the derivative Field (default 'd<fieldname>_d<direction>', e.g. 'dKh_zonal_dx')
+        :param landmask: Boolean array that is True on land, broadcastable to a snapshot of the data
+               (default: where the Field is zero)
+        """
+        field = getattr(self, fieldname)
+        name = 'd%s_d%s' % (fieldname, direction) if name is None else name
+        if direction not in ['x', 'y']:
+            raise ValueError("direction must be either 'x' or 'y'")
+
+        def derivative(data):
+            return field.central_difference(direction, data, landmask)
+
+        self._add_derived_field(name, derivative, [field])
+
+    def add_derived_field(self, name, func, inputs):
+        """Add a Field that is derived from other Fields on the same grid, e.g. the density
+        from the temperature and salinity. The data of the derived Field is computed as
+        `func(*inputs)` for every snapshot that is loaded (and, for chunked Fields, only for
+        the chunks that are sampled), so that kernels can sample it as an ordinary Field
+        instead of evaluating `func` for every particle at every time step
+
+        :param name: Name of the derived :class:`parcels.field.Field`
+        :param func: Function that computes the derived data from the data of the inputs, elementwise
+               on numpy arrays (so it should only use e.g. numpy ufuncs and arithmetic)
+        :param inputs: List of the names of the Fields on which the derived Field depends, which
+               should all be on the same grid. The names 'lon', 'lat' and 'depth' give the
+               coordinates of that grid
+        """
+        fields = [getattr(self, i) for i in inputs if i not in ['lon', 'lat', 'depth']]
+        if len(fields) == 0:
+            raise ValueError("Derived Field %s should depend on at least one Field" % name)
+        if any(not isinstance(f, Field) for f in fields):
+            raise NotImplementedError("Derived Field %s can only depend on (scalar) Fields" % name)
+        grid = fields[0].grid
+        if any(f.grid is not grid for f in fields):
+            raise ValueError("All Fields on which derived Field %s depends should be on the same grid" % name)
+        if 'depth' in inputs and grid.z4d is True:
+            raise NotImplementedError("Derived Fields can not depend on the time-varying depth of a grid")
+        inputs = [i if i in ['lon', 'lat', 'depth'] else getattr(self, i) for i in inputs]
+        self._add_derived_field(name, func, inputs, pointwise=True)
+
+    def _add_derived_field(self, name, func, inputs, pointwise=False):
+        """Add a Field on the grid of the Fields in `inputs`, of which the data is computed
+        as `func(*snapshots)` for every snapshot of the inputs that is loaded. If `pointwise`,
+        func is elementwise, so that for chunked Fields it is only evaluated on the chunks
+        that are sampled"""
+        source = self._derived_source(inputs)
+        data = self._derived_data(func, inputs, pointwise)
+        field = Field(name, DeferredArray() if data is None else data, grid=source.grid,
+                      fieldtype=source.fieldtype, interp_method=source.interp_method,
+                      allow_time_extrapolation=source.allow_time_extrapolation, time_periodic=source.time_periodic,
+                      gridindexingtype=source.gridindexingtype, cast_data_dtype=source.cast_data_dtype)
+        if data is not None:
+            field.data = data
+        self.add_field(field)
+        self._derived_fields.append((field, func, inputs, pointwise))
+
+    @staticmethod
+    def _derived_source(inputs):
+        """First Field in the inputs of a derived Field"""
+        return next(i for i in inputs if isinstance(i, Field))
+
+    @staticmethod
+    def _grid_coordinate(grid, name, shape):
+        """Coordinate `name` ('lon', 'lat' or 'depth') of the nodes of grid, broadcast to shape"""
+        if name == 'depth':
+            coord = grid.depth if grid.gtype in [GridCode.RectilinearSGrid, GridCode.CurvilinearSGrid] else grid.depth.reshape(-1, 1, 1)
+            coord = coord[0] if len(shape) == 2 else coord
+        elif name == 'lat' and grid.gtype in [GridCode.RectilinearZGrid, GridCode.RectilinearSGrid]:
+            coord = grid.lat.reshape(-1, 1)
+        else:
+            coord = getattr(grid, name)
+        return np.broadcast_to(coord, shape)
+
+    @classmethod
+    def _derived_data(cls, func, inputs, pointwise, tindices=None, data=None):
+        """Data of a derived Field, in which the snapshots at `tindices` (default: all) are recomputed"""
+        source = cls._derived_source(inputs)
+        if any(isinstance(i.data, DeferredArray) for i in inputs if isinstance(i, Field)):
+            return None
+        shape, dtype = source.data.shape, source.data.dtype
+        if pointwise and isinstance(source.data, da.core.Array):
+            input_data = [i.data if isinstance(i, Field) else
+                          da.from_array(cls._grid_coordinate(source.grid, i, shape[1:]), chunks=source.data.chunks[1:])
+                          for i in inputs]
+
+            def func_block(*blocks):
+                return np.asarray(func(*blocks), dtype=dtype)
+            return da.map_blocks(func_block, *input_data, dtype=dtype)
+
+        if tindices is None or not isinstance(data, np.ndarray):
+            tindices = range(shape[0])
+            data = np.empty(shape, dtype=dtype)
+        coords = {i: cls._grid_coordinate(source.grid, i, shape[1:]) for i in inputs if not isinstance(i, Field)}
+        for tind in tindices:
+            data[tind] = func(*[np.asarray(i.data[tind]) if isinstance(i, Field) else coords[i] for i in inputs])
+        if isinstance(source.data, da.core.Array):
+            return da.from_array(data, chunks=source.data.chunks)
+        return data
+
     def add_vector_field(self, vfield):
         """Add a :class:`parcels.field.VectorField` object to the FieldSet
 
@@ -986,6 +1101,23 @@ class FieldSet(object):
             if isinstance(value, Field):
                 value.add_periodic_halo(zonal, meridional, halosize)
 
+    def share_memory(self, comm=None):
+        """Keep the data of all Fields in node-shared memory, so that the processes on a
+        node (MPI ranks, or worker processes) hold a single copy of the FieldSet data.
+        With MPI, only the first rank on each node reads deferred-loaded data from disk.
+        Call this after all Fields have been added to the FieldSet.
+
+        :param comm: MPI communicator of the participating ranks (default MPI.COMM_WORLD)
+        :return: The :class:`parcels.tools.sharedmemory.SharedFieldMemory` object holding the buffers
+        """
+        if self.shared_memory is None:
+            self.shared_memory = SharedFieldMemory(comm)
+        for f in self.get_fields():
+            if type(f) in [VectorField, NestedField, SummedField] or f.shared_memory is not None:
+                continue
+            f.set_shared_memory(self.shared_memory)
+        return self.shared_memory
+
     def write(self, filename):
         """Write FieldSet to NetCDF file using NEMO convention
 
@@ -1057,8 +1189,10 @@ class FieldSet(object):
             if type(f) in [VectorField, NestedField, SummedField] or not f.grid.defer_load or f.dataFiles is None:
                 continue
             g = f.grid
+            # with node-shared memory, only the leading process reads the data from disk
+            reads_data = f.shared_memory is None or f.shared_memory.is_leader
             if g.update_status == 'first_updated':  # First load of data
-                if f.data is not None and not isinstance(f.data, DeferredArray):
+                if f.data is not None and not isinstance(f.data, DeferredArray) and f.shared_memory is None:
                     if not isinstance(f.data, list):
                         f.data = None
                     else:
@@ -1070,19 +1204,25 @@ class FieldSet(object):
                     zd = g.zdim - 1
                 else:
                     zd = g.zdim
-                data = lib.empty((g.tdim, zd, g.ydim-2*g.meridional_halo, g.xdim-2*g.zonal_halo), dtype=np.float32)
                 f.loaded_time_indices = range(2)
-                for tind in f.loaded_time_indices:
-                    for fb in f.filebuffers:
-                        if fb is not None:
-                            fb.close()
-                        fb = None
-                    data = f.computeTimeChunk(data, tind)
-                data = f.rescale_and_set_minmax(data)
+                if reads_data:
+                    data = lib.empty((g.tdim, zd, g.ydim-2*g.meridional_halo, g.xdim-2*g.zonal_halo), dtype=np.float32)
+                    for tind in f.loaded_time_indices:
+                        for fb in f.filebuffers:
+                            if fb is not None:
+                                fb.close()
+                            fb = None
+                        data = f.computeTimeChunk(data, tind)
+                    data = f.rescale_and_set_minmax(data)
+                    data = f.reshape(data)
+                else:
+                    data = None
 
                 if(isinstance(f.data, DeferredArray)):
                     f.data = DeferredArray()
-                f.data = f.reshape(data)
+                if f.shared_memory is not None:
+                    data = f.shared_memory.share(f._shared_key, data)
+                f.data = data
                 if not f.chunk_set:
                     f.chunk_setup()
                 if len(g.load_chunk) > g.chunk_not_loaded:
@@ -1091,6 +1231,30 @@ class FieldSet(object):
                     g.load_chunk = np.where(g.load_chunk == g.chunk_deprecated,
                                             g.chunk_not_loaded, g.load_chunk)
 
+            elif g.update_status == 'updated' and f.shared_memory is not None:
+                # all processes have to be done with the old snapshots before the leader overwrites them
+                f.shared_memory.barrier()
+                if reads_data:
+                    if f.gridindexingtype == 'pop' and g.zdim > 1:
+                        zd = g.zdim - 1
+                    else:
+                        zd = g.zdim
+                    data = np.empty((g.tdim, zd, g.ydim-2*g.meridional_halo, g.xdim-2*g.zonal_halo), dtype=np.float32)
+                    tind = 1 if signdt >= 0 else 0
+                    f.loaded_time_indices = [tind]
+                    if f.filebuffers[1-tind] is not None:
+                        f.filebuffers[1-tind].close()
+                    f.filebuffers[1-tind] = f.filebuffers[tind]
+                    data = f.rescale_and_set_minmax(f.computeTimeChunk(data, tind))
+                    data = f.reshape(data)[tind, :]
+                    f.data[1-tind, :] = f.data[tind, :]
+                    f.data[tind, :] = data
+                f.shared_memory.barrier()
+                g.load_chunk = np.where(g.load_chunk == g.chunk_loaded_touched,
+                                        g.chunk_loading_requested, g.load_chunk)
+                g.load_chunk = np.where(g.load_chunk == g.chunk_deprecated,
+                                        g.chunk_not_loaded, g.load_chunk)
+
             elif g.update_status == 'updated':
                 lib = np if isinstance(f.data, np.ndarray) else da
                 if f.gridindexingtype == 'pop' and g.zdim > 1:
@@ -1162,6 +1326,23 @@ class FieldSet(object):
                                 block = f.get_block(block_id)
                                 f.data_chunks[block_id][1] = None
                                 f.data_chunks[block_id][0] = np.array(f.data.blocks[(slice(2),)+block][0])
+        # recompute the Fields that are derived from the newly loaded snapshots
+        for f, func, inputs, pointwise in self._derived_fields:
+            g = f.grid
+            if not g.defer_load or g.update_status not in ['first_updated', 'updated']:
+                continue
+            f.loaded_time_indices = self._derived_source(inputs).loaded_time_indices
+            if g.update_status == 'updated' and isinstance(f.data, np.ndarray):
+                tind = f.loaded_time_indices[0]
+                f.data[1-tind] = f.data[tind]
+                self._derived_data(func, inputs, pointwise, [tind], f.data)
+            else:
+                f.data = self._derived_data(func, inputs, pointwise)
+                if not f.chunk_set:
+                    f.chunk_setup()
+                f.data_chunks = [None] * len(f.data_chunks)
+                f.c_data_chunks = [None] * len(f.c_data_chunks)
+
         # do user-defined computations on fieldset data
         if self.compute_on_defer:
             self.compute_on_defer(self)
@@ -29,10 +29,32 @@ class CGrid(Structure):
                 ('grid', c_void_p)]
 
 
+class CStructuredGrid(Structure):
+    # z4d is only to have same cstruct as RectilinearSGrid
+    _fields_ = [('xdim', c_int), ('ydim', c_int), ('zdim', c_int),
+                ('tdim', c_int), ('z4d', c_int),
+                ('mesh_spherical', c_int), ('zonal_periodic', c_int),
+                ('chunk_info', POINTER(c_int)),
+                ('load_chunk', POINTER(c_int)),
+                ('tfull_min', c_double), ('tfull_max', c_double), ('periods', POINTER(c_int)),
+                ('lonlat_minmax', POINTER(c_float)),
+                ('lon', POINTER(c_float)), ('lat', POINTER(c_float)),
+                ('depth', POINTER(c_float)), ('time', POINTER(c_double))
+                ]
+
+
 class Grid(object):
     """Grid class that defines a (spatial and temporal) grid on which Fields are defined
 
     """
+    # Attributes that are (pointed to) in the C struct of the Grid
+    _cstruct_attrs = frozenset(['xdim', 'ydim', 'zdim', 'tdim', 'z4d', 'mesh', 'zonal_periodic', 'chunk_info',
+                                'load_chunk', 'time_full', 'periods', 'lonlat_minmax', 'lon', 'lat', 'depth', 'time'])
+
+    def __setattr__(self, name, value):
+        if name in Grid._cstruct_attrs:
+            self.__dict__['_cstruct_dirty'] = True
+        super().__setattr__(name, value)
 
     def __init__(self, lon, lat, time, time_origin, mesh):
         self.xi = None
@@ -54,6 +76,8 @@ class Grid(object):
         assert isinstance(self.time_origin, TimeConverter), 'time_origin needs to be a TimeConverter object'
         self.mesh = mesh
         self.cstruct = None
+        self._cgrid_struct = None
+        self._cstruct_version = 0
         self.cell_edge_sizes = {}
         self.zonal_periodic = False
         self.zonal_halo = 0
@@ -90,46 +114,59 @@ class Grid(object):
     @property
     def ctypes_struct(self):
         # This is unnecessary for the moment, but it could be useful when going will fully unstructured grids
-        self.cgrid = cast(pointer(self.child_ctypes_struct), c_void_p)
-        cstruct = CGrid(self.gtype, self.cgrid.value)
-        return cstruct
+        child_ctypes_struct = self.child_ctypes_struct
+        if self._cgrid_struct is None:
+            self.cgrid = cast(pointer(child_ctypes_struct), c_void_p)
+            self._cgrid_struct = CGrid(self.gtype, self.cgrid.value)
+        return self._cgrid_struct
 
     @property
     def child_ctypes_struct(self):
         """Returns a ctypes struct object containing all relevant
-        pointers and sizes for this grid."""
-
-        class CStructuredGrid(Structure):
-            # z4d is only to have same cstruct as RectilinearSGrid
-            _fields_ = [('xdim', c_int), ('ydim', c_int), ('zdim', c_int),
-                        ('tdim', c_int), ('z4d', c_int),
-                        ('mesh_spherical', c_int), ('zonal_periodic', c_int),
-                        ('chunk_info', POINTER(c_int)),
-                        ('load_chunk', POINTER(c_int)),
-                        ('tfull_min', c_double), ('tfull_max', c_double), ('periods', POINTER(c_int)),
-                        ('lonlat_minmax', POINTER(c_float)),
-                        ('lon', POINTER(c_float)), ('lat', POINTER(c_float)),
-                        ('depth', POINTER(c_float)), ('time', POINTER(c_double))
-                        ]
+        pointers and sizes for this grid.
 
+        The struct is created once and only updated in place when one of the
+        attributes it (points to) has been reassigned since the last call, so that
+        the pointers to it stay valid between kernel executions.
+        """
         # Create and populate the c-struct object
-        if not self.cstruct:  # Not to point to the same grid various times if grid in various fields
+        if self.cstruct is None or self._cstruct_dirty:
             if not isinstance(self.periods, c_int):
                 self.periods = c_int()
                 self.periods.value = 0
-            self.cstruct = CStructuredGrid(self.xdim, self.ydim, self.zdim,
-                                           self.tdim, self.z4d,
-                                           self.mesh == 'spherical', self.zonal_periodic,
-                                           (c_int * len(self.chunk_info))(*self.chunk_info),
-                                           self.load_chunk.ctypes.data_as(POINTER(c_int)),
-                                           self.time_full[0], self.time_full[-1], pointer(self.periods),
-                                           self.lonlat_minmax.ctypes.data_as(POINTER(c_float)),
-                                           self.lon.ctypes.data_as(POINTER(c_float)),
-                                           self.lat.ctypes.data_as(POINTER(c_float)),
-                                           self.depth.ctypes.data_as(POINTER(c_float)),
-                                           self.time.ctypes.data_as(POINTER(c_double)))
+            values = (self.xdim, self.ydim, self.zdim,
+                      self.tdim, self.z4d,
+                      self.mesh == 'spherical', self.zonal_periodic,
+                      (c_int * len(self.chunk_info))(*self.chunk_info),
+                      self.load_chunk.ctypes.data_as(POINTER(c_int)),
+                      self.time_full[0], self.time_full[-1], pointer(self.periods),
+                      self.lonlat_minmax.ctypes.data_as(POINTER(c_float)),
+                      self.lon.ctypes.data_as(POINTER(c_float)),
+                      self.lat.ctypes.data_as(POINTER(c_float)),
+                      self.depth.ctypes.data_as(POINTER(c_float)),
+                      self.time.ctypes.data_as(POINTER(c_double)))
+            if self.cstruct is None:
+                self.cstruct = CStructuredGrid(*values)
+            else:
+                for (name, _), value in zip(CStructuredGrid._fields_, values):
+                    setattr(self.cstruct, name, value)
+            self._cstruct_dirty = False
+            self._cstruct_version += 1
         return self.cstruct
 
+    def metric_factors(self):
+        """Lengths (in m) of one degree of longitude and of one degree of latitude at the
+        nodes of the Grid, for the conversion of distances on spherical meshes.
+
+        :returns: tuple of the zonal and meridional factors, which broadcast to (ydim, xdim)
+                  (one value per row for rectilinear grids and per node for curvilinear grids).
+                  Both factors are 1 for flat meshes.
+        """
+        if self.mesh != 'spherical':
+            return np.float32(1.), np.float32(1.)
+        lat = self.lat.reshape(-1, 1) if self.lat.ndim == 1 else self.lat
+        return 1000. * 1.852 * 60. * np.cos(lat * np.pi / 180), 1000. * 1.852 * 60.
+
     def lon_grid_to_target(self):
         if self.lon_remapping:
             self.lon = self.lon_remapping.to_target(self.lon)
@@ -476,6 +476,76 @@ static inline StatusCode search_indices(type_coord x, type_coord y, type_coord z
   }
 }
 
+/* Result of the last index search. Fields on the same grid that are sampled at the same
+ * location and time (e.g. U and V, or a tracer after the velocities) share this result
+ * instead of repeating the search. Only the B-grid interpolation methods change the search,
+ * and the search starts from the particle's previous indices, so these are part of the key.
+ * */
+typedef struct
+{
+  CStructuredGrid *grid;
+  int *xi;
+  type_coord x, y, z;
+  double time, t0, t1;
+  int ti, bgrid, gridindexingtype;
+  int xi_found, yi_found, zi_found;
+  double xsi, eta, zeta;
+} SearchCache;
+
+static SearchCache search_cache = {NULL};
+
+/* Invalidate the last index search, e.g. when the grids may have changed between kernel calls */
+static inline void reset_search_cache()
+{
+  search_cache.grid = NULL;
+}
+
+/* Index search that reuses the result of the previous search if it was for the same
+ * grid, particle, location and time
+ * */
+static inline StatusCode search_indices_shared(type_coord x, type_coord y, type_coord z, CStructuredGrid *grid,
+                                              int *xi, int *yi, int *zi, double *xsi, double *eta, double *zeta,
+                                              GridCode gcode, int ti, double time, double t0, double t1, int interp_method,
+                                              int gridindexingtype)
+{
+  SearchCache *cache = &search_cache;
+  int bgrid = (interp_method == BGRID_VELOCITY || interp_method == BGRID_W_VELOCITY || interp_method == BGRID_TRACER);
+  if (cache->grid == grid && cache->xi == xi && cache->x == x && cache->y == y && cache->z == z
+      && cache->time == time && cache->t0 == t0 && cache->t1 == t1 && cache->ti == ti
+      && cache->bgrid == bgrid && cache->gridindexingtype == gridindexingtype
+      && cache->xi_found == *xi && cache->yi_found == *yi && cache->zi_found == *zi){
+    *xsi = cache->xsi;
+    *eta = cache->eta;
+    *zeta = cache->zeta;
+    return SUCCESS;
+  }
+
+  StatusCode status = search_indices(x, y, z, grid, xi, yi, zi, xsi, eta, zeta, gcode, ti, time, t0, t1,
+                                     interp_method, gridindexingtype);
+  if (status != SUCCESS){
+    cache->grid = NULL;
+    return status;
+  }
+  cache->grid = grid;
+  cache->xi = xi;
+  cache->x = x;
+  cache->y = y;
+  cache->z = z;
+  cache->time = time;
+  cache->t0 = t0;
+  cache->t1 = t1;
+  cache->ti = ti;
+  cache->bgrid = bgrid;
+  cache->gridindexingtype = gridindexingtype;
+  cache->xi_found = *xi;
+  cache->yi_found = *yi;
+  cache->zi_found = *zi;
+  cache->xsi = *xsi;
+  cache->eta = *eta;
+  cache->zeta = *zeta;
+  return SUCCESS;
+}
+
 /* Local linear search to update time index */
 static inline StatusCode search_time_index(double *t, int size, double *tvals, int *ti, int time_periodic, double tfull_min, double tfull_max, int *periods)
 {
@@ -465,7 +465,7 @@ static inline StatusCode temporal_interpolation_structured_grid(type_coord x, ty
   double t1 = (tii == 2) ? grid->time[ti[igrid]+1] : t0+1;
   double tsrch = (tii == 2) ? time : t0;
 
-  status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid],
+  status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid],
 			  &xsi, &eta, &zeta, gcode, ti[igrid],
 			  tsrch, t0, t1, interp_method, gridindexingtype);
   CHECKSTATUS(status);
@@ -663,7 +663,7 @@ static inline StatusCode temporal_interpolationUV_c_grid(type_coord x, type_coor
     float u0, u1, v0, v1;
     double t0 = grid->time[ti[igrid]]; double t1 = grid->time[ti[igrid]+1];
     /* Identify grid cell to sample through local linear search */
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], time, t0, t1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], time, t0, t1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
     if (grid->zdim==1){
       float data2D_U[2][2][2], data2D_V[2][2][2];
       if (gridindexingtype == NEMO) {
@@ -695,7 +695,7 @@ static inline StatusCode temporal_interpolationUV_c_grid(type_coord x, type_coor
     return SUCCESS;
   } else {
     double t0 = grid->time[ti[igrid]];
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], t0, t0, t0+1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], t0, t0, t0+1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
     if (grid->zdim==1){
       float data2D_U[2][2][2], data2D_V[2][2][2];
       if (gridindexingtype == NEMO) {
@@ -884,7 +884,7 @@ static inline StatusCode temporal_interpolationUVW_c_grid(type_coord x, type_coo
     float u0, u1, v0, v1, w0, w1;
     double t0 = grid->time[ti[igrid]]; double t1 = grid->time[ti[igrid]+1];
     /* Identify grid cell to sample through local linear search */
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zet, gcode, ti[igrid], time, t0, t1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zet, gcode, ti[igrid], time, t0, t1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
     status = getCell3D(U, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_U, 0); CHECKSTATUS(status);
     status = getCell3D(V, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_V, 0); CHECKSTATUS(status);
     status = getCell3D(W, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_W, 0); CHECKSTATUS(status);
@@ -900,7 +900,7 @@ static inline StatusCode temporal_interpolationUVW_c_grid(type_coord x, type_coo
     return SUCCESS;
   } else {
     double t0 = grid->time[ti[igrid]];
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zet, gcode, ti[igrid], t0, t0, t0+1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zet, gcode, ti[igrid], t0, t0, t0+1, CGRID_VELOCITY, gridindexingtype); CHECKSTATUS(status);
     status = getCell3D(U, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_U, 1); CHECKSTATUS(status);
     status = getCell3D(V, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_V, 1); CHECKSTATUS(status);
     status = getCell3D(W, xi[igrid], yi[igrid], zi[igrid], ti[igrid], data3D_W, 1); CHECKSTATUS(status);
@@ -1100,7 +1100,7 @@ static inline StatusCode temporal_interpolation_slip(type_coord x, type_coord y,
     float u0, u1, v0, v1, w0, w1;
     double t0 = grid->time[ti[igrid]]; double t1 = grid->time[ti[igrid]+1];
     /* Identify grid cell to sample through local linear search */
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], time, t0, t1, interp_method, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], time, t0, t1, interp_method, gridindexingtype); CHECKSTATUS(status);
     if (grid->zdim==1){
       float data2D_U[2][2][2], data2D_V[2][2][2], data2D_W[2][2][2];
       status = getCell2D(U, xi[igrid], yi[igrid], ti[igrid], data2D_U, 0); CHECKSTATUS(status);
@@ -1143,7 +1143,7 @@ static inline StatusCode temporal_interpolation_slip(type_coord x, type_coord y,
 
   } else {
     double t0 = grid->time[ti[igrid]];
-    status = search_indices(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], t0, t0, t0+1, interp_method, gridindexingtype); CHECKSTATUS(status);
+    status = search_indices_shared(x, y, z, grid, &xi[igrid], &yi[igrid], &zi[igrid], &xsi, &eta, &zeta, gcode, ti[igrid], t0, t0, t0+1, interp_method, gridindexingtype); CHECKSTATUS(status);
     if (grid->zdim==1){
       float data2D_U[2][2][2], data2D_V[2][2][2], data2D_W[2][2][2];
       status = getCell2D(U, xi[igrid], yi[igrid], ti[igrid], data2D_U, 1); CHECKSTATUS(status);
@@ -1173,6 +1173,26 @@ static inline StatusCode temporal_interpolation_slip(type_coord x, type_coord y,
   return SUCCESS;
 }
 
+/* Whether location (x, y) lies outside of the bounding box of the grid of Field f,
+ * in which case the index search of f returns ERROR_OUT_OF_BOUNDS */
+static inline int outside_bounding_box(type_coord x, type_coord y, CField *f)
+{
+  GridCode gcode = f->grid->gtype;
+  CStructuredGrid *grid = f->grid->grid;
+  float *xy_minmax = grid->lonlat_minmax;
+  if (gcode == RECTILINEAR_Z_GRID || gcode == RECTILINEAR_S_GRID){
+    if ((grid->zonal_periodic == 0) && (grid->xdim > 1) && ((x < xy_minmax[0]) || (x > xy_minmax[1])))
+      return 1;
+    return (grid->ydim > 1) && ((y < xy_minmax[2]) || (y > xy_minmax[3]));
+  }
+  if ((grid->zonal_periodic == 0) && ((x < xy_minmax[0]) || (x > xy_minmax[1]))){
+    float (* xgrid)[grid->xdim] = (float (*)[grid->xdim]) grid->lon;
+    if (xgrid[0][0] < xgrid[0][grid->xdim-1]) {return 1;}
+    else if (x < xgrid[0][0] && x > xgrid[0][grid->xdim-1]) {return 1;}
+  }
+  return (y < xy_minmax[2]) || (y > xy_minmax[3]);
+}
+
 static inline StatusCode temporal_interpolation(type_coord x, type_coord y, type_coord z, double time, CField *f,
                                                int *xi, int *yi, int *zi, int *ti,
                                                float *value, int interp_method, int gridindexingtype)
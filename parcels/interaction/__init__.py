@@ -1,5 +1,7 @@
 from .baseinteractionkernel import BaseInteractionKernel  # noqa
 from .interactionkernelsoa import InteractionKernelSOA  # noqa
+from .haloexchange import HaloExchange  # noqa
+from .mutationbuffer import MutationBuffer  # noqa
 
 
-__all__ = ["BaseInteractionKernel", "InteractionKernelSOA"]
+__all__ = ["BaseInteractionKernel", "InteractionKernelSOA", "HaloExchange", "MutationBuffer"]
@@ -1,11 +1,6 @@
 import inspect
 from sys import version_info
 
-try:
-    from mpi4py import MPI
-except:
-    MPI = None
-
 from parcels.kernel.basekernel import BaseKernel
 
 __all__ = ['BaseInteractionKernel']
@@ -24,9 +19,6 @@ class BaseInteractionKernel(BaseKernel):
     def __init__(self, fieldset, ptype, pyfunc=None, funcname=None,
                  funccode=None, py_ast=None, funcvars=None,
                  c_include="", delete_cfiles=True):
-        if MPI is not None and MPI.COMM_WORLD.Get_size() > 1:
-            raise NotImplementedError("InteractionKernels are not supported in an MPI environment. Please run your simulation outside MPI.")
-
         if pyfunc is not None:
             if isinstance(pyfunc, list):
                 funcname = ''.join([func.__name__ for func in pyfunc])
@@ -44,15 +36,6 @@ class BaseInteractionKernel(BaseKernel):
             else:
                 self._pyfunc = [pyfunc]
 
-        if self._ptype.uses_jit:
-            raise NotImplementedError("JIT mode is not supported for"
-                                      " InteractionKernels. Please run your"
-                                      " simulation in SciPy mode.")
-
-    @property
-    def _cache_key(self):
-        raise NotImplementedError
-
     @staticmethod
     def fix_indentation(string):
         raise NotImplementedError
@@ -81,20 +64,6 @@ class BaseInteractionKernel(BaseKernel):
                     )
         return numkernelargs
 
-    def remove_lib(self):
-        # Currently, no libs are generated/linked, so nothing has to be
-        # removed
-        pass
-
-    def get_kernel_compile_files(self):
-        raise NotImplementedError
-
-    def compile(self, compiler):
-        raise NotImplementedError
-
-    def load_lib(self):
-        raise NotImplementedError
-
     def merge(self, kernel, kclass):
         assert self.__class__ == kernel.__class__
         funcname = self.funcname + kernel.funcname
@@ -113,15 +82,5 @@ class BaseInteractionKernel(BaseKernel):
             kernel = BaseInteractionKernel(self.fieldset, self.ptype, pyfunc=kernel)
         return kernel.merge(self, BaseInteractionKernel)
 
-    @staticmethod
-    def cleanup_remove_files(lib_file, all_files_array, delete_cfiles):
-        raise NotImplementedError
-
-    @staticmethod
-    def cleanup_unload_lib(lib):
-        raise NotImplementedError
-
     def execute_jit(self, pset, endtime, dt):
-        raise NotImplementedError("JIT mode is not supported for"
-                                  " InteractionKernels. Please run your"
-                                  " simulation in SciPy mode.")
+        raise NotImplementedError
@@ -0,0 +1,148 @@
+"""Exchange of halo (ghost) particles between MPI ranks for InteractionKernels"""
+import numpy as np
+try:
+    from mpi4py import MPI
+except:
+    MPI = None
+
+__all__ = ['HaloExchange', 'halo_mask']
+
+# Variables that are not routed back from a ghost particle to its owner
+_local_variables = ['id', 'fileid', 'exception', 'xi', 'yi', 'zi', 'ti', 'horiz_dist', 'vert_dist']
+
+
+def halo_mask(values, bbox, inter_dist_vert, inter_dist_horiz, spherical=True):
+    """Returns a boolean mask of the particles that lie within the interaction
+    distance of a bounding box, i.e. the particles that can have neighbours
+    inside that box.
+
+    :param values: numpy array ([depth, lat, lon], n_particles) with the particle coordinates
+    :param bbox: bounding box [depth_min, depth_max, lat_min, lat_max, lon_min, lon_max]
+    :param inter_dist_vert: interaction distance (vertical) in m
+    :param inter_dist_horiz: interaction distance (horizontal) in m, or in mesh units on flat meshes
+    :param spherical: whether the coordinates are in degrees on a spherical mesh
+    """
+    depth_min, depth_max, lat_min, lat_max, lon_min, lon_max = bbox
+    if spherical:
+        dlat = inter_dist_horiz / 1852. / 60.
+        max_lat = min(max(abs(lat_min), abs(lat_max)) + dlat, 90.)
+        coslat = np.cos(np.radians(max_lat))
+        dlon = dlat / coslat if coslat > 1e-6 else 360.
+    else:
+        dlat = dlon = inter_dist_horiz
+    return ((values[0] >= depth_min - inter_dist_vert) & (values[0] <= depth_max + inter_dist_vert)
+            & (values[1] >= lat_min - dlat) & (values[1] <= lat_max + dlat)
+            & (values[2] >= lon_min - dlon) & (values[2] <= lon_max + dlon))
+
+
+class HaloExchange(object):
+    """Class that shares the particles near the boundary of each MPI rank with the
+    other ranks, so that InteractionKernels see neighbours across partitions.
+
+    Before the neighbour search, :meth:`add_ghosts` appends copies ('ghosts') of all
+    active particles of other ranks that lie within the interaction distance of the
+    bounding box of the local active particles. After the mutators have been applied,
+    :meth:`return_ghosts` removes the ghosts again and routes their changes back to
+    the owning rank: finite changes to floating point Variables are sent as increments
+    (so that contributions from several ranks add up), other changes (e.g. to `state`,
+    or from or to non-finite values) overwrite the value on the owner.
+
+    Zonally periodic domains are not taken into account when selecting ghosts.
+
+    :param comm: MPI communicator (default MPI.COMM_WORLD)
+    """
+
+    def __init__(self, comm=None):
+        self.comm = MPI.COMM_WORLD if comm is None and MPI is not None else comm
+        self.nlocal = None
+        self._ghosts = None
+        self._owners = None
+
+    def add_ghosts(self, pset, time, dt):
+        """Appends the ghost particles of the other ranks to the ParticleSet
+
+        :param pset: ParticleSet (SoA) with an interaction distance
+        :param time: time at which the interaction is evaluated
+        :param dt: timestep of the interaction
+        """
+        data = pset.collection.data
+        rank = self.comm.Get_rank()
+        size = self.comm.Get_size()
+        active = pset.active_particles_mask(time, dt)
+        values = np.vstack((data['depth'], data['lat'], data['lon']))
+
+        bbox = None
+        if np.any(active):
+            act = values[:, active]
+            bbox = [act[0].min(), act[0].max(), act[1].min(), act[1].max(), act[2].min(), act[2].max()]
+        bboxes = self.comm.allgather(bbox)
+
+        tree = pset._neighbor_tree
+        spherical = pset.fieldset.gridset.grids[0].mesh == 'spherical'
+        sendbuf = []
+        for r in range(size):
+            if r == rank or bboxes[r] is None:
+                sendbuf.append(None)
+                continue
+            mask = active & halo_mask(values, bboxes[r], tree.inter_dist_vert, tree.inter_dist_horiz, spherical)
+            sendbuf.append({v: data[v][mask] for v in data} if np.any(mask) else None)
+        recvbuf = self.comm.alltoall(sendbuf)
+
+        self.nlocal = len(pset)
+        received = [(r, ghosts) for r, ghosts in enumerate(recvbuf) if ghosts is not None]
+        if len(received) == 0:
+            self._ghosts = None
+            self._owners = None
+            return
+        self._ghosts = {v: np.concatenate([ghosts[v] for _, ghosts in received], axis=0) for v in data}
+        self._owners = np.concatenate([np.full(len(ghosts['id']), r) for r, ghosts in received])
+        pset.collection.replace_data({v: np.concatenate((data[v], self._ghosts[v]), axis=0) for v in data})
+        pset._dirty_neighbor = True
+
+    def return_ghosts(self, pset):
+        """Removes the ghost particles from the ParticleSet and applies their changes
+        on the owning ranks. Must be called on all ranks after :meth:`add_ghosts`
+
+        :param pset: ParticleSet to which the ghosts were added
+        """
+        size = self.comm.Get_size()
+        sendbuf = [None] * size
+        if self._ghosts is not None:
+            data = pset.collection.data
+            ghost_data = {v: data[v][self.nlocal:] for v in data}
+            pset.collection.replace_data({v: data[v][:self.nlocal] for v in data})
+            pset._dirty_neighbor = True
+
+            for r in np.unique(self._owners):
+                owned = self._owners == r
+                update = {'id': ghost_data['id'][owned], 'increments': {}, 'changes': {}}
+                for v in data:
+                    if v in _local_variables:
+                        continue
+                    new, old = ghost_data[v][owned], self._ghosts[v][owned]
+                    changed = new != old
+                    if np.issubdtype(new.dtype, np.floating):
+                        changed &= ~(np.isnan(new) & np.isnan(old))
+                        # Only finite changes can be added up; others overwrite the owner's value
+                        additive = changed & np.isfinite(new) & np.isfinite(old)
+                        if np.any(additive):
+                            update['increments'][v] = (additive, new[additive] - old[additive])
+                        changed &= ~additive
+                    if np.any(changed):
+                        update['changes'][v] = (changed, new[changed])
+                if len(update['increments']) > 0 or len(update['changes']) > 0:
+                    sendbuf[r] = update
+        recvbuf = self.comm.alltoall(sendbuf)
+
+        data = pset.collection.data
+        for update in recvbuf:
+            if update is None:
+                continue
+            idx, _ = pset.collection.indices_by_IDs(update['id'])
+            for v, (additive, increment) in update['increments'].items():
+                data[v][idx[additive]] += increment
+            for v, (changed, new) in update['changes'].items():
+                data[v][idx[changed]] = new
+        self.nlocal = None
+        self._ghosts = None
+        self._owners = None
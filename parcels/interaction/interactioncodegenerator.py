@@ -0,0 +1,134 @@
+"""Generation of C code for the stock InteractionKernels in JIT mode"""
+import cgen as c
+
+from parcels.application_kernels.interaction import AsymmetricAttraction
+from parcels.application_kernels.interaction import MergeWithNearestNeighbor
+from parcels.application_kernels.interaction import NearestNeighborWithinRange
+from parcels.application_kernels.interaction import attraction_velocity_param
+
+__all__ = ['InteractionLoopGenerator', 'InteractionCCode']
+
+
+class InteractionCCode(object):
+    """C implementation of an interaction kernel function.
+
+    The C function loops over the particles to evaluate and their neighbours, which
+    are given as CSR arrays (`indptr`, `indices` and the distances `vert_dist` and
+    `horiz_dist` per neighbour pair). Instead of changing the particles directly, it
+    writes the changes as deferred array writes into `mut`, an array of shape
+    (len(mutations), num_particles), which is applied after all particles have been
+    evaluated. For 'set' mutations, entries that are left NaN are not written; 'add'
+    mutations are accumulated.
+
+    :param body: C code of the loop body, evaluated for each particle index `i`
+    :param mutations: list of (variable name, 'set' or 'add') tuples, one for each row of `mut`
+    :param variables: names of the Variables that the particle class must have
+    """
+
+    def __init__(self, body, mutations, variables):
+        self.body = body
+        self.mutations = mutations
+        self.variables = variables
+
+
+_nearest_neighbor_ccode = InteractionCCode("""
+double min_dist = -1;
+double neighbor_id = -1;
+for (j = indptr[k]; j < indptr[k+1]; ++j) {
+  double dist = sqrt(horiz_dist[j]*horiz_dist[j] + vert_dist[j]*vert_dist[j]);
+  if (dist < min_dist || min_dist < 0) {
+    min_dist = dist;
+    neighbor_id = particles->id[indices[j]];
+  }
+}
+mut[i] = neighbor_id;
+""", mutations=[('nearest_neighbor', 'set')], variables=['nearest_neighbor'])
+
+_merge_ccode = InteractionCCode("""
+for (j = indptr[k]; j < indptr[k+1]; ++j) {
+  int n = indices[j];
+  if (particles->id[n] == particles->nearest_neighbor[i]) {
+    if (particles->nearest_neighbor[n] == particles->id[i] && particles->id[i] < particles->id[n]) {
+      double mass = particles->mass[i];
+      double nmass = particles->mass[n];
+      mut[i] = (mass * particles->lat[i] + nmass * particles->lat[n]) / (mass + nmass);
+      mut[num_particles + i] = (mass * particles->lon[i] + nmass * particles->lon[n]) / (mass + nmass);
+      mut[2*num_particles + i] = (mass * particles->depth[i] + nmass * particles->depth[n]) / (mass + nmass);
+      mut[3*num_particles + i] = mass + nmass;
+      mut[4*num_particles + n] = DELETE;
+    }
+    break;
+  }
+}
+""", mutations=[('lat', 'set'), ('lon', 'set'), ('depth', 'set'), ('mass', 'set'), ('state', 'set')],
+    variables=['nearest_neighbor', 'mass'])
+
+_asymmetric_attraction_ccode = InteractionCCode("""
+double velocity_param = %r;
+if (!particles->attractor[i])
+  continue;
+for (j = indptr[k]; j < indptr[k+1]; ++j) {
+  int n = indices[j];
+  if (particles->attractor[n])
+    continue;
+  double dlat = particles->lat[i] - particles->lat[n];
+  double dlon = particles->lon[i] - particles->lon[n];
+  double ddepth = particles->depth[i] - particles->depth[n];
+  double dx_norm = sqrt(dlat*dlat + dlon*dlon + ddepth*ddepth);
+  double distance = velocity_param / (dx_norm*dx_norm) * particles->dt[n];
+  mut[n] += distance * dlat / dx_norm;
+  mut[num_particles + n] += distance * dlon / dx_norm;
+  mut[2*num_particles + n] += distance * ddepth / dx_norm;
+}
+""" % attraction_velocity_param, mutations=[('lat', 'add'), ('lon', 'add'), ('depth', 'add')], variables=['attractor'])
+
+# C implementations of the interaction kernels in parcels.application_kernels.interaction
+stock_interaction_ccode = {NearestNeighborWithinRange: _nearest_neighbor_ccode,
+                           MergeWithNearestNeighbor: _merge_ccode,
+                           AsymmetricAttraction: _asymmetric_attraction_ccode}
+
+
+class InteractionLoopGenerator(object):
+    """Code generator class that generates the compilable C code for a set of
+    interaction kernel functions, each in its own loop over the particles to evaluate"""
+
+    def __init__(self, ptype=None):
+        self.ptype = ptype
+
+    def generate(self, ccodes):
+        """Returns the C code, with a function `particle_loop` that executes the
+        loop of the `func`-th element of `ccodes`
+
+        :param ccodes: list of :class:`InteractionCCode` objects (or None, for functions that run in Python)
+        """
+        ccode = []
+        pname = self.ptype.name + 'p'
+
+        ccode += [str(c.Include("parcels.h", system=False))]
+        ccode += [str(c.Include("math.h", system=False))]
+
+        vdeclp = [c.Pointer(c.POD(v.dtype, v.name)) for v in self.ptype.variables]
+        ccode += [str(c.Typedef(c.GenerableStruct("", vdeclp, declname=pname)))]
+
+        loop_args = [c.Value("int", "num_evaluate"), c.Pointer(c.Value("int", "evaluate")),
+                     c.Pointer(c.Value("int", "indptr")), c.Pointer(c.Value("int", "indices")),
+                     c.Pointer(c.Value("double", "vert_dist")), c.Pointer(c.Value("double", "horiz_dist")),
+                     c.Pointer(c.Value(pname, "particles")), c.Value("int", "num_particles"),
+                     c.Pointer(c.Value("double", "mut"))]
+        cases = []
+        for func, ccode_func in enumerate(ccodes):
+            if ccode_func is None:
+                continue
+            fname = "interaction_loop_%d" % func
+            body = [c.Value("int", "i, j, k"),
+                    c.For("k = 0", "k < num_evaluate", "++k",
+                          c.Block([c.Assign("i", "evaluate[k]"), c.LiteralLines(ccode_func.body)]))]
+            fdecl = c.FunctionDeclaration(c.Static(c.Value("void", fname)), loop_args)
+            ccode += [str(c.FunctionBody(fdecl, c.Block(body)))]
+            cases += ["case %d: %s(num_evaluate, evaluate, indptr, indices, vert_dist, horiz_dist, particles, num_particles, mut); break;" % (func, fname)]
+
+        args = [c.Value("int", "func")] + loop_args
+        fbody = c.Block([c.LiteralLines("\nswitch (func) {\n%s\n}" % "\n".join(cases))])
+        fdecl = c.FunctionDeclaration(c.Value("void", "particle_loop"), args)
+        ccode += [str(c.FunctionBody(fdecl, fbody))]
+        return "\n\n".join(ccode)
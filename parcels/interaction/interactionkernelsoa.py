@@ -1,6 +1,7 @@
 import math  # noqa
 import random  # noqa
-from collections import defaultdict
+from ctypes import byref
+from ctypes import c_int
 
 import numpy as np
 try:
@@ -12,6 +13,10 @@ from parcels.field import NestedField
 from parcels.field import SummedField
 from parcels.field import VectorField
 from parcels.interaction.baseinteractionkernel import BaseInteractionKernel
+from parcels.interaction.haloexchange import HaloExchange
+from parcels.interaction.interactioncodegenerator import InteractionLoopGenerator
+from parcels.interaction.interactioncodegenerator import stock_interaction_ccode
+from parcels.interaction.mutationbuffer import MutationBuffer
 import parcels.rng as ParcelsRandom  # noqa
 from parcels.tools.statuscodes import StateCode, OperationCode, ErrorCode
 from parcels.tools.loggers import logger
@@ -46,13 +51,29 @@ class InteractionKernelSOA(BaseInteractionKernel):
             numkernelargs.count(numkernelargs[0]) == len(numkernelargs), \
             'Interactionkernels take exactly 5 arguments: particle, fieldset, time, neighbors, mutator'
 
-        # At this time, JIT mode is not supported for InteractionKernels,
-        # so there is no need for any further "processing" of pyfunc's.
+        # In JIT mode, the stock interaction kernels are generated in C; other
+        # interaction kernel functions are executed in Python on the particle data.
+        self._ccodes = [None] * len(self._pyfunc)
+        if self._ptype.uses_jit:
+            varnames = [v.name for v in self._ptype.variables]
+            for i, func in enumerate(self._pyfunc):
+                if func in stock_interaction_ccode:
+                    self._ccodes[i] = stock_interaction_ccode[func]
+                    missing = [v for v in self._ccodes[i].variables if v not in varnames]
+                    if len(missing) > 0:
+                        raise RuntimeError('Particle class needs Variable(s) %s for InteractionKernel %s' % (missing, func.__name__))
+                else:
+                    logger.warning_once('InteractionKernel %s has no C implementation and is executed in Python' % func.__name__)
+            if any(ccode is not None for ccode in self._ccodes):
+                self.ccode = InteractionLoopGenerator(ptype=self._ptype).generate(self._ccodes)
 
-    def execute_jit(self, pset, endtime, dt):
-        raise NotImplementedError("JIT mode is not supported for"
-                                  " InteractionKernels. Please run your"
-                                  " simulation in SciPy mode.")
+    def compile(self, compiler):
+        if self.ccode:
+            super().compile(compiler)
+
+    def load_lib(self):
+        if self.ccode:
+            super().load_lib()
 
     def __del__(self):
         # Clean-up the in-memory dynamic linked libraries.
@@ -70,6 +91,11 @@ class InteractionKernelSOA(BaseInteractionKernel):
             kernel = InteractionKernelSOA(self.fieldset, self.ptype, pyfunc=kernel)
         return kernel.merge(self, InteractionKernelSOA)
 
+    def execute_jit(self, pset, endtime, dt):
+        """Performs the core update loop, with the interaction kernel functions
+        that have a C implementation executed via JIT"""
+        self.execute_interactions(pset, endtime, dt, use_jit=True)
+
     def execute_python(self, pset, endtime, dt):
         """Performs the core update loop via Python
 
@@ -80,48 +106,94 @@ class InteractionKernelSOA(BaseInteractionKernel):
         """
         if self.fieldset is not None:
             for f in self.fieldset.get_fields():
-                if type(f) in [VectorField, NestedField, SummedField]:
+                if type(f) in [VectorField, NestedField, SummedField] or f.shared_memory is not None:
                     continue
                 f.data = np.array(f.data)
 
-        reset_particle_idx = []
-        for pyfunc in self._pyfunc:
+        self.execute_interactions(pset, endtime, dt, use_jit=False)
+
+    def execute_interactions(self, pset, endtime, dt, use_jit=False, comm=None):
+        """Evaluates all interaction kernel functions once on the started particles,
+        and applies their mutations after each function
+
+        :param use_jit: whether to execute the functions that have a C implementation in JIT
+        :param comm: communicator over which the particles are distributed (default MPI.COMM_WORLD)
+        """
+        # Under MPI, particles of other ranks near the local particles are added as ghosts
+        comm = MPI.COMM_WORLD if comm is None and MPI is not None else comm
+        halo = HaloExchange(comm) if comm is not None and comm.Get_size() > 1 else None
+
+        for func, pyfunc in enumerate(self._pyfunc):
+            if halo is not None:
+                halo.add_ghosts(pset, endtime, dt)
             pset.compute_neighbor_tree(endtime, dt)
             active_idx = pset._active_particle_idx
+            nlocal = halo.nlocal if halo is not None else len(pset)
 
-            mutator = defaultdict(lambda: [])
+            # Ghost particles are only neighbours; they are evaluated on their own rank
+            ptime = pset.collection.data['time'][active_idx]
+            evaluate_idx = active_idx[((endtime-ptime)/dt > -1e-7) & (active_idx < nlocal)]
+            # Particles that are less than a timestep away from endtime interact over the remaining time
+            reset_idx = evaluate_idx[(endtime-pset.collection.data['time'][evaluate_idx])/dt < 1]
+            pset.collection.data['dt'][reset_idx] = endtime-pset.collection.data['time'][reset_idx]
 
-            # Loop only over particles that are in a positive state and have started.
-            for particle_idx in active_idx:
-                p = pset[particle_idx]
-                # Don't use particles that are not started.
-                if (endtime-p.time)/dt <= -1e-7:
-                    continue
-                elif (endtime-p.time)/dt < 1:
-                    p.dt = endtime-p.time
-                    reset_particle_idx.append(particle_idx)
-
-                neighbors = pset.neighbors_by_index(particle_idx)
-                try:
-                    res = pyfunc(p, pset.fieldset, p.time, neighbors, mutator)
-                except Exception as e:
-                    res = ErrorCode.Error
-                    p.exception = e
-
-                # InteractionKernels do not implement a way to recover
-                # from errors.
-                if res != StateCode.Success:
-                    logger.warning_once("Some InteractionKernel was not completed succesfully, likely because a Particle threw an error that was not captured.")
-
-            for particle_idx in active_idx:
-                p = pset[particle_idx]
-                try:
-                    for mutator_func, args in mutator[p.id]:
-                        mutator_func(p, *args)
-                except KeyError:
-                    pass
-            for particle_idx in reset_particle_idx:
-                pset[particle_idx].dt = dt
+            if use_jit and self._ccodes[func] is not None:
+                self.evaluate_jit(pset, func, evaluate_idx)
+            else:
+                self.evaluate_python(pset, pyfunc, evaluate_idx)
+
+            if halo is not None:
+                halo.return_ghosts(pset)
+            pset.collection.data['dt'][reset_idx] = dt
+
+    def evaluate_python(self, pset, pyfunc, evaluate_idx):
+        """Evaluates an interaction kernel function on each particle in Python, and applies
+        the changes in the :class:`MutationBuffer` afterwards"""
+        mutator = MutationBuffer()
+        indptr, indices, vert_dist, horiz_dist = pset.neighbors_by_indices(evaluate_idx)
+
+        for k, particle_idx in enumerate(evaluate_idx):
+            p = pset[particle_idx]
+            row = slice(indptr[k], indptr[k+1])
+            neighbors = pset.neighbors_from_indices(indices[row], (vert_dist[row], horiz_dist[row]))
+            try:
+                res = pyfunc(p, pset.fieldset, p.time, neighbors, mutator)
+            except Exception as e:
+                res = ErrorCode.Error
+                p.exception = e
+
+            # InteractionKernels do not implement a way to recover
+            # from errors.
+            if res != StateCode.Success:
+                logger.warning_once("Some InteractionKernel was not completed succesfully, likely because a Particle threw an error that was not captured.")
+
+        mutator.apply(pset)
+
+    def evaluate_jit(self, pset, func, evaluate_idx):
+        """Evaluates the C implementation of the `func`-th interaction kernel function
+        on all particles at once, and applies its deferred writes"""
+        if len(evaluate_idx) == 0:
+            return
+        ccode = self._ccodes[func]
+        indptr, indices, vert_dist, horiz_dist = pset.neighbors_by_indices(evaluate_idx)
+        num_particles = len(pset)
+        mut = np.empty((len(ccode.mutations), num_particles), dtype=np.float64)
+        for row, (_, op) in enumerate(ccode.mutations):
+            mut[row] = 0 if op == 'add' else np.nan
+
+        cargs = [np.ascontiguousarray(evaluate_idx, dtype=np.int32), indptr.astype(np.int32), indices.astype(np.int32),
+                 np.ascontiguousarray(vert_dist, dtype=np.float64), np.ascontiguousarray(horiz_dist, dtype=np.float64)]
+        cargs = [np.ctypeslib.as_ctypes(a) if len(a) > 0 else None for a in cargs]
+        self._function(c_int(func), c_int(len(evaluate_idx)), *cargs,
+                       byref(pset.ctypes_struct), c_int(num_particles), np.ctypeslib.as_ctypes(mut.reshape(-1)))
+
+        data = pset.collection.data
+        for row, (var, op) in enumerate(ccode.mutations):
+            if op == 'add':
+                data[var] += mut[row].astype(data[var].dtype)
+            else:
+                written = ~np.isnan(mut[row])
+                data[var][written] = mut[row][written]
 
     def execute(self, pset, endtime, dt, recovery=None, output_file=None, execute_once=False):
         """Execute this Kernel over a ParticleSet for several timesteps
@@ -139,13 +211,10 @@ class InteractionKernelSOA(BaseInteractionKernel):
         if pset.fieldset is not None:
             for g in pset.fieldset.gridset.grids:
                 if len(g.load_chunk) > g.chunk_not_loaded:  # not the case if a field in not called in the kernel
-                    g.load_chunk = np.where(g.load_chunk == g.chunk_loaded_touched,
-                                            g.chunk_deprecated, g.load_chunk)
+                    g.load_chunk[g.load_chunk == g.chunk_loaded_touched] = g.chunk_deprecated
 
         # Execute the kernel over the particle set
         if self.ptype.uses_jit:
-            # This should never happen, as it is already checked in the
-            # initialization.
             self.execute_jit(pset, endtime, dt)
         else:
             self.execute_python(pset, endtime, dt)
@@ -0,0 +1,104 @@
+"""Buffer for the changes that interaction kernels make to particles"""
+from collections import defaultdict
+
+import numpy as np
+
+from parcels.tools.statuscodes import OperationCode
+
+__all__ = ['MutationBuffer']
+
+
+class MutationBuffer(defaultdict):
+    """Buffer of the changes that interaction kernel functions make to the particles.
+
+    The changes are only applied after the interaction kernel function has been
+    evaluated on all particles, so that all particles see the same state. Changes
+    are queued with the typed methods :meth:`set`, :meth:`add`, :meth:`delete` and
+    :meth:`merge`, which are stored as columns of particle ids and values per
+    Variable, and applied on the particle arrays in one vectorised pass.
+
+    For backwards compatibility, the buffer can also be used as a dictionary of
+    lists keyed by particle id, holding (function, args) tuples, as in
+    `mutator[particle.id].append((f, args))`. These functions are called as
+    `f(particle, *args)` after the typed changes have been applied.
+
+    When the same particle is changed more than once in one pass, the changes are
+    resolved as follows: first all merges are applied (using the values from before
+    the pass), then all sets (where the last set of a Variable wins), then all adds
+    (which are accumulated) and then all deletes. Mutations of particles that are
+    not in the ParticleSet are ignored.
+    """
+
+    def __init__(self):
+        super().__init__(list)
+        self._sets = defaultdict(lambda: ([], []))
+        self._adds = defaultdict(lambda: ([], []))
+        self._merges = defaultdict(lambda: ([], []))
+        self._deletes = []
+
+    def set(self, pid, var, value):
+        """Set Variable `var` of particle `pid` to `value`"""
+        ids, values = self._sets[var]
+        ids.append(pid)
+        values.append(value)
+
+    def add(self, pid, var, value):
+        """Add `value` to Variable `var` of particle `pid`"""
+        ids, values = self._adds[var]
+        ids.append(pid)
+        values.append(value)
+
+    def delete(self, pid):
+        """Delete particle `pid`"""
+        self._deletes.append(pid)
+
+    def merge(self, pid, other_pid, weight='mass', variables=('lat', 'lon', 'depth')):
+        """Merge particle `other_pid` into particle `pid`
+
+        The `variables` of particle `pid` are set to the `weight`-weighted average of
+        both particles, its `weight` is set to the sum of both weights and particle
+        `other_pid` is deleted.
+        """
+        ids, other_ids = self._merges[(weight, tuple(variables))]
+        ids.append(pid)
+        other_ids.append(other_pid)
+
+    def apply(self, pset):
+        """Apply all buffered changes to the particles of `pset`"""
+        data = pset.collection.data
+        to_index = pset.collection.indices_by_IDs
+
+        deletes = [self._deletes]
+        for (weight, variables), (ids, other_ids) in self._merges.items():
+            idx, found = to_index(ids)
+            other_idx, other_found = to_index(other_ids)
+            found &= other_found
+            idx, other_idx = idx[found], other_idx[found]
+            w = data[weight][idx]
+            other_w = data[weight][other_idx]
+            merged = {var: (w*data[var][idx] + other_w*data[var][other_idx]) / (w + other_w) for var in variables}
+            for var in variables:
+                data[var][idx] = merged[var]
+            data[weight][idx] = w + other_w
+            deletes.append(data['id'][other_idx])
+
+        for var, (ids, values) in self._sets.items():
+            idx, found = to_index(ids)
+            data[var][idx[found]] = np.asarray(values, dtype=data[var].dtype)[found]
+
+        for var, (ids, values) in self._adds.items():
+            idx, found = to_index(ids)
+            np.add.at(data[var], idx[found], np.asarray(values, dtype=data[var].dtype)[found])
+
+        idx, found = to_index(np.concatenate(deletes))
+        data['state'][idx[found]] = OperationCode.Delete
+
+        # Mutator functions that were added to the dictionary.
+        if len(self) > 0:
+            idx, found = to_index(list(self.keys()))
+            for (mutations, particle_idx, is_found) in zip(self.values(), idx, found):
+                if not is_found:
+                    continue
+                p = pset[particle_idx]
+                for mutator_func, args in mutations:
+                    mutator_func(p, *args)
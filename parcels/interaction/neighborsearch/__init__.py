@@ -3,7 +3,10 @@ from parcels.interaction.neighborsearch.hashspherical import HashSphericalNeighb
 from parcels.interaction.neighborsearch.bruteforce import BruteFlatNeighborSearch  # noqa
 from parcels.interaction.neighborsearch.bruteforce import BruteSphericalNeighborSearch  # noqa
 from parcels.interaction.neighborsearch.kdtreeflat import KDTreeFlatNeighborSearch  # noqa
+from parcels.interaction.neighborsearch.kdtreespherical import KDTreeSphericalNeighborSearch  # noqa
+from parcels.interaction.neighborsearch.verlet import VerletNeighborSearch  # noqa
 
 __all__ = ["HashFlatNeighborSearch", "HashSphericalNeighborSearch",
            "BruteFlatNeighborSearch",
-           "BruteSphericalNeighborSearch", "KDTreeFlatNeighborSearch"]
+           "BruteSphericalNeighborSearch", "KDTreeFlatNeighborSearch",
+           "KDTreeSphericalNeighborSearch", "VerletNeighborSearch"]
@@ -58,6 +58,91 @@ class BaseNeighborSearch(ABC):
         coor = self._values[:, particle_idx].reshape(3, 1)
         return self.find_neighbors_by_coor(coor)
 
+    def find_all_neighbors(self, particle_idx=None, block_size=2**22):
+        '''Get the neighbors of many particles in one vectorised pass.
+
+        The neighbors are returned in CSR (compressed sparse row) format:
+        the neighbors of particle_idx[k] (not including the particle itself)
+        are neighbor_idx[indptr[k]:indptr[k+1]], with their vertical and
+        horizontal distances in distances[:, indptr[k]:indptr[k+1]].
+
+        :param particle_idx: indices of the particles (default: all active particles).
+        :param block_size: approximate maximum number of candidate pairs
+                           evaluated at once, to limit the memory use.
+        :returns indptr, neighbor_idx, distances
+        '''
+        if particle_idx is None:
+            particle_idx = self.active_idx
+        particle_idx = np.asarray(particle_idx, dtype=int)
+        n_query = len(particle_idx)
+        n_block = max(1, block_size // max(1, self._candidates_per_particle()))
+
+        rows = []
+        neighbor_idx = []
+        distances = []
+        for start in range(0, n_query, n_block):
+            block_idx = particle_idx[start:start+n_block]
+            block_rows, candidates = self._candidate_pairs(block_idx)
+            keep = block_idx[block_rows] != candidates
+            block_rows, candidates = block_rows[keep], candidates[keep]
+            vert_distance, horiz_distance = self._pair_distance(block_idx[block_rows], candidates)
+            close = np.sqrt((horiz_distance/self.inter_dist_horiz)**2
+                            + (vert_distance/self.inter_dist_vert)**2) < 1
+            rows.append(block_rows[close] + start)
+            neighbor_idx.append(candidates[close])
+            distances.append(np.vstack((vert_distance[close], horiz_distance[close])))
+
+        rows = np.concatenate(rows) if n_query > 0 else np.zeros(0, dtype=int)
+        neighbor_idx = np.concatenate(neighbor_idx) if n_query > 0 else np.zeros(0, dtype=int)
+        distances = np.concatenate(distances, axis=1) if n_query > 0 else np.zeros((2, 0))
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(n_query+1, dtype=int)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=n_query))
+        return indptr, neighbor_idx[order], distances[:, order]
+
+    def _candidates_per_particle(self):
+        '''Estimate of the number of candidate neighbors per particle, used
+        to choose the number of particles in a block of find_all_neighbors.'''
+        return len(self.active_idx)
+
+    def _candidate_pairs(self, particle_idx):
+        '''Get the pairs of particles that are possibly neighbors.
+
+        This default implementation returns all active particles as
+        candidates for every particle.
+
+        :param particle_idx: indices of the particles to find neighbors of.
+        :returns rows, candidates: for each pair the position in particle_idx
+                                   and the index of the candidate neighbor.
+        '''
+        active_idx = self.active_idx
+        rows = np.repeat(np.arange(len(particle_idx)), len(active_idx))
+        candidates = np.tile(active_idx, len(particle_idx))
+        return rows, candidates
+
+    def _pair_distance(self, idx1, idx2):
+        """Distance between pairs of particles
+
+        :param idx1: Indices of the first particle of each pair.
+        :param idx2: Indices of the second particle of each pair.
+        :returns vert_dist: distance in the vertical direction.
+        :returns horiz_dist: distance in the horizontal direction
+        """
+        return self._values_distance(self._values[:, idx1], self._values[:, idx2])
+
+    @abstractmethod
+    def _values_distance(self, values1, values2):
+        """Distance between pairs of coordinates
+
+        Distance depends on the mesh (spherical/flat).
+
+        :param values1: Numpy array with 3D coordinates ([depth, lat, lon], n).
+        :param values2: Numpy array with 3D coordinates ([depth, lat, lon], n).
+        :returns vert_dist: distance in the vertical direction.
+        :returns horiz_dist: distance in the horizontal direction
+        """
+        raise NotImplementedError
+
     def update_values(self, new_values, new_active_mask=None):
         '''Update the coordinates of the particles.
 
@@ -155,6 +240,17 @@ class BaseFlatNeighborSearch(BaseNeighborSearch):
         vert_distance = np.abs(self._values[0, subset_idx]-coor[0])
         return (vert_distance, horiz_distance)
 
+    def _values_distance(self, values1, values2):
+        dlat = values2[1] - values1[1]
+        dlon = np.abs(values2[2] - values1[2])
+        if self.periodic_domain_zonal:
+            # Distance through the Western or Eastern boundary
+            dlon = np.minimum(dlon, np.minimum(np.abs(dlon - self.periodic_domain_zonal),
+                                               np.abs(dlon + self.periodic_domain_zonal)))
+        horiz_distance = np.sqrt(dlat**2 + dlon**2)
+        vert_distance = np.abs(values2[0] - values1[0])
+        return (vert_distance, horiz_distance)
+
 
 class BaseSphericalNeighborSearch(BaseNeighborSearch):
     "Base class for a neighbor search with a spherical mesh."
@@ -190,3 +286,11 @@ class BaseSphericalNeighborSearch(BaseNeighborSearch):
         horiz_distances = np.column_stack((horiz_distances, hd2, hd3))
         horiz_distances = np.min(horiz_distances, axis=1)
         return (vert_distances, horiz_distances)
+
+    def _values_distance(self, values1, values2):
+        vert_distances, horiz_distances = spherical_distance(*values1, *values2)
+        if self.periodic_domain_zonal:
+            for shift in [-self.periodic_domain_zonal, self.periodic_domain_zonal]:
+                horiz_distances = np.minimum(horiz_distances, spherical_distance(
+                    values1[0], values1[1], values1[2] + shift, *values2)[1])
+        return (vert_distances, horiz_distances)
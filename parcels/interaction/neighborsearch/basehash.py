@@ -4,6 +4,13 @@ import numpy as np
 
 
 class BaseHashNeighborSearch(ABC):
+    '''Base class for neighbor searches with a cell list.
+
+    The active particles are sorted by the hash of the cell they reside in
+    (_sorted_idx). The occupied cells are stored as a sorted array of hashes
+    (_cell_hashes), with for each cell the position of its first particle in
+    _sorted_idx (_cell_start) and its number of particles (_cell_count).
+    '''
     def find_neighbors_by_coor(self, coor):
         '''Get the neighbors around a certain location.
 
@@ -11,24 +18,125 @@ class BaseHashNeighborSearch(ABC):
         :returns List of particle indices.
         '''
         coor = coor.reshape(3, 1)
-        hash_id = self._values_to_hashes(coor)[0]
-        return self._find_neighbors(hash_id, coor)
+        _, potential_neighbors = self._cell_candidates(coor)
+        return self._get_close_neighbor_dist(coor, potential_neighbors)
 
-    def find_neighbors_by_idx(self, particle_idx):
-        '''Get the neighbors around a certain particle.
+    @abstractmethod
+    def _neighbor_cells(self, hashes, values):
+        '''Get the hashes of the cells around locations.
 
-        Mainly useful for Structure of Array (SoA) datastructure
+        :param hashes: hashes of the cells of the locations.
+        :param values: locations ([depth, lat, lon], # of locations).
+        :returns array of hashes (# of locations, # of neighboring cells),
+                 with -1 for cells that don't exist.
+        '''
+        raise NotImplementedError
+
+    def _neighbor_group_keys(self, hashes, values):
+        '''Keys that group locations with the same neighboring cells.
 
-        :param particle_idx: index of the particle (SoA).
-        :returns List of particle indices
+        :param hashes: hashes of the cells of the locations.
+        :param values: locations ([depth, lat, lon], # of locations).
+        :returns array of keys, (# of locations, # of key components).
         '''
-        hash_id = self._particle_hashes[particle_idx]
-        coor = self._values[:, particle_idx].reshape(3, 1)
-        return self._find_neighbors(hash_id, coor)
+        return hashes.reshape(-1, 1)
 
-    @abstractmethod
-    def _find_neighbors(self, hash_id, coor):
-        raise NotImplementedError
+    def _lon_shifts(self):
+        '''Longitude shifts needed for zonally periodic boundaries.'''
+        if not self.periodic_domain_zonal:
+            return [0]
+        return [0, -self.periodic_domain_zonal, self.periodic_domain_zonal]
+
+    def _candidates_per_particle(self):
+        # The particles in a 3x3x3 neighborhood of cells.
+        return 27*len(self._sorted_idx)//max(1, len(self._cell_hashes))
+
+    def _candidate_pairs(self, particle_idx):
+        return self._cell_candidates(self._values[:, particle_idx])
+
+    def _cell_candidates(self, values):
+        '''Get the particles in the cells around each location.
+
+        The neighboring cells are only computed once for each group of
+        locations with the same neighboring cells.
+
+        :param values: locations ([depth, lat, lon], # of locations).
+        :returns rows, candidates: for each pair the position in values
+                                   and the index of the candidate neighbor.
+        '''
+        n_values = values.shape[1]
+        shifts = self._lon_shifts()
+        rows = []
+        candidates = []
+        for shift in shifts:
+            shifted_values = values
+            if shift != 0:
+                shifted_values = values.copy()
+                shifted_values[2] += shift
+            hashes = self._values_to_hashes(shifted_values)
+            keys = self._neighbor_group_keys(hashes, shifted_values)
+            if n_values == 0:
+                continue
+            _, first, inverse = np.unique(keys, axis=0, return_index=True,
+                                          return_inverse=True)
+            inverse = inverse.reshape(-1)
+
+            # Gather the particles in the neighboring cells of each group.
+            cells = np.sort(self._neighbor_cells(hashes[first], shifted_values[:, first]), axis=1)
+            cells[:, 1:][cells[:, 1:] == cells[:, :-1]] = -1
+            cell_start, cell_count = self._cell_range(cells)
+            cell_count = cell_count.reshape(-1)
+            group_points = self._sorted_idx[np.repeat(cell_start.reshape(-1), cell_count)
+                                            + range_offsets(cell_count)]
+            group_len = cell_count.reshape(cells.shape).sum(axis=1)
+            group_start = np.cumsum(group_len) - group_len
+
+            # Expand the groups to the candidate pairs of each location.
+            lengths = group_len[inverse]
+            rows.append(np.repeat(np.arange(n_values), lengths))
+            candidates.append(group_points[np.repeat(group_start[inverse], lengths) + range_offsets(lengths)])
+
+        if len(rows) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        rows = np.concatenate(rows)
+        candidates = np.concatenate(candidates)
+        if len(shifts) > 1:
+            # Remove pairs that are found through more than one boundary
+            _, unique = np.unique(np.vstack((rows, candidates)), axis=1, return_index=True)
+            rows, candidates = rows[unique], candidates[unique]
+        return rows, candidates
+
+    def _cell_range(self, hashes):
+        '''Get the particles in cells.
+
+        :param hashes: array of cell hashes (-1 for cells that don't exist).
+        :returns cell_start, cell_count: position of the first particle of
+                 each cell in _sorted_idx and the number of particles.
+        '''
+        if len(self._cell_hashes) == 0:
+            return np.zeros_like(hashes), np.zeros_like(hashes)
+        pos = np.minimum(np.searchsorted(self._cell_hashes, hashes),
+                         len(self._cell_hashes)-1)
+        found = (self._cell_hashes[pos] == hashes) & (hashes >= 0)
+        cell_start = np.where(found, self._cell_start[pos], 0)
+        cell_count = np.where(found, self._cell_count[pos], 0)
+        return cell_start, cell_count
+
+    def _init_cells(self):
+        '''Build the cell list from _particle_hashes of the active particles.'''
+        active_idx = self.active_idx
+        self._sorted_idx = active_idx[np.argsort(
+            self._particle_hashes[active_idx], kind='stable')]
+        self._update_cells()
+
+    def _update_cells(self):
+        '''Compute the cells from the sorted particles.'''
+        sorted_hashes = self._particle_hashes[self._sorted_idx]
+        first = np.ones(len(sorted_hashes), dtype=bool)
+        first[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+        self._cell_hashes = sorted_hashes[first]
+        self._cell_start = np.nonzero(first)[0]
+        self._cell_count = np.diff(np.append(self._cell_start, len(sorted_hashes)))
 
     def consistency_check(self):
         '''See if all values are in their proper place.
@@ -36,27 +144,24 @@ class BaseHashNeighborSearch(ABC):
         Only used for debugging purposes.
         '''
         active_idx = self.active_idx
-        if active_idx is None:
-            active_idx = np.arange(self._values.shape[1])
-
-        for idx in active_idx:
-            cur_hash = self._particle_hashes[idx]
-            hash_idx = self._hash_idx[idx]
-            assert self._hashtable[cur_hash][hash_idx] == idx
-
-        n_idx = 0
-        for idx_array in self._hashtable.values():
-            for idx in idx_array:
-                assert idx in active_idx
-            n_idx += len(idx_array)
-        assert n_idx == len(active_idx)
+        assert len(self._sorted_idx) == len(active_idx)
+        assert np.all(np.sort(self._sorted_idx) == active_idx)
+
+        sorted_hashes = self._particle_hashes[self._sorted_idx]
+        assert np.all(np.diff(sorted_hashes) >= 0)
+        assert np.all(sorted_hashes[self._cell_start] == self._cell_hashes)
+        assert np.sum(self._cell_count) == len(active_idx)
+        assert np.all(np.diff(self._cell_hashes) > 0)
+
         cur_hashes = self._values_to_hashes(self._values[:, active_idx])
         assert np.all(cur_hashes == self._particle_hashes[active_idx])
 
     def update_values(self, new_values, new_active_mask=None):
         '''Update the locations of (some) of the particles.
 
-        Particles that stay in the same location are computationally cheap.
+        Particles that stay in the same cell are computationally cheap: only
+        the particles that changed cell or were (de)activated are re-sorted
+        and merged into the sorted particles.
         The order and number of the particles is assumed to remain the same.
 
         :param new_values: new (depth, lat, lon) values for particles.
@@ -67,35 +172,31 @@ class BaseHashNeighborSearch(ABC):
 
         if new_active_mask is None:
             new_active_mask = np.full(new_values.shape[1], True)
-
-        # Figure out the changes in the active mask.
-        deactivated_mask = np.logical_and(
-            self._active_mask, np.logical_not(new_active_mask))
-        stay_active_mask = np.logical_and(self._active_mask, new_active_mask)
-        activated_mask = np.logical_and(
-            np.logical_not(self._active_mask), new_active_mask)
-
-        stay_active_idx = np.where(stay_active_mask)[0]
-
-        # Find the old and new hashes of particles that stayed active.
-        old_hashes = self._particle_hashes[stay_active_mask]
-        new_hashes = self._values_to_hashes(new_values[:, stay_active_mask])
-
-        # See which particles have crossed cell boundaries.
-        move_idx = stay_active_idx[np.where(old_hashes != new_hashes)[0]]
-        remove_idx = np.append(move_idx, np.where(deactivated_mask)[0])
-        add_idx = np.append(move_idx, np.where(activated_mask)[0])
-
-        # Remove/add/modify particles.
-        self._deactivate_particles(remove_idx)
-        self._particle_hashes[stay_active_mask] = new_hashes
-        self._particle_hashes[activated_mask] = self._values_to_hashes(
-            new_values[:, activated_mask])
-        self._activate_particles(add_idx)
+        old_active_mask = np.zeros(new_values.shape[1], dtype=bool)
+        old_active_mask[self.active_idx] = True
+
+        # Compute the new hashes of all active particles.
+        new_active_idx = np.where(new_active_mask)[0]
+        new_hashes = np.full(new_values.shape[1], -1, dtype=int)
+        new_hashes[new_active_idx] = self._values_to_hashes(new_values[:, new_active_idx])
+
+        # Particles that crossed cell boundaries or were (de)activated.
+        moved_mask = old_active_mask & new_active_mask & (new_hashes != self._particle_hashes)
+        remove_mask = moved_mask | (old_active_mask & ~new_active_mask)
+        add_idx = np.where(moved_mask | (~old_active_mask & new_active_mask))[0]
+        self._particle_hashes[new_active_idx] = new_hashes[new_active_idx]
+
+        # Remove and re-insert these particles in the sorted particles.
+        kept_idx = self._sorted_idx[~remove_mask[self._sorted_idx]]
+        add_idx = add_idx[np.argsort(self._particle_hashes[add_idx], kind='stable')]
+        insert_pos = np.searchsorted(self._particle_hashes[kept_idx],
+                                     self._particle_hashes[add_idx], side='right')
+        self._sorted_idx = np.insert(kept_idx, insert_pos, add_idx)
 
         # Set the state to the new values.
         self._active_mask = new_active_mask
         self._values = new_values
+        self._update_cells()
 
     @abstractmethod
     def _values_to_hashes(self, values, active_idx=None):
@@ -109,59 +210,11 @@ class BaseHashNeighborSearch(ABC):
         """
         raise NotImplementedError
 
-    def _deactivate_particles(self, particle_idx):
-        "Remove particles from the hashtable."
-        # Get the hashes of the particles to be removed.
-        remove_split = hash_split(self._particle_hashes[particle_idx])
-        for cur_hash, remove_idx in remove_split.items():
-            # If the number of items to removed from cur_hash is equal
-            # to the number of hashes stored under cur_hash, remove the entry.
-            if len(remove_idx) == len(self._hashtable[cur_hash]):
-                del self._hashtable[cur_hash]
-            # Else create a new array that doesn't include remove_idx.
-            else:
-                rel_remove_idx = self._hash_idx[particle_idx[remove_idx]]
-                self._hashtable[cur_hash] = np.delete(
-                    self._hashtable[cur_hash], rel_remove_idx)
-                self._hash_idx[self._hashtable[cur_hash]] = np.arange(
-                    len(self._hashtable[cur_hash]))
-
-    def _activate_particles(self, particle_idx):
-        "Add particles to the hashtable"
-        # See _deactivate_particles.
-        add_split = hash_split(self._particle_hashes[particle_idx])
-        for cur_hash, add_idx in add_split.items():
-            if cur_hash not in self._hashtable:
-                self._hashtable[cur_hash] = particle_idx[add_idx]
-                self._hash_idx[particle_idx[add_idx]] = np.arange(len(add_idx))
-            else:
-                self._hash_idx[particle_idx[add_idx]] = np.arange(
-                    len(self._hashtable[cur_hash]),
-                    len(self._hashtable[cur_hash]) + len(add_idx))
-                self._hashtable[cur_hash] = np.append(
-                    self._hashtable[cur_hash], particle_idx[add_idx])
-
-
-def hash_split(hash_ids, active_idx=None):
-    '''Create a hashtable.
-
-    Multiple particles that are found in the same cell are put in a list
-    with that particular hash.
-
-    :param hash_ids: Hash values for the particles.
-    :param active_idx: Subset on which to compute the hash split.
-    :returns hash_split: Dictionary with {hash: [idx_1, idx_2, ..], ..}
+
+def range_offsets(lengths):
+    '''Offsets within consecutive ranges.
+
+    :param lengths: lengths of the ranges.
+    :returns array [0, 1, .., lengths[0]-1, 0, 1, .., lengths[1]-1, ..].
     '''
-    if len(hash_ids) == 0:
-        return {}
-    if active_idx is not None:
-        sort_idx = active_idx[np.argsort(hash_ids[active_idx])]
-    else:
-        sort_idx = np.argsort(hash_ids)
-
-    a_sorted = hash_ids[sort_idx]
-    unq_first = np.concatenate(([True], a_sorted[1:] != a_sorted[:-1]))
-    unq_items = a_sorted[unq_first]
-    unq_count = np.diff(np.nonzero(unq_first)[0])
-    unq_idx = np.split(sort_idx, np.cumsum(unq_count))
-    return dict(zip(unq_items, unq_idx))
+    return np.arange(np.sum(lengths)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
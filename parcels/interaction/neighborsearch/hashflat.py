@@ -1,25 +1,25 @@
+from itertools import product
+
 import numpy as np
 
 from parcels.interaction.neighborsearch.base import BaseFlatNeighborSearch
 from parcels.interaction.neighborsearch.basehash import BaseHashNeighborSearch
-from parcels.interaction.neighborsearch.basehash import hash_split
 
 
 class HashFlatNeighborSearch(BaseHashNeighborSearch, BaseFlatNeighborSearch):
     '''Neighbor search using a hashtable (similar to octtrees).'''
     _box = None
 
-    def _find_neighbors(self, hash_id, coor):
-        neighbor_blocks = hash_to_neighbors(hash_id, self._bits)
-        all_neighbor_points = []
-        for block in neighbor_blocks:
-            try:
-                all_neighbor_points.extend(self._hashtable[block])
-            except KeyError:
-                pass
+    def _cell_coordinates(self, values):
+        '''Integer (depth, lat, lon) coordinates of the cells of locations.'''
+        return np.floor((values - self._min_box)/self.inter_dist).astype(int)
+
+    def _neighbor_cells(self, hashes, values):
+        return hash_to_neighbors(self._cell_coordinates(values), self._bits)
 
-        pot_neighbors = np.array(all_neighbor_points)
-        return self._get_close_neighbor_dist(coor, pot_neighbors)
+    def _neighbor_group_keys(self, hashes, values):
+        # Locations outside of the box don't have a valid hash.
+        return self._cell_coordinates(values).T
 
     def update_values(self, new_values, new_active_mask=None):
         if not self._check_box(new_values, new_active_mask):
@@ -49,11 +49,14 @@ class HashFlatNeighborSearch(BaseHashNeighborSearch, BaseFlatNeighborSearch):
 
     def rebuild(self, values, active_mask=-1):
         super().rebuild(values, active_mask)
-        active_values = self._values[:, self._active_mask]
+        active_values = self._values[:, self.active_idx]
 
         # Compute the dimensions of the box with a margin.
         self._box = []
         for i_dim in range(3):
+            if active_values.shape[1] == 0:
+                self._box.append([0, 0])
+                continue
             val_min = active_values[i_dim, :].min()
             val_max = active_values[i_dim, :].max()
             margin = (val_max-val_min)*0.3
@@ -66,82 +69,53 @@ class HashFlatNeighborSearch(BaseHashNeighborSearch, BaseFlatNeighborSearch):
         # Compute the number of bits in each of the three dimensions
         # E.g. if we have 3 bits (depth), we must have less than 2^3 cells in
         # that direction.
-        n_bits = ((self._box[:, 1] - self._box[:, 0]
-                   )/self.inter_dist.reshape(-1) + epsilon)/np.log(2)
-        self._bits = np.ceil(n_bits).astype(int)
+        n_cells = np.floor((self._box[:, 1] - self._box[:, 0]
+                            )/self.inter_dist.reshape(-1) + epsilon).astype(int) + 1
+        self._bits = np.ceil(np.log2(n_cells)).astype(int)
 
         # Compute the starting point of the cell (0, 0, 0).
         self._min_box = self._box[:, 0]
         self._min_box = self._min_box.reshape(-1, 1)
 
-        # Compute the hash table.
-        particle_hashes = self._values_to_hashes(values, self.active_idx)
-        self._hashtable = hash_split(particle_hashes,
-                                     active_idx=self.active_idx)
-        self._particle_hashes = particle_hashes
-
-        # Keep track of the position of a particle index within a cell.
-        self._hash_idx = np.empty_like(self._particle_hashes, dtype=int)
-        for idx_array in self._hashtable.values():
-            self._hash_idx[idx_array] = np.arange(len(idx_array))
+        # Compute the cell list.
+        self._particle_hashes = self._values_to_hashes(self._values, self.active_idx)
+        self._init_cells()
 
     def _values_to_hashes(self, values, active_idx=None):
         if active_idx is None:
-            active_values = values
-        else:
-            active_values = values[:, active_idx]
-
-        # Compute the box_id/hashes.
-        box_i = ((active_values-self._min_box)/self.inter_dist).astype(int)
-        particle_hashes = np.bitwise_or(
-            box_i[0, :], np.left_shift(box_i[1, :], self._bits[0]))
-
-        if active_values is None:
-            return particle_hashes
+            return cell_to_hash(self._cell_coordinates(values), self._bits)
 
         # Put the hashes back
-        all_hashes = np.empty(values.shape[1], dtype=int)
-        all_hashes[active_idx] = particle_hashes
+        all_hashes = np.full(values.shape[1], -1, dtype=int)
+        all_hashes[active_idx] = cell_to_hash(
+            self._cell_coordinates(values[:, active_idx]), self._bits)
         return all_hashes
 
 
-def hash_to_neighbors(hash_id, bits):
-    """Compute neighboring cells from a hash.
+def cell_to_hash(cell_coor, bits):
+    """Compute the hashes of cells.
 
-    :param hash_id: hash value of the current cell.
+    :param cell_coor: integer coordinates of the cells (3, ...).
+    :param bits: number of bits for each of the coordinates.
+    :returns hashes of the cells.
+    """
+    return np.bitwise_or(np.bitwise_or(
+        cell_coor[0], np.left_shift(cell_coor[1], bits[0])),
+        np.left_shift(cell_coor[2], bits[0]+bits[1]))
+
+
+def hash_to_neighbors(cell_coor, bits):
+    """Compute neighboring cells of cells.
+
+    :param cell_coor: integer coordinates of the cells (3, n).
     :param bits: key to compute the hashesh.
-    :returns neighbors: List of cells neighboring hash_id.
+    :returns neighbors: array (n, 27) with the hashes of the cells in the
+                        3x3x3 neighborhood, -1 if the cell doesn't exist.
     """
-    coor = np.zeros((len(bits),), dtype=np.int32)
-    new_coor = np.zeros((len(bits),), dtype=np.int32)
-
-    # Compute the (ix, iy, iz) coordinates of the hash.
-    tot_bits = 0
-    for dim in range(len(bits)):
-        coor[dim] = (hash_id >> tot_bits) & ((1 << bits[dim])-1)
-        tot_bits += bits[dim]
-
-    coor_max = np.left_shift(1, bits)
-
-    neighbors = []
-
-    # Loop over all 3^3 neighboring cells.
-    for offset in range(pow(3, len(bits))):
-        # Compute the integer coordinates of the neighboring cell.
-        divider = 1
-        for dim in range(len(bits)):
-            new_coor[dim] = coor[dim] + (1-((offset//divider) % 3))
-            divider *= 3
-
-        # Cell is outside the box/doesn't exist.
-        if np.any(new_coor > coor_max) or np.any(new_coor < 0):
-            continue
-
-        # Compute the hash of the neighboring cell
-        new_hash = 0
-        tot_bits = 0
-        for dim in range(len(bits)):
-            new_hash |= (new_coor[dim] << tot_bits)
-            tot_bits += bits[dim]
-        neighbors.append(new_hash)
-    return neighbors
+    offsets = np.array(list(product([-1, 0, 1], repeat=len(bits)))).T
+    new_coor = cell_coor[:, :, None] + offsets[:, None, :]
+
+    # Cells outside the box don't exist.
+    coor_max = np.left_shift(1, bits).reshape(-1, 1, 1)
+    exists = np.all((new_coor >= 0) & (new_coor < coor_max), axis=0)
+    return np.where(exists, cell_to_hash(new_coor, bits), -1)
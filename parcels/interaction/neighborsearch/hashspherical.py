@@ -4,41 +4,47 @@ import numpy as np
 
 from parcels.interaction.neighborsearch.base import BaseSphericalNeighborSearch
 from parcels.interaction.neighborsearch.basehash import BaseHashNeighborSearch
-from parcels.interaction.neighborsearch.basehash import hash_split
 
 
 class HashSphericalNeighborSearch(BaseHashNeighborSearch,
                                   BaseSphericalNeighborSearch):
     '''Neighbor search using a hashtable (similar to octtrees).'''
     def __init__(self, inter_dist_vert, inter_dist_horiz,
-                 max_depth=100000):
+                 max_depth=100000, periodic_domain_zonal=None):
         '''Initialize the neighbor data structure.
 
         :param interaction_distance: maximum horizontal interaction distance.
         :param interaction_depth: maximum depth of interaction.
         :param values: depth, lat, lon values for particles.
         :param max_depth: maximum depth of the ocean.
+        :param periodic_domain_zonal: zonal domain if zonal periodic boundary.
         '''
-        super().__init__(inter_dist_vert, inter_dist_horiz, max_depth)
+        super().__init__(inter_dist_vert, inter_dist_horiz, max_depth,
+                         periodic_domain_zonal)
 
         self._init_structure()
 
-    def _find_neighbors(self, hash_id, coor):
-        '''Get neighbors from hash_id and location.'''
-        # Get the neighboring cells.
-        neighbor_blocks = geo_hash_to_neighbors(
-            hash_id, coor, self._bits, self.inter_arc_dist)
-        all_neighbor_points = []
-
-        # Get the particles from the neighboring cells.
-        for block in neighbor_blocks:
-            try:
-                all_neighbor_points.extend(self._hashtable[block])
-            except KeyError:
-                pass
-
-        potential_neighbors = np.array(all_neighbor_points, dtype=int)
-        return self._get_close_neighbor_dist(coor, potential_neighbors)
+    def _neighbor_cells(self, hashes, values):
+        return geo_hash_to_neighbors(hashes, values, self._bits,
+                                     self.inter_arc_dist)
+
+    def _lon_shifts(self):
+        if self.periodic_domain_zonal and np.isclose(self.periodic_domain_zonal % 360, 0):
+            # Boundaries every 360 degrees are already periodic on the sphere.
+            return [0]
+        return super()._lon_shifts()
+
+    def _neighbor_group_keys(self, hashes, values):
+        '''The neighboring cells depend on the cell and on the longitude
+        cells in the rows north and south of the cell.'''
+        i_lat = (hashes >> (1+self._bits[0])) & ((1 << self._bits[1])-1)
+        keys = [hashes]
+        for i_d_lat in [-1, 1]:
+            new_i_lat = np.maximum(i_lat + i_d_lat, 0)
+            circ_small = 2*np.pi*np.cos((new_i_lat+1)*self.inter_arc_dist)
+            n_new_lon = np.maximum(1, np.floor(circ_small/self.inter_arc_dist))
+            keys.append(np.floor(values[2]/(360/n_new_lon)).astype(int))
+        return np.vstack(keys).T
 
     def _values_to_hashes(self, values, active_idx=None):
         '''Convert coordinates to cell ids.
@@ -57,7 +63,9 @@ class HashSphericalNeighborSearch(BaseHashNeighborSearch,
         lat_sign = (lat > 0).astype(int)
 
         # Find the lattitude part of the cell id.
-        i_depth = np.floor(depth/self.inter_dist_vert).astype(int)
+        # Depths outside [0, max_depth] are put in the first/last cells.
+        i_depth = np.clip(np.floor(depth/self.inter_dist_vert).astype(int),
+                          0, (1 << self._bits[0])-1)
         i_lat = np.floor(np.abs(lat)/self.inter_degree_dist).astype(int)
 
         # Get the arc length of the smaller circle around the earth.
@@ -67,7 +75,7 @@ class HashSphericalNeighborSearch(BaseHashNeighborSearch,
         d_lon = 360/n_lon
 
         # Get the longitude part of the cell id.
-        i_lon = np.floor(lon/d_lon).astype(int)
+        i_lon = np.floor(lon/d_lon).astype(int) % n_lon
 
         # Merge the 4 parts of the cell into one id.
         point_hash = i_3d_to_hash(i_depth, i_lat, i_lon, lat_sign, self._bits)
@@ -84,18 +92,12 @@ class HashSphericalNeighborSearch(BaseHashNeighborSearch,
         active_idx = self.active_idx
 
         # Compute the hash values:
-        self._particle_hashes = np.empty(self._values.shape[1], dtype=int)
+        self._particle_hashes = np.full(self._values.shape[1], -1, dtype=int)
         self._particle_hashes[active_idx] = self._values_to_hashes(
-            values[:, active_idx])
-
-        # Create the hashtable.
-        self._hashtable = hash_split(self._particle_hashes,
-                                     active_idx=active_idx)
+            self._values[:, active_idx])
 
-        # Keep track of the position of a particle index within a cell.
-        self._hash_idx = np.empty_like(self._particle_hashes, dtype=int)
-        for idx_array in self._hashtable.values():
-            self._hash_idx[idx_array] = np.arange(len(idx_array))
+        # Create the cell list.
+        self._init_cells()
 
     def _init_structure(self):
         '''Initialize the basic tree properties without building'''
@@ -123,43 +125,40 @@ def i_3d_to_hash(i_depth, i_lat, i_lon, lat_sign, bits):
     return point_hash
 
 
-def geo_hash_to_neighbors(hash_id, coor, bits, inter_arc_dist):
-    '''Compute the hashes of all neighboring cells in a 3x3x3 neighborhood.'''
-    lat_sign = hash_id & 0x1
-    i_depth = (hash_id >> 1) & ((1 << bits[0])-1)
-    i_lat = (hash_id >> (1+bits[0])) & ((1 << bits[1])-1)
+def geo_hash_to_neighbors(hashes, values, bits, inter_arc_dist):
+    '''Compute the hashes of all neighboring cells in a 3x3x3 neighborhood.
 
-    def all_neigh_depth(i_lat, i_lon, lat_sign):
-        hashes = []
-        for d_depth in [-1, 0, 1]:
-            new_depth = i_depth + d_depth
-            if new_depth < 0:
-                continue
-            hashes.append(
-                i_3d_to_hash(new_depth, i_lat, i_lon, lat_sign, bits))
-        return hashes
+    :param hashes: hashes of the cells of the locations.
+    :param values: locations ([depth, lat, lon], # of locations).
+    :returns neighbors: array (# of locations, 27) with the hashes of the
+                        neighboring cells, -1 if the cell doesn't exist.
+    '''
+    lat_sign = hashes & 0x1
+    i_depth = (hashes >> 1) & ((1 << bits[0])-1)
+    i_lat = (hashes >> (1+bits[0])) & ((1 << bits[1])-1)
 
     neighbors = []
     # Loop over lower row, middle row, upper row
     for i_d_lat in [-1, 0, 1]:
-        new_lat_sign = lat_sign
+        new_lat_sign = lat_sign.copy()
         new_i_lat = i_lat + i_d_lat
-        if new_i_lat == -1:
-            new_i_lat = 0
-            new_lat_sign = (1-lat_sign)
+        other_hemisphere = new_i_lat == -1
+        new_i_lat[other_hemisphere] = 0
+        new_lat_sign[other_hemisphere] = 1 - lat_sign[other_hemisphere]
 
         min_lat = new_i_lat + 1
         circ_small = 2*np.pi*np.cos(min_lat*inter_arc_dist)
-        n_new_lon = int(max(1, np.floor(circ_small/inter_arc_dist)))
+        n_new_lon = np.maximum(1, np.floor(circ_small/inter_arc_dist)).astype(int)
         d_lon = 360/n_new_lon
-        if n_new_lon <= 3:
-            for new_i_lon in range(n_new_lon):
-                neighbors.extend(
-                    all_neigh_depth(new_i_lat, new_i_lon, new_lat_sign))
-        else:
-            start_i_lon = int(np.floor(coor[2]/d_lon))
-            for delta_lon in [-1, 0, 1]:
-                new_i_lon = (start_i_lon+delta_lon+n_new_lon) % n_new_lon
-                neighbors.extend(
-                    all_neigh_depth(new_i_lat, new_i_lon, new_lat_sign))
-    return neighbors
+        # Rows with at most 3 cells: all cells, else the 3 cells around the location.
+        all_lon = n_new_lon <= 3
+        start_i_lon = np.floor(values[2]/d_lon).astype(int)
+        for i_cell, delta_lon in enumerate([-1, 0, 1]):
+            new_i_lon = np.where(all_lon, i_cell, (start_i_lon+delta_lon) % n_new_lon)
+            exists = ~all_lon | (i_cell < n_new_lon)
+            for d_depth in [-1, 0, 1]:
+                new_depth = i_depth + d_depth
+                neighbors.append(np.where(
+                    exists & (new_depth >= 0) & (new_depth < (1 << bits[0])),
+                    i_3d_to_hash(new_depth, new_i_lat, new_i_lon, new_lat_sign, bits), -1))
+    return np.column_stack(neighbors)
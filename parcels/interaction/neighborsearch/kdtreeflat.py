@@ -8,10 +8,49 @@ class KDTreeFlatNeighborSearch(BaseFlatNeighborSearch):
     def find_neighbors_by_coor(self, coor):
         coor = coor.reshape(3, 1)
         corrected_coor = (coor/self.inter_dist).reshape(-1)
-        rel_idx = np.array(self._kdtree.query_ball_point(corrected_coor, r=1))
-        neighbor_idx = self.active_idx[rel_idx]
+        rel_idx = self._kdtree.query_ball_point(corrected_coor, r=1)
+        if self.periodic_domain_zonal:
+            # Neighbors through the Western and Eastern boundaries
+            for shift in [-1, 1]:
+                shifted_coor = corrected_coor.copy()
+                shifted_coor[2] += shift*self.periodic_domain_zonal/self.inter_dist_horiz
+                rel_idx = np.union1d(rel_idx, self._kdtree.query_ball_point(shifted_coor, r=1))
+        neighbor_idx = self.active_idx[np.array(rel_idx, dtype=int)]
         return neighbor_idx, np.vstack(self._distance(coor, neighbor_idx))
 
+    def _candidates_per_particle(self):
+        # Estimate from the number of neighbors of a sample of the particles.
+        sample = self.active_idx[::max(1, len(self.active_idx)//100)]
+        if len(sample) == 0:
+            return 1
+        lengths = self._kdtree.query_ball_point(
+            (self._values[:, sample]/self.inter_dist).T, r=1, return_length=True)
+        return (3 if self.periodic_domain_zonal else 1)*max(1, int(2*np.mean(lengths)))
+
+    def _candidate_pairs(self, particle_idx):
+        corrected_coor = self._values[:, particle_idx]/self.inter_dist
+        shifts = [0]
+        if self.periodic_domain_zonal:
+            shifts += [-1, 1]
+        rows = []
+        candidates = []
+        for shift in shifts:
+            shifted_coor = corrected_coor.copy()
+            if shift != 0:
+                shifted_coor[2] += shift*self.periodic_domain_zonal/self.inter_dist_horiz
+            rel_idx = self._kdtree.query_ball_point(shifted_coor.T, r=1, return_sorted=False)
+            lengths = np.array([len(idx) for idx in rel_idx], dtype=int)
+            rows.append(np.repeat(np.arange(len(particle_idx)), lengths))
+            candidates.append(self.active_idx[np.concatenate(rel_idx).astype(int)] if lengths.sum() > 0
+                              else np.zeros(0, dtype=int))
+        rows = np.concatenate(rows)
+        candidates = np.concatenate(candidates)
+        if len(shifts) > 1:
+            # Remove pairs that are found through more than one boundary
+            _, unique = np.unique(np.vstack((rows, candidates)), axis=1, return_index=True)
+            rows, candidates = rows[unique], candidates[unique]
+        return rows, candidates
+
     def rebuild(self, values=None, active_mask=-1):
         super().rebuild(values, active_mask)
         self._corrected_values = values[:, self._active_idx]/self.inter_dist
@@ -0,0 +1,85 @@
+import numpy as np
+from scipy.spatial import KDTree
+
+from parcels.interaction.neighborsearch.base import BaseSphericalNeighborSearch
+
+
+class KDTreeSphericalNeighborSearch(BaseSphericalNeighborSearch):
+    '''Neighbor search using a KD-tree on 3D Cartesian coordinates.
+
+    The (lat, lon) positions are mapped to points on the earth's surface,
+    which are scaled with the horizontal interaction distance, and the depth
+    is scaled with the vertical interaction distance. Since the chord length
+    is never larger than the arc length, a query with radius 1 in these
+    coordinates returns all neighbors (and some more), after which the
+    exact distances are used to select the neighbors.
+    '''
+
+    def _to_cartesian(self, values):
+        '''Convert coordinates to scaled Cartesian coordinates.
+
+        :param values: array of positions ([depth, lat, lon], n).
+        :returns array of scaled coordinates (n, 4).
+        '''
+        R_earth = 6371000
+        lat = np.pi*values[1]/180
+        lon = np.pi*values[2]/180
+        scale = R_earth/self.inter_dist_horiz
+        return np.column_stack((
+            scale*np.cos(lat)*np.cos(lon),
+            scale*np.cos(lat)*np.sin(lon),
+            scale*np.sin(lat),
+            values[0]/self.inter_dist_vert,
+        ))
+
+    def _lon_shifts(self):
+        '''Longitude shifts needed for zonally periodic boundaries.'''
+        if not self.periodic_domain_zonal or np.isclose(self.periodic_domain_zonal % 360, 0):
+            # Boundaries every 360 degrees are already periodic on the sphere.
+            return [0]
+        return [0, -self.periodic_domain_zonal, self.periodic_domain_zonal]
+
+    def find_neighbors_by_coor(self, coor):
+        coor = coor.reshape(3, 1)
+        rel_idx = []
+        for shift in self._lon_shifts():
+            shifted_coor = coor.copy()
+            shifted_coor[2] += shift
+            rel_idx = np.union1d(rel_idx, self._kdtree.query_ball_point(
+                self._to_cartesian(shifted_coor)[0], r=1))
+        candidates = self.active_idx[np.array(rel_idx, dtype=int)]
+        return self._get_close_neighbor_dist(coor, candidates)
+
+    def _candidates_per_particle(self):
+        # Estimate from the number of neighbors of a sample of the particles.
+        sample = self.active_idx[::max(1, len(self.active_idx)//100)]
+        if len(sample) == 0:
+            return 1
+        lengths = self._kdtree.query_ball_point(
+            self._to_cartesian(self._values[:, sample]), r=1, return_length=True)
+        return len(self._lon_shifts())*max(1, int(2*np.mean(lengths)))
+
+    def _candidate_pairs(self, particle_idx):
+        rows = []
+        candidates = []
+        shifts = self._lon_shifts()
+        for shift in shifts:
+            shifted_values = self._values[:, particle_idx].copy()
+            shifted_values[2] += shift
+            rel_idx = self._kdtree.query_ball_point(
+                self._to_cartesian(shifted_values), r=1, return_sorted=False)
+            lengths = np.array([len(idx) for idx in rel_idx], dtype=int)
+            rows.append(np.repeat(np.arange(len(particle_idx)), lengths))
+            candidates.append(self.active_idx[np.concatenate(rel_idx).astype(int)] if lengths.sum() > 0
+                              else np.zeros(0, dtype=int))
+        rows = np.concatenate(rows)
+        candidates = np.concatenate(candidates)
+        if len(shifts) > 1:
+            # Remove pairs that are found through more than one boundary
+            _, unique = np.unique(np.vstack((rows, candidates)), axis=1, return_index=True)
+            rows, candidates = rows[unique], candidates[unique]
+        return rows, candidates
+
+    def rebuild(self, values=None, active_mask=-1):
+        super().rebuild(values, active_mask)
+        self._kdtree = KDTree(self._to_cartesian(self._values[:, self._active_idx]))
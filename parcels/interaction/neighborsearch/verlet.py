@@ -0,0 +1,150 @@
+import numpy as np
+
+from parcels.interaction.neighborsearch.base import BaseNeighborSearch
+from parcels.interaction.neighborsearch.base import BaseSphericalNeighborSearch
+from parcels.interaction.neighborsearch.bruteforce import BruteFlatNeighborSearch
+from parcels.interaction.neighborsearch.bruteforce import BruteSphericalNeighborSearch
+
+
+class VerletNeighborSearch(BaseNeighborSearch):
+    '''Neighbor search with Verlet lists.
+
+    The neighbor lists of all active particles are built with another
+    neighbor search (search_class), using an interaction distance that is
+    enlarged with a skin distance. The lists are only rebuilt when a particle
+    has moved more than half the skin since the last rebuild, or when
+    particles have been activated. In between, the neighbors are found by
+    computing the exact distances to the particles in the cached lists.
+    '''
+
+    def __init__(self, search_class, inter_dist_vert, inter_dist_horiz,
+                 skin_vert=0, skin_horiz=0, max_depth=100000,
+                 periodic_domain_zonal=None):
+        '''Initialize the neighbor data structure.
+
+        :param search_class: neighbor search class used to build the lists.
+        :param inter_dist_vert: interaction distance (vertical) in m.
+        :param inter_dist_horiz: interaction distance (horizontal) in m.
+        :param skin_vert: skin distance (vertical) in m.
+        :param skin_horiz: skin distance (horizontal) in m.
+        :param max_depth: maximum depth of the particles (i.e. 100km).
+        :param periodic_domain_zonal: zonal domain if zonal periodic boundary.
+        '''
+        super().__init__(inter_dist_vert, inter_dist_horiz, max_depth,
+                         periodic_domain_zonal)
+        self.skin_vert = skin_vert
+        self.skin_horiz = skin_horiz
+        self._search = search_class(
+            inter_dist_vert + skin_vert, inter_dist_horiz + skin_horiz,
+            max_depth=max_depth, periodic_domain_zonal=periodic_domain_zonal)
+        if issubclass(search_class, BaseSphericalNeighborSearch):
+            exact_class = BruteSphericalNeighborSearch
+        else:
+            exact_class = BruteFlatNeighborSearch
+        # Only used to compute the exact distances with the current values.
+        self._exact = exact_class(inter_dist_vert, inter_dist_horiz,
+                                  max_depth=max_depth,
+                                  periodic_domain_zonal=periodic_domain_zonal)
+
+        # Particles in a neighbor list are at most 1-2*max_displacement away
+        # (relative to the enlarged distances) from the edge of the enlarged
+        # interaction ellipse, while non-neighbors are at least
+        # min(skin/(inter_dist+skin)) outside of the interaction ellipse.
+        self.max_displacement = 0.5*min(
+            skin_vert/(inter_dist_vert + skin_vert),
+            skin_horiz/(inter_dist_horiz + skin_horiz))
+
+        self._build_values = None
+        self._build_active = None
+        self._row = None
+        self._indptr = None
+        self._neighbor_idx = None
+        self.n_rebuilds = 0
+
+    def rebuild(self, values, active_mask=-1):
+        '''Rebuild the neighbor lists from scratch.
+
+        :param values: positions of the particles.
+        :param active_mask: boolean array indicating active particles.
+        '''
+        super().rebuild(values, active_mask)
+        self._exact.rebuild(self._values, active_mask=self._active_mask)
+        self._build_values = self._values.copy()
+        self._search.rebuild(self._build_values, active_mask=self._active_mask)
+
+        active_idx = self.active_idx
+        self._build_active = np.zeros(self._values.shape[1], dtype=bool)
+        self._build_active[active_idx] = True
+        self._row = np.full(self._values.shape[1], -1, dtype=int)
+        self._row[active_idx] = np.arange(len(active_idx))
+        self._indptr, self._neighbor_idx, _ = self._search.find_all_neighbors(active_idx)
+        self.n_rebuilds += 1
+
+    def update_values(self, new_values, new_active_mask=None):
+        '''Update the coordinates of the particles.
+
+        The neighbor lists are only rebuilt if particles have been activated
+        or if a particle moved too far since the last rebuild.
+
+        :param new_values: numpy array ([depth, lat, lon], n_particles) with
+                           new coordinates of the particles.
+        :param new_active_mask: boolean array indicating active particles.
+        '''
+        if (self._build_values is None
+                or self._build_values.shape != new_values.shape):
+            self.rebuild(new_values, new_active_mask)
+            return
+
+        super().rebuild(new_values, new_active_mask)
+        active_idx = self.active_idx
+        if not np.all(self._build_active[active_idx]) or self._moved_too_far(active_idx):
+            self.rebuild(new_values, new_active_mask)
+        else:
+            self._exact.rebuild(self._values, active_mask=self._active_mask)
+
+    def _moved_too_far(self, active_idx):
+        '''Whether any particle moved more than half the skin since the
+        last rebuild.'''
+        vert_disp, horiz_disp = self._exact._values_distance(
+            self._build_values[:, active_idx], self._values[:, active_idx])
+        displacement = np.sqrt(
+            (vert_disp/(self.inter_dist_vert + self.skin_vert))**2
+            + (horiz_disp/(self.inter_dist_horiz + self.skin_horiz))**2)
+        return len(displacement) > 0 and np.max(displacement) >= self.max_displacement
+
+    def find_neighbors_by_coor(self, coor):
+        coor = coor.reshape(3, 1)
+        # With the enlarged distances, the positions at the last rebuild still
+        # contain all current neighbors of coor.
+        candidates, _ = self._search.find_neighbors_by_coor(coor.copy())
+        active = np.zeros(self._values.shape[1], dtype=bool)
+        active[self.active_idx] = True
+        candidates = np.unique(np.asarray(candidates, dtype=int))
+        return self._exact._get_close_neighbor_dist(coor, candidates[active[candidates]])
+
+    def _candidate_pairs(self, particle_idx):
+        active = np.zeros(self._values.shape[1], dtype=bool)
+        active[self.active_idx] = True
+
+        list_rows = self._row[particle_idx]
+        in_lists = list_rows >= 0
+        starts = self._indptr[list_rows[in_lists]]
+        lengths = self._indptr[list_rows[in_lists]+1] - starts
+        rows = np.repeat(np.where(in_lists)[0], lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        candidates = self._neighbor_idx[np.repeat(starts, lengths) + offsets]
+
+        if not np.all(in_lists):
+            # Particles that were not active at the last rebuild
+            # have all active particles as candidates.
+            other_rows, other_candidates = super()._candidate_pairs(particle_idx[~in_lists])
+            rows = np.concatenate((rows, np.where(~in_lists)[0][other_rows]))
+            candidates = np.concatenate((candidates, other_candidates))
+        keep = active[candidates]
+        return rows[keep], candidates[keep]
+
+    def _values_distance(self, values1, values2):
+        return self._exact._values_distance(values1, values2)
+
+    def _distance(self, coor, subset_idx):
+        return self._exact._distance(coor, subset_idx)
@@ -19,6 +19,7 @@ except:
     MPI = None
 
 from parcels.tools.global_statics import get_cache_dir
+from parcels.compilation.prebuilt import prebuilt_library
 
 # === import just necessary field classes to perform setup checks === #
 from parcels.field import Field
@@ -69,6 +70,7 @@ class BaseKernel(object):
         self._cleanup_files = None
         self._cleanup_lib = None
         self._c_include = c_include
+        self._prebuilt = False
 
         # Derive meta information from pyfunc, if not given
         self._pyfunc = None
@@ -193,8 +195,9 @@ class BaseKernel(object):
                 all_files_array.append(self.src_file)
         if self.log_file is not None:
             all_files_array.append(self.log_file)
-        if self.lib_file is not None and all_files_array is not None and self.delete_cfiles is not None:
+        if self.lib_file is not None and all_files_array is not None and self.delete_cfiles is not None and not self._prebuilt:
             BaseKernel.cleanup_remove_files(self.lib_file, all_files_array, self.delete_cfiles)
+        self._prebuilt = False
 
         # If file already exists, pull new names. This is necessary on a Windows machine, because
         # Python's ctype does not deal in any sort of manner well with dynamic linked libraries on this OS.
@@ -235,7 +238,17 @@ class BaseKernel(object):
         return src_file_or_files, lib_file, log_file
 
     def compile(self, compiler):
-        """ Writes kernel code to file and compiles it."""
+        """ Writes kernel code to file and compiles it.
+
+        If a prebuilt library of the same code and compiler flags exists (see
+        :mod:`parcels.compilation.prebuilt`), that library is used instead."""
+        prebuilt_lib_file = prebuilt_library(self.ccode, compiler)
+        if prebuilt_lib_file is not None:
+            self.lib_file = prebuilt_lib_file
+            self._prebuilt = True
+            logger.info("Using prebuilt %s ==> %s" % (self.name, self.lib_file))
+            return
+
         all_files_array = []
         if self.src_file is None:
             if self.dyn_srcs is not None:
@@ -318,8 +331,6 @@ class BaseKernel(object):
         Updates the loaded fields of pset's fieldset according to the chunk information within their grids
         """
         if pset.fieldset is not None:
-            for g in pset.fieldset.gridset.grids:
-                g.cstruct = None  # This force to point newly the grids from Python to C
             # Make a copy of the transposed array to enforce
             # C-contiguous memory layout for JIT mode.
             for f in pset.fieldset.get_fields():
@@ -333,13 +344,16 @@ class BaseKernel(object):
                     for block_id in range(len(f.data_chunks)):
                         f.data_chunks[block_id] = None
                         f.c_data_chunks[block_id] = None
+                    f._cstruct_dirty = True
 
             for g in pset.fieldset.gridset.grids:
-                g.load_chunk = np.where(g.load_chunk == g.chunk_loading_requested,
-                                        g.chunk_loaded_touched, g.load_chunk)
+                # The Grid C structs are only updated when these arrays are replaced
                 if len(g.load_chunk) > g.chunk_not_loaded:  # not the case if a field in not called in the kernel
+                    g.load_chunk[g.load_chunk == g.chunk_loading_requested] = g.chunk_loaded_touched
                     if not g.load_chunk.flags.c_contiguous:
                         g.load_chunk = g.load_chunk.copy()
+                elif not isinstance(g.load_chunk, np.ndarray):
+                    g.load_chunk = np.zeros(0, dtype=np.int32)
                 if not g.depth.flags.c_contiguous:
                     g.depth = g.depth.copy()
                 if not g.lon.flags.c_contiguous:
@@ -162,7 +162,7 @@ class KernelAOS(BaseKernel):
 
         if self.fieldset is not None:
             for f in self.fieldset.get_fields():
-                if type(f) in [VectorField, NestedField, SummedField]:
+                if type(f) in [VectorField, NestedField, SummedField] or f.shared_memory is not None:
                     continue
                 f.data = np.array(f.data)
 
@@ -194,8 +194,7 @@ class KernelAOS(BaseKernel):
         if pset.fieldset is not None:
             for g in pset.fieldset.gridset.grids:
                 if len(g.load_chunk) > g.chunk_not_loaded:  # not the case if a field in not called in the kernel
-                    g.load_chunk = np.where(g.load_chunk == g.chunk_loaded_touched,
-                                            g.chunk_deprecated, g.load_chunk)
+                    g.load_chunk[g.load_chunk == g.chunk_loaded_touched] = g.chunk_deprecated
 
         # Execute the kernel over the particle set
         if self.ptype.uses_jit:
@@ -6,6 +6,7 @@ from copy import deepcopy
 from ctypes import byref
 from ctypes import c_double
 from ctypes import c_int
+from ctypes import POINTER
 from os import path
 
 import numpy as np
@@ -14,6 +15,7 @@ try:
 except:
     MPI = None
 
+from parcels.collection.collectionsoa import ParticleCollectionIterableSOA
 from parcels.kernel.basekernel import BaseKernel
 from parcels.compilation.codegenerator import ArrayKernelGenerator as KernelGenerator
 from parcels.compilation.codegenerator import LoopGenerator
@@ -119,18 +121,30 @@ class KernelSOA(BaseKernel):
             else:
                 self.src_file = src_file_or_files
 
-    def execute_jit(self, pset, endtime, dt):
-        """Invokes JIT engine to perform the core update loop"""
+    def execute_jit(self, pset, endtime, dt, active_idx=None):
+        """Invokes JIT engine to perform the core update loop
+
+        :param active_idx: Optional array of the indices of the particles to visit (default: all)
+        """
         self.load_fieldset_jit(pset)
 
         fargs = [byref(f.ctypes_struct) for f in self.field_args.values()]
         fargs += [c_double(f) for f in self.const_args.values()]
         particle_data = byref(pset.ctypes_struct)
-        return self._function(c_int(len(pset)), particle_data,
+        if active_idx is None:
+            return self._function(c_int(len(pset)), None, particle_data,
+                                  c_double(endtime), c_double(dt), *fargs)
+        if len(active_idx) == 0:
+            return
+        active_idx = np.ascontiguousarray(active_idx, dtype=np.int32)
+        return self._function(c_int(len(active_idx)), active_idx.ctypes.data_as(POINTER(c_int)), particle_data,
                               c_double(endtime), c_double(dt), *fargs)
 
-    def execute_python(self, pset, endtime, dt):
-        """Performs the core update loop via Python"""
+    def execute_python(self, pset, endtime, dt, active_idx=None):
+        """Performs the core update loop via Python
+
+        :param active_idx: Optional array of the indices of the particles to visit (default: all)
+        """
         # sign of dt: { [0, 1]: forward simulation; -1: backward simulation }
         sign_dt = np.sign(dt)
 
@@ -143,11 +157,12 @@ class KernelSOA(BaseKernel):
 
         if self.fieldset is not None:
             for f in self.fieldset.get_fields():
-                if type(f) in [VectorField, NestedField, SummedField]:
+                if type(f) in [VectorField, NestedField, SummedField] or f.shared_memory is not None:
                     continue
                 f.data = np.array(f.data)
 
-        for p in pset:
+        particles = pset if active_idx is None else ParticleCollectionIterableSOA(pset.collection, subset=active_idx)
+        for p in particles:
             self.evaluate_particle(p, endtime, sign_dt, dt, analytical=analytical)
 
     def __del__(self):
@@ -175,13 +190,30 @@ class KernelSOA(BaseKernel):
         # Indices marked for deletion.
         bool_indices = pset.collection.state == OperationCode.Delete
         indices = np.where(bool_indices)[0]
-        if len(indices) > 0 and output_file is not None:
+        if len(indices) == 0:
+            return
+        if output_file is not None:
             output_file.write(pset, endtime, deleted_only=bool_indices)
         pset.remove_indices(indices)
 
+    @staticmethod
+    def _error_indices(pset, endtime, dt):
+        """Indices of the particles in an error state, of the particles that the kernel loop visited.
+        Particles that were not visited (e.g. that are released later) are neither counted nor recovered"""
+        active_idx = pset.collection.active_indices(endtime, dt)
+        if active_idx is None:
+            active_idx = np.arange(len(pset))
+        error = np.isin(pset.collection.state[active_idx], [StateCode.Success, StateCode.Evaluate], invert=True)
+        return active_idx[error]
+
     def execute(self, pset, endtime, dt, recovery=None, output_file=None, execute_once=False):
         """Execute this Kernel over a ParticleSet for several timesteps"""
-        pset.collection.state[:] = StateCode.Evaluate
+        # Only the particles that have started are visited and reset
+        active_idx = pset.collection.active_indices(endtime, dt)
+        if active_idx is None:
+            pset.collection.state[:] = StateCode.Evaluate
+        else:
+            pset.collection.state[active_idx] = StateCode.Evaluate
 
         if abs(dt) < 1e-6 and not execute_once:
             logger.warning_once("'dt' is too small, causing numerical accuracy limit problems. Please chose a higher 'dt' and rather scale the 'time' axis of the field accordingly. (related issue #762)")
@@ -196,23 +228,22 @@ class KernelSOA(BaseKernel):
         if pset.fieldset is not None:
             for g in pset.fieldset.gridset.grids:
                 if len(g.load_chunk) > g.chunk_not_loaded:  # not the case if a field in not called in the kernel
-                    g.load_chunk = np.where(g.load_chunk == g.chunk_loaded_touched,
-                                            g.chunk_deprecated, g.load_chunk)
+                    g.load_chunk[g.load_chunk == g.chunk_loaded_touched] = g.chunk_deprecated
 
         # Execute the kernel over the particle set
         if self.ptype.uses_jit:
-            self.execute_jit(pset, endtime, dt)
+            self.execute_jit(pset, endtime, dt, active_idx)
         else:
-            self.execute_python(pset, endtime, dt)
+            self.execute_python(pset, endtime, dt, active_idx)
 
         # Remove all particles that signalled deletion
         self.remove_deleted(pset, output_file=output_file, endtime=endtime)   # Generalizable version!
 
         # Identify particles that threw errors
-        n_error = pset.num_error_particles
+        error_idx = self._error_indices(pset, endtime, dt)
 
-        while n_error > 0:
-            error_pset = pset.error_particles
+        while len(error_idx) > 0:
+            error_pset = ParticleCollectionIterableSOA(pset.collection, subset=error_idx)
             # Apply recovery kernel
             for p in error_pset:
                 if p.state == OperationCode.StopExecution:
@@ -235,9 +266,10 @@ class KernelSOA(BaseKernel):
             self.remove_deleted(pset, output_file=output_file, endtime=endtime)   # Generalizable version!
 
             # Execute core loop again to continue interrupted particles
+            active_idx = pset.collection.active_indices(endtime, dt)
             if self.ptype.uses_jit:
-                self.execute_jit(pset, endtime, dt)
+                self.execute_jit(pset, endtime, dt, active_idx)
             else:
-                self.execute_python(pset, endtime, dt)
+                self.execute_python(pset, endtime, dt, active_idx)
 
-            n_error = pset.num_error_particles
+            error_idx = self._error_indices(pset, endtime, dt)
@@ -7,7 +7,7 @@ from parcels.field import Field
 from parcels.tools.statuscodes import StateCode, OperationCode
 from parcels.tools.loggers import logger
 
-__all__ = ['ScipyParticle', 'JITParticle', 'Variable', 'ScipyInteractionParticle']
+__all__ = ['ScipyParticle', 'JITParticle', 'Variable', 'ScipyInteractionParticle', 'JITInteractionParticle']
 
 indicators_64bit = [np.float64, np.uint64, np.int64, c_void_p]
 
@@ -357,3 +357,8 @@ class JITParticle(ScipyParticle):
     def __sizeof__(self):
         ptype = self.getPType()
         return sum([v.size for v in ptype.variables])
+
+
+class JITInteractionParticle(JITParticle):
+    vert_dist = Variable("vert_dist", dtype=np.float32)
+    horiz_dist = Variable("horiz_dist", dtype=np.float32)
@@ -4,5 +4,7 @@ from .baseparticlefile import BaseParticleFile  # noqa: F401
 from .baseparticlefile import _set_calendar  # noqa: F401
 from .particlefileaos import ParticleFileAOS  # noqa: F401
 from .particlefilesoa import ParticleFileSOA  # noqa: F401
+from .onlineaccumulator import OnlineAccumulator  # noqa: F401
+from .connectivity import ConnectivityAccumulator  # noqa: F401
 
 ParticleFile = ParticleFileSOA
@@ -273,6 +273,25 @@ class BaseParticleFile(ABC):
                 np.save(f, data_dict_once)
             self.file_list_once.append(tmpfilename)
 
+    def set_tempwritedir_index(self, index):
+        """Continue writing temporary npy files in subdirectory `index` of tempwritedir_base,
+        with a new file list. Used by worker processes in ParticleSet.execute(workers=...),
+        which each write their particles to a separate subdirectory.
+
+        :param index: Integer index of the subdirectory; higher indices are exported later
+        """
+        self.tempwritedir = os.path.join(self.tempwritedir_base, "%d" % index)
+        if not os.path.exists(self.tempwritedir):
+            os.makedirs(self.tempwritedir)
+        self.file_list = []
+        if len(self.var_names_once) > 0:
+            self.file_list_once = []
+
+    def next_tempwritedir_index(self):
+        """Returns the index following the highest subdirectory index in tempwritedir_base"""
+        indices = [int(d) for d in os.listdir(self.tempwritedir_base) if d.isdigit()]
+        return max(indices) + 1 if len(indices) > 0 else 0
+
     @abstractmethod
     def get_pset_info_attributes(self):
         """
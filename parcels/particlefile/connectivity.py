@@ -0,0 +1,231 @@
+"""Module accumulating the connectivity between regions of ParticleSets during execution"""
+import os
+from datetime import timedelta as delta
+
+import netCDF4
+import numpy as np
+from scipy.sparse import coo_matrix
+
+try:
+    from mpi4py import MPI
+except:
+    MPI = None
+try:
+    from parcels._version import version as parcels_version
+except:
+    raise EnvironmentError('Parcels version can not be retrieved. Have you run ''python setup.py install''?')
+
+from parcels.field import Field
+from parcels.particlefile.onlineaccumulator import _common_time
+from parcels.particlefile.onlineaccumulator import _particles_at_time
+
+__all__ = ['ConnectivityAccumulator']
+
+
+class ConnectivityAccumulator(object):
+    """Accumulate the transition matrices between regions after given drift times (lags)
+    during execution, instead of writing the full trajectories.
+
+    The regions are given by integer labels on a grid, where negative (or NaN) labels
+    are not part of any region. The region of a particle is the label of the grid cell it
+    is in, i.e. the label at the south-west corner of the cell. The source region and
+    release time of each particle are recorded at the first write at which it is alive.
+    At the first write at which a particle has drifted for at least a lag, its transition
+    from the source to its current region is added to the matrix of that lag. Particles
+    that are deleted before a lag, or that are outside all regions, do not contribute to
+    the matrix of that lag, but are counted in the number of released particles per source
+    region, so that the matrices can be normalised into probabilities.
+
+    The accumulator can be given as the `output_file` of :meth:`ParticleSet.execute`, in
+    which case the particles are checked every `outputdt` (which should divide the lags),
+    or be called in the `postIterationCallbacks` of :meth:`ParticleSet.execute`. The
+    matrices are written on :meth:`close` to a NetCDF file in coordinate (COO) format.
+    With MPI, the matrices of all processes are summed on the first process.
+
+    :param name: Name of the output file
+    :param particleset: ParticleSet to accumulate
+    :param regions: Field, or name of a Field in the FieldSet of the ParticleSet, with the
+                    region labels (of its first time level and depth), or a 2D array of
+                    region labels on the grid of `field` (e.g. a raster of polygons)
+    :param lags: List of drift times after which the transitions are recorded, either
+                 timedelta objects or positive doubles
+    :param outputdt: Interval at which the particles are checked when the accumulator is given
+                     as `output_file` of ParticleSet.execute(). Either a timedelta object or a positive double
+    :param field: Field, or name of a Field in the FieldSet of the ParticleSet, on whose grid an
+                  array of `regions` is defined. Default is 'U'
+    """
+
+    def __init__(self, name, particleset, regions, lags, outputdt=np.infty, field='U'):
+        self.name = name
+        self.particleset = particleset
+        self.outputdt = outputdt
+        self.lags = np.array([lag.total_seconds() if isinstance(lag, delta) else lag for lag in lags], dtype=np.float64)
+        if np.any(self.lags < 0):
+            raise ValueError('lags must be positive')
+        if isinstance(regions, str):
+            regions = getattr(particleset.fieldset, regions)
+        if isinstance(regions, Field):
+            self.field = regions
+            labels = np.asarray(regions.data)
+            labels = labels[(0,) * (labels.ndim - 2)]
+        else:
+            self.field = getattr(particleset.fieldset, field) if isinstance(field, str) else field
+            labels = np.asarray(regions)
+        if labels.shape != (self.field.grid.ydim, self.field.grid.xdim):
+            raise ValueError('Shape %s of the region labels does not match the grid of Field %s'
+                             % (labels.shape, self.field.name))
+        with np.errstate(invalid='ignore'):
+            self.labels = np.where(np.isfinite(labels), labels, -1).astype(np.int64).ravel()
+        self.nregions = int(max(self.labels.max() + 1, 0))
+        self.time_origin = particleset.time_origin
+        self.lasttime_written = None
+
+        # Records of the particles, sorted by particle id
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._source = np.zeros(0, dtype=np.int64)
+        self._release = np.zeros(0, dtype=np.float64)
+        self._done = np.zeros((0, len(self.lags)), dtype=bool)
+
+        self.released = np.zeros(self.nregions, dtype=np.int64)
+        # Sparse transition counts, with keys (lag index * nregions + source) * nregions + destination
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def region(self, pset):
+        """The region labels of the particles of `pset`, -1 for particles outside all regions
+
+        :param pset: ParticleSet of the particles
+        """
+        xi, yi = pset._density_index_hints(self.field)
+        xi, yi, found = self.field.search_indices_2d(pset.lon, pset.lat, xi, yi)
+        region = self.labels[yi.astype(np.int64) * self.field.grid.xdim + xi]
+        return np.where(found, region, -1)
+
+    def _record_index(self, ids):
+        """Positions of particle `ids` in the records, and whether they have been recorded"""
+        if len(self._ids) == 0:
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self._ids, ids), len(self._ids) - 1)
+        return pos, self._ids[pos] == ids
+
+    def _add_records(self, ids, source, time):
+        ids = np.concatenate((self._ids, ids))
+        order = np.argsort(ids, kind='stable')
+        self._ids = ids[order]
+        self._source = np.concatenate((self._source, source))[order]
+        self._release = np.concatenate((self._release, np.full(len(source), time)))[order]
+        self._done = np.concatenate((self._done, np.zeros((len(source), len(self.lags)), dtype=bool)))[order]
+        self.released += np.bincount(source[source >= 0], minlength=self.nregions)
+
+    def _add_transitions(self, keys):
+        counts = np.concatenate((self._counts, np.ones(len(keys), dtype=np.int64)))
+        self._keys, inverse = np.unique(np.concatenate((self._keys, keys)), return_inverse=True)
+        self._counts = np.bincount(inverse.reshape(-1), weights=counts, minlength=len(self._keys)).astype(np.int64)
+
+    def write(self, pset, time, deleted_only=False):
+        """Record the source regions of new particles of `pset` and the transitions of the
+        particles that have drifted for a lag at `time`
+
+        :param pset: ParticleSet to accumulate
+        :param time: Time at which the particles are accumulated
+        :param deleted_only: Flag of writes of deleted particles, which are ignored
+        """
+        if deleted_only is not False:
+            return
+        time = time.total_seconds() if isinstance(time, delta) else time
+        if self.lasttime_written == time:
+            return
+        self.lasttime_written = time
+
+        at_time = _particles_at_time(pset, time)
+        ids = np.asarray(pset.id, dtype=np.int64)[at_time]
+        region = self.region(pset)[at_time]
+        idx, found = self._record_index(ids)
+        if not found.all():
+            self._add_records(ids[~found], region[~found], time)
+            idx, found = self._record_index(ids)
+
+        age = np.abs(time - self._release[idx])
+        arrived = (age[:, None] >= self.lags[None, :] - 1e-6) & ~self._done[idx]
+        self._done[idx] |= arrived
+        lag_index, = np.nonzero(arrived.any(axis=0))
+        for lag in lag_index:
+            particles = np.nonzero(arrived[:, lag])[0]
+            source = self._source[idx[particles]]
+            destination = region[particles]
+            valid = (source >= 0) & (destination >= 0)
+            self._add_transitions((lag * self.nregions + source[valid]) * self.nregions + destination[valid])
+
+    def __call__(self):
+        """Accumulate the particles of the ParticleSet at the time that most particles have
+        reached, so that the accumulator can be used in `postIterationCallbacks`.
+        With MPI, this has to be called on all processes"""
+        time = _common_time(self.particleset)
+        if time is not None:
+            self.write(self.particleset, time)
+
+    def _reduce(self):
+        """The released particles and transition counts of all MPI processes, on the first process"""
+        if MPI is None or MPI.COMM_WORLD.Get_size() == 1:
+            return self.released, self._keys, self._counts
+        comm = MPI.COMM_WORLD
+        released = np.empty_like(self.released)
+        comm.Reduce(self.released, released, op=MPI.SUM, root=0)
+        transitions = comm.gather((self._keys, self._counts), root=0)
+        if comm.Get_rank() != 0:
+            return released, None, None
+        keys, inverse = np.unique(np.concatenate([t[0] for t in transitions]), return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=np.concatenate([t[1] for t in transitions]),
+                             minlength=len(keys)).astype(np.int64)
+        return released, keys, counts
+
+    def matrix(self, lag):
+        """Transition matrix (of this process) with the number of particles from each source
+        region (rows) to each destination region (columns) after lag `lag`
+
+        :param lag: Index of the lag in `lags`
+        :return: scipy.sparse.csr_matrix of shape (nregions, nregions)
+        """
+        first, last = np.searchsorted(self._keys, [lag * self.nregions**2, (lag + 1) * self.nregions**2])
+        keys = self._keys[first:last] - lag * self.nregions**2
+        return coo_matrix((self._counts[first:last], (keys // self.nregions, keys % self.nregions)),
+                          shape=(self.nregions, self.nregions)).tocsr()
+
+    def close(self):
+        """Write the transition matrices to NetCDF"""
+        released, keys, counts = self._reduce()
+        mpi_rank = MPI.COMM_WORLD.Get_rank() if MPI else 0
+        if mpi_rank == 0:
+            self._write_netcdf(released, keys, counts)
+
+    def _write_netcdf(self, released, keys, counts):
+        extension = os.path.splitext(str(self.name))[1]
+        fname = self.name if extension in ['.nc', '.nc4'] else "%s.nc" % self.name
+        if os.path.exists(str(fname)):
+            os.remove(str(fname))
+        dataset = netCDF4.Dataset(fname, "w", format="NETCDF4")
+        dataset.createDimension("lag", len(self.lags))
+        dataset.createDimension("region", self.nregions)
+        dataset.createDimension("transition", len(keys))
+        dataset.parcels_version = parcels_version
+        dataset.description = ("Number of particles per lag from source region to destination region, "
+                               "in coordinate format (lag_index, source, destination, count)")
+
+        lag = dataset.createVariable("lag", "f8", ("lag",))
+        lag.long_name = "Drift time after release"
+        lag.units = "seconds"
+        lag[:] = self.lags
+        nreleased = dataset.createVariable("released", "i8", ("region",))
+        nreleased.long_name = "Number of particles released per source region"
+        nreleased[:] = released
+
+        lag_index, keys = np.divmod(keys, self.nregions**2)
+        source, destination = np.divmod(keys, self.nregions)
+        for vname, values, long_name in [('lag_index', lag_index, 'Index of the lag of the transition'),
+                                         ('source', source, 'Source region of the transition'),
+                                         ('destination', destination, 'Destination region of the transition'),
+                                         ('count', counts, 'Number of particles of the transition')]:
+            var = dataset.createVariable(vname, "i4" if vname != 'count' else "i8", ("transition",))
+            var.long_name = long_name
+            var[:] = values
+        dataset.close()
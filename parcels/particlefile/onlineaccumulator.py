@@ -0,0 +1,268 @@
+"""Module accumulating gridded statistics of ParticleSets during execution"""
+import os
+from datetime import timedelta as delta
+
+import netCDF4
+import numpy as np
+
+try:
+    from mpi4py import MPI
+except:
+    MPI = None
+try:
+    from parcels._version import version as parcels_version
+except:
+    raise EnvironmentError('Parcels version can not be retrieved. Have you run ''python setup.py install''?')
+
+from parcels.particlefile.baseparticlefile import _set_calendar
+from parcels.tools.statuscodes import OperationCode
+
+__all__ = ['OnlineAccumulator']
+
+
+def _particles_at_time(pset, time):
+    """Boolean array of the particles of `pset` that are alive at `time`, within half their dt"""
+    ptime = np.asarray(pset.time, dtype=np.float64)
+    pdt = np.abs(np.asarray(pset.dt, dtype=np.float64))
+    with np.errstate(invalid='ignore'):
+        at_time = np.where(np.isnan(pdt), ptime == time, np.abs(ptime - time) <= pdt / 2)
+    return at_time & (np.asarray(pset.state) != OperationCode.Delete)
+
+
+def _common_time(pset):
+    """The time that most alive particles of `pset` have reached (on all MPI processes together),
+    or None if there are none. Collective on MPI.COMM_WORLD"""
+    ptime = np.asarray(pset.time, dtype=np.float64)
+    ptime = ptime[np.isfinite(ptime) & (np.asarray(pset.state) != OperationCode.Delete)]
+    times, counts = np.unique(ptime, return_counts=True)
+    if MPI is not None and MPI.COMM_WORLD.Get_size() > 1:
+        gathered = MPI.COMM_WORLD.allgather((times, counts))
+        times = np.concatenate([t for t, _ in gathered])
+        counts = np.concatenate([c for _, c in gathered])
+        times, inverse = np.unique(times, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts)
+    if len(times) == 0:
+        return None
+    return times[np.argmax(counts)]
+
+
+def _allreduce(value, op):
+    """`value` reduced with `op` (a name of an MPI operation, e.g. 'MAX') over all MPI processes"""
+    if MPI is None or MPI.COMM_WORLD.Get_size() == 1:
+        return value
+    return MPI.COMM_WORLD.allreduce(value, op=getattr(MPI, op))
+
+
+class OnlineAccumulator(object):
+    """Accumulate statistics of particle Variables per grid cell during execution,
+    instead of writing the full trajectories.
+
+    Each time the accumulator is written to, the particles are binned onto the grid of
+    `field`, and the number of particles and the sum, sum of squares, minimum and maximum
+    of each of the `variables` are added to running totals per grid cell. At the end of
+    each `period`, the count, mean, standard deviation, minimum and maximum per grid cell
+    are written to a NetCDF file and the totals are reset.
+
+    The accumulator can be given as the `output_file` of :meth:`ParticleSet.execute`, in
+    which case the particles are binned every `outputdt`, or be called in the
+    `postIterationCallbacks` of :meth:`ParticleSet.execute`. With MPI, each process
+    accumulates its own particles, and the totals are reduced onto the first process
+    when a period is written. The statistics of the last period are written on :meth:`close`.
+
+    :param name: Basename of the output file(s)
+    :param particleset: ParticleSet to accumulate
+    :param outputdt: Interval at which the particles are binned when the accumulator is given
+                     as `output_file` of ParticleSet.execute(). Either a timedelta object or a positive double
+    :param variables: List of names of particle Variables to compute statistics of.
+                      Default is None, to only count the particles
+    :param field: Field, or name of a Field in the FieldSet of the ParticleSet, on whose
+                  (horizontal) grid the particles are binned. Default is 'U'
+    :param period: Length of the accumulation periods, either a timedelta object or a positive
+                   double. The statistics of each period are written to name_XXXX.nc, with XXXX the
+                   index of the period since the first write. Default is None, to accumulate
+                   all writes in one file name.nc, which is written on :meth:`close`
+    """
+
+    def __init__(self, name, particleset, outputdt=np.infty, variables=None, field='U', period=None):
+        self.name = name
+        self.particleset = particleset
+        self.outputdt = outputdt
+        self.variables = [] if variables is None else list(variables)
+        for var in self.variables:
+            if var not in [v.name for v in particleset.collection.ptype.variables]:
+                raise ValueError("Variable %s is not a Variable of the particles" % var)
+        self.field = getattr(particleset.fieldset, field) if isinstance(field, str) else field
+        self.period = period.total_seconds() if isinstance(period, delta) else period
+        if self.period is not None and self.period <= 0:
+            raise ValueError('period must be positive')
+        self.time_origin = particleset.time_origin
+        self.lasttime_written = None
+        self.period_start = None
+        self.period_index = None
+        self._reset()
+
+    def _reset(self):
+        """Set the running totals to zero"""
+        ncells = self.field.grid.ydim * self.field.grid.xdim
+        self.nsamples = 0
+        self.times = []
+        self.count = np.zeros(ncells, dtype=np.int64)
+        self.totals = {}
+        for var in self.variables:
+            self.totals[var] = {'sum': np.zeros(ncells, dtype=np.float64),
+                                'sumsq': np.zeros(ncells, dtype=np.float64),
+                                'min': np.full(ncells, np.inf, dtype=np.float64),
+                                'max': np.full(ncells, -np.inf, dtype=np.float64)}
+
+    def write(self, pset, time, deleted_only=False):
+        """Add the particles of `pset` at `time` to the running totals, and write the
+        statistics of the previous period if `time` starts a new period
+
+        :param pset: ParticleSet to accumulate
+        :param time: Time at which the particles are accumulated
+        :param deleted_only: Flag of writes of deleted particles, which are ignored
+                             as these particles were accumulated while they were alive
+        """
+        if deleted_only is not False:
+            return
+        time = time.total_seconds() if isinstance(time, delta) else time
+        # All MPI processes write at the same time, as writing a period is collective
+        time = _allreduce(time, 'MAX')
+        if self.lasttime_written == time:
+            return
+        self.lasttime_written = time
+
+        if self.period is not None:
+            if self.period_start is None:
+                self.period_start = time
+            index = int(abs(time - self.period_start) // self.period)
+            if self.period_index is not None and index != self.period_index and _allreduce(self.nsamples, 'MAX') > 0:
+                self._write_period()
+            self.period_index = index
+        self.accumulate(pset, time)
+
+    def __call__(self):
+        """Add the particles of the ParticleSet to the running totals at the time that most
+        particles have reached, so that the accumulator can be used in `postIterationCallbacks`.
+        With MPI, this has to be called on all processes"""
+        time = _common_time(self.particleset)
+        if time is not None:
+            self.write(self.particleset, time)
+
+    def accumulate(self, pset, time):
+        """Bin the particles of `pset` that are at `time` onto the grid and add them to the running totals
+
+        :param pset: ParticleSet to accumulate
+        :param time: Time of the particles to accumulate
+        """
+        at_time = _particles_at_time(pset, time)
+        xi, yi = pset._density_index_hints(self.field)
+        xi, yi, found = self.field.search_indices_2d(pset.lon, pset.lat, xi, yi)
+        found &= at_time
+        cells = (yi.astype(np.int64) * self.field.grid.xdim + xi)[found]
+
+        ncells = len(self.count)
+        self.count += np.bincount(cells, minlength=ncells)
+        for var in self.variables:
+            values = np.asarray(getattr(pset, var), dtype=np.float64)[found]
+            totals = self.totals[var]
+            totals['sum'] += np.bincount(cells, weights=values, minlength=ncells)
+            totals['sumsq'] += np.bincount(cells, weights=values**2, minlength=ncells)
+            np.minimum.at(totals['min'], cells, values)
+            np.maximum.at(totals['max'], cells, values)
+        self.nsamples += 1
+        self.times.append(time)
+
+    def _reduce(self):
+        """The running totals, summed over all MPI processes on the first process"""
+        if MPI is None or MPI.COMM_WORLD.Get_size() == 1:
+            return self.count, self.totals
+        comm = MPI.COMM_WORLD
+
+        def reduce(array, op):
+            result = np.empty_like(array)
+            comm.Reduce(array, result, op=op, root=0)
+            return result
+
+        count = reduce(self.count, MPI.SUM)
+        totals = {}
+        for var in self.variables:
+            totals[var] = {'sum': reduce(self.totals[var]['sum'], MPI.SUM),
+                           'sumsq': reduce(self.totals[var]['sumsq'], MPI.SUM),
+                           'min': reduce(self.totals[var]['min'], MPI.MIN),
+                           'max': reduce(self.totals[var]['max'], MPI.MAX)}
+        return count, totals
+
+    def _filename(self):
+        basename = os.path.splitext(str(self.name))[0] if os.path.splitext(str(self.name))[1] in ['.nc', '.nc4'] else str(self.name)
+        if self.period is None:
+            return "%s.nc" % basename
+        return "%s_%.4d.nc" % (basename, self.period_index)
+
+    def _write_period(self):
+        """Write the statistics of the current period to NetCDF and reset the running totals"""
+        count, totals = self._reduce()
+        mpi_rank = MPI.COMM_WORLD.Get_rank() if MPI else 0
+        if mpi_rank == 0:
+            self._write_netcdf(self._filename(), count, totals)
+        self._reset()
+
+    def _write_netcdf(self, fname, count, totals):
+        grid = self.field.grid
+        shape = (1, grid.ydim, grid.xdim)
+        if os.path.exists(fname):
+            os.remove(fname)
+        dataset = netCDF4.Dataset(fname, "w", format="NETCDF4")
+        dataset.createDimension("time", 1)
+        dataset.createDimension("nv", 2)
+        dataset.createDimension("y", grid.ydim)
+        dataset.createDimension("x", grid.xdim)
+        dataset.Conventions = "CF-1.6/CF-1.7"
+        dataset.parcels_version = parcels_version
+        dataset.parcels_mesh = grid.mesh
+        dataset.nsamples = self.nsamples
+
+        time = dataset.createVariable("time", "f8", ("time",))
+        time.standard_name = "time"
+        time.bounds = "time_bounds"
+        if self.time_origin.calendar is None:
+            time.units = "seconds"
+        else:
+            time.units = "seconds since " + str(self.time_origin)
+            time.calendar = _set_calendar(self.time_origin.calendar)
+        time.axis = "T"
+        time[:] = [self.times[0]]
+        time_bounds = dataset.createVariable("time_bounds", "f8", ("time", "nv"))
+        time_bounds[:] = [[min(self.times), max(self.times)]]
+
+        coords = ("x",) if grid.lon.ndim == 1 else ("y", "x")
+        lon = dataset.createVariable("lon", "f8", coords)
+        lon.standard_name = "longitude" if grid.mesh == 'spherical' else ""
+        lon[:] = grid.lon
+        coords = ("y",) if grid.lat.ndim == 1 else ("y", "x")
+        lat = dataset.createVariable("lat", "f8", coords)
+        lat.standard_name = "latitude" if grid.mesh == 'spherical' else ""
+        lat[:] = grid.lat
+
+        dims = ("time", "y", "x")
+        ncount = dataset.createVariable("count", "i8", dims)
+        ncount.long_name = "Number of particles in the grid cell, summed over the %d samples of the period" % self.nsamples
+        ncount[:] = count.reshape(shape)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for var in self.variables:
+                mean = totals[var]['sum'] / count
+                std = np.sqrt(np.maximum(totals[var]['sumsq'] / count - mean**2, 0))
+                stats = {'mean': mean, 'std': std,
+                         'min': np.where(count > 0, totals[var]['min'], np.nan),
+                         'max': np.where(count > 0, totals[var]['max'], np.nan)}
+                for stat, values in stats.items():
+                    nvar = dataset.createVariable("%s_%s" % (var, stat), "f4", dims, fill_value=np.nan)
+                    nvar.long_name = "%s of particle variable %s in the grid cell" % (stat, var)
+                    nvar[:] = values.reshape(shape)
+        dataset.close()
+
+    def close(self):
+        """Write the statistics of the last period. With MPI, this has to be called on all processes"""
+        if _allreduce(self.nsamples, 'MAX') > 0:
+            self._write_period()
@@ -124,7 +124,7 @@ class ParticleFileSOA(BaseParticleFile):
         if len(self.var_names_once) > 0:
             global_file_list_once = []
         for tempwritedir in temp_names:
-            if os.path.exists(tempwritedir):
+            if os.path.exists(os.path.join(tempwritedir, 'pset_info.npy')):
                 pset_info_local = np.load(os.path.join(tempwritedir, 'pset_info.npy'), allow_pickle=True).item()
                 for npyfile in pset_info_local['file_list']:
                     tmp_dict = np.load(npyfile, allow_pickle=True).item()
@@ -1,6 +1,7 @@
 from .baseparticleset import BaseParticleSet  # noqa
 from .particlesetaos import ParticleSetAOS  # noqa
 from .particlesetsoa import ParticleSetSOA  # noqa
+from .ensemble import Ensemble  # noqa
 
 # ParticleSet is an alias for ParticleSetSOA, i.e. the default
 # implementation for storing particles is the Structure of Arrays
@@ -217,21 +217,67 @@ class BaseParticleSet(NDCluster):
         """
         pass
 
-    def density(self, field_name=None, particle_val=None, relative=False, area_scale=False):
+    def density(self, field_name=None, particle_val=None, relative=False, area_scale=False, time_bins=None):
         """Method to calculate the density of particles in a ParticleSet from their locations,
-        through a 2D histogram.
+        through a 2D histogram on the grid of a Field.
 
-        :param field: Optional :mod:`parcels.field.Field` object to calculate the histogram
-                      on. Default is `fieldset.U`
+        The cells of the particles are found with a vectorised index search
+        (:meth:`parcels.field.Field.search_indices_2d`), so the particles are not sampled
+        with a kernel. Particles outside of the grid are not counted.
+
+        :param field_name: Optional name of the :mod:`parcels.field.Field` object to calculate
+                           the histogram on. Default is `U`
         :param particle_val: Optional numpy-array of values to weigh each particle with,
-                             or string name of particle variable to use weigh particles with.
+                             or string name of particle variable to use weigh particles with,
+                             or a list of these (including None) to compute the density for each of them.
+                             A list of one scalar per particle is taken as a single array of values.
                              Default is None, resulting in a value of 1 for each particle
         :param relative: Boolean to control whether the density is scaled by the total
-                         weight of all particles. Default is False
+                         weight of all particles (in each time bin). Default is False
         :param area_scale: Boolean to control whether the density is scaled by the area
                            (in m^2) of each grid cell. Default is False
+        :param time_bins: Optional array of the edges of time bins (in seconds, like the particle
+                          time), to compute the density of the particles in each time bin
+        :return: Array of the density with shape [ydim, xdim] of the grid, preceded by the
+                 number of time bins if `time_bins` is given, and by the number of values if
+                 `particle_val` is a list
         """
-        pass
+        field = getattr(self.fieldset, field_name if field_name else 'U')
+        grid = field.grid
+        xi, yi = self._density_index_hints(field)
+        xi, yi, found = field.search_indices_2d(self.lon, self.lat, xi, yi)
+
+        ncells = grid.ydim * grid.xdim
+        cells = yi.astype(np.int64) * grid.xdim + xi
+        nbins = 1
+        if time_bins is not None:
+            nbins = len(time_bins) - 1
+            tbin = np.digitize(self.time, time_bins) - 1
+            found &= (tbin >= 0) & (tbin < nbins)
+            cells += tbin * ncells
+        cells = cells[found]
+
+        # A list of one scalar weight per particle is a single weight array; any other list holds several values
+        multiple = isinstance(particle_val, (list, tuple)) and (
+            len(particle_val) != len(self) or not all(np.isscalar(v) and not isinstance(v, str) for v in particle_val))
+        densities = []
+        for val in (particle_val if multiple else [particle_val]):
+            if isinstance(val, str):
+                val = getattr(self, val)
+            weights = None if val is None else np.asarray(val, dtype=np.float64)[found]
+            density = np.bincount(cells, weights=weights, minlength=nbins*ncells).reshape(nbins, grid.ydim, grid.xdim)
+            if relative:
+                total = density.sum(axis=(1, 2), keepdims=True)
+                density = np.divide(density, total, out=np.zeros_like(density, dtype=np.float64), where=total != 0)
+            if area_scale:
+                density = density / field.cell_areas()
+            densities.append(density if time_bins is not None else density[0])
+        densities = np.array(densities, dtype=np.float32)
+        return densities if multiple else densities[0]
+
+    def _density_index_hints(self, field):
+        """First guesses of the indices of the particles on the grid of `field`, for :meth:`density`"""
+        return None, None
 
     @abstractmethod
     def Kernel(self, pyfunc, c_include="", delete_cfiles=True):
@@ -303,7 +349,7 @@ class BaseParticleSet(NDCluster):
 
     def execute(self, pyfunc=AdvectionRK4, pyfunc_inter=None, endtime=None, runtime=None, dt=1.,
                 moviedt=None, recovery=None, output_file=None, movie_background_field=None,
-                verbose_progress=None, postIterationCallbacks=None, callbackdt=None):
+                verbose_progress=None, postIterationCallbacks=None, callbackdt=None, workers=None, dense_output=False):
         """Execute a given kernel function over the particle set for
         multiple timesteps. Optionally also provide sub-timestepping
         for particle output.
@@ -331,6 +377,40 @@ class BaseParticleSet(NDCluster):
         :param verbose_progress: Boolean for providing a progress bar for the kernel execution loop.
         :param postIterationCallbacks: (Optional) Array of functions that are to be called after each iteration (post-process, non-Kernel)
         :param callbackdt: (Optional, in conjecture with 'postIterationCallbacks) timestep inverval to (latestly) interrupt the running kernel and invoke post-iteration callbacks from 'postIterationCallbacks'
+        :param workers: (Optional) Number of local processes over which to split the particles during execution,
+                        as an alternative to MPI. Default is None, meaning execution in the current process
+        :param dense_output: Boolean whether the integration steps are not cut at the output times of `output_file`.
+                             The particles are then written at the output times by linear interpolation of their
+                             written Variables between the start and end of the integration step that contains
+                             the output time. Default is False
+        """
+        _starttime, endtime, dt, outputdt, moviedt, callbackdt, execute_once = self._prepare_execute(
+            pyfunc, pyfunc_inter, endtime, runtime, dt, moviedt, output_file, callbackdt)
+
+        if workers is not None and workers > 1 and len(self) > 1:
+            if self.interaction_kernel is not None:
+                raise NotImplementedError('InteractionKernels can not be executed with workers, as the particles on different workers do not see each other')
+            if moviedt:
+                raise NotImplementedError('Movies can not be made when executing with workers')
+            self._execute_on_workers(min(workers, len(self)), _starttime, endtime, dt, outputdt=outputdt, callbackdt=callbackdt,
+                                     recovery=recovery, output_file=output_file,
+                                     postIterationCallbacks=postIterationCallbacks, execute_once=execute_once,
+                                     dense_output=dense_output)
+        else:
+            self._execute_timeloop(_starttime, endtime, dt, outputdt=outputdt, moviedt=moviedt, callbackdt=callbackdt,
+                                   recovery=recovery, output_file=output_file, movie_background_field=movie_background_field,
+                                   verbose_progress=verbose_progress, postIterationCallbacks=postIterationCallbacks,
+                                   execute_once=execute_once, dense_output=dense_output)
+
+    def _jit_compiler(self):
+        """Returns the compiler for the JIT kernels of this ParticleSet"""
+        cppargs = ['-DDOUBLE_COORD_VARIABLES'] if self.collection.lonlatdepth_dtype else None
+        return GNUCompiler(cppargs=cppargs, incdirs=[path.join(get_package_dir(), 'include'), "."])
+
+    def _prepare_execute(self, pyfunc, pyfunc_inter, endtime, runtime, dt, moviedt, output_file, callbackdt):
+        """Set up the kernels for :meth:`execute` and convert its time arguments to seconds.
+
+        :return: Tuple of (starttime, endtime, dt, outputdt, moviedt, callbackdt, execute_once)
         """
         # check if pyfunc has changed since last compile. If so, recompile
         if self.kernel is None or (self.kernel.pyfunc is not pyfunc and self.kernel is not pyfunc):
@@ -342,8 +422,7 @@ class BaseParticleSet(NDCluster):
             # Prepare JIT kernel execution
             if self.collection.ptype.uses_jit:
                 self.kernel.remove_lib()
-                cppargs = ['-DDOUBLE_COORD_VARIABLES'] if self.collection.lonlatdepth_dtype else None
-                self.kernel.compile(compiler=GNUCompiler(cppargs=cppargs, incdirs=[path.join(get_package_dir(), 'include'), "."]))
+                self.kernel.compile(compiler=self._jit_compiler())
                 self.kernel.load_lib()
 
         # Set up the interaction kernel(s) if not set and given.
@@ -352,6 +431,11 @@ class BaseParticleSet(NDCluster):
                 self.interaction_kernel = pyfunc_inter
             else:
                 self.interaction_kernel = self.InteractionKernel(pyfunc_inter)
+            # Prepare JIT interaction kernel execution
+            if self.collection.ptype.uses_jit:
+                self.interaction_kernel.remove_lib()
+                self.interaction_kernel.compile(compiler=self._jit_compiler())
+                self.interaction_kernel.load_lib()
 
         # Convert all time variables to seconds
         if isinstance(endtime, delta):
@@ -409,6 +493,67 @@ class BaseParticleSet(NDCluster):
 
         self._set_particle_vector('dt', dt)
 
+        return _starttime, endtime, dt, outputdt, moviedt, callbackdt, execute_once
+
+    def _execute_on_workers(self, workers, starttime, endtime, dt, output_file=None, **kwargs):
+        """Run the time loop of :meth:`execute` on several local processes, each advancing a
+        part of the particles. Implemented by the ParticleSet structures that support it."""
+        raise NotImplementedError('Execution with workers is not supported for %s' % type(self).__name__)
+
+    @staticmethod
+    def _dense_output_stop(time, next_output, dt):
+        """Time at which the time loop stops for dense output at `next_output`: the output time itself
+        if it is a whole number of time steps `dt` away, and otherwise the start and then the end of
+        the time step that contains the output time"""
+        nsteps = (next_output - time) / dt
+        if abs(nsteps - np.round(nsteps)) < 1e-6:
+            return next_output
+        nsteps = np.ceil(nsteps)
+        return time + (nsteps - 1 if nsteps > 1 else 1) * dt
+
+    def _dense_output_state(self):
+        """Copy of the particle Variables to be written at the start of an integration step,
+        from which :meth:`_write_dense_output` interpolates. Implemented by the ParticleSet
+        structures that support dense output"""
+        raise NotImplementedError('Dense output is not supported for %s' % type(self).__name__)
+
+    def _write_dense_output(self, output_file, time, state):
+        """Write the particles to `output_file` at `time`, interpolated between `state` (from
+        :meth:`_dense_output_state`) and the current particles"""
+        raise NotImplementedError('Dense output is not supported for %s' % type(self).__name__)
+
+    def _schedule_repeated_releases(self, next_prelease, endtime, dt):
+        """Prepare the repeated releases (see `repeatdt`) from `next_prelease` up to `endtime` in
+        advance, for the ParticleSet structures that support it. The prepared particles are only
+        added to the ParticleSet by :meth:`_release_repeated` at their release time"""
+        pass
+
+    def _release_repeated(self, time, dt):
+        """Add the particles of the repeated release (see `repeatdt`) at `time` to the ParticleSet"""
+        pset_new = self.__class__(
+            fieldset=self.fieldset, time=time, lon=self.repeatlon,
+            lat=self.repeatlat, depth=self.repeatdepth,
+            pclass=self.repeatpclass,
+            lonlatdepth_dtype=self.collection.lonlatdepth_dtype,
+            partitions=False, pid_orig=self.repeatpid, **self.repeatkwargs)
+        for p in pset_new:
+            p.dt = dt
+        self.add(pset_new)
+
+    def _execute_timeloop(self, _starttime, endtime, dt, **kwargs):
+        """Time loop of :meth:`execute`, from `_starttime` to `endtime`, with the kernels already set up"""
+        for _ in self._timeloop(_starttime, endtime, dt, **kwargs):
+            pass
+
+    def _timeloop(self, _starttime, endtime, dt, outputdt=np.infty, moviedt=None, callbackdt=None,
+                  recovery=None, output_file=None, movie_background_field=None, verbose_progress=None,
+                  postIterationCallbacks=None, execute_once=False, dense_output=False):
+        """Generator running the time loop of :meth:`execute`. It yields the time reached each
+        time before it loads new FieldSet data, so that the caller can interleave the loops of
+        several ParticleSets on the same FieldSet (see :class:`parcels.particleset.ensemble.Ensemble`)"""
+        dense_output = dense_output and output_file is not None and dt != 0 and outputdt < np.infty
+        if dense_output:
+            self._dense_output_state()  # check that dense output is supported before starting
         # First write output_file, because particles could have been added
         if output_file:
             output_file.write(self, _starttime)
@@ -418,13 +563,14 @@ class BaseParticleSet(NDCluster):
         if moviedt is None:
             moviedt = np.infty
         if callbackdt is None:
-            interupt_dts = [np.infty, moviedt, outputdt]
+            interupt_dts = [np.infty, moviedt, np.infty if dense_output else outputdt]
             if self.repeatdt is not None:
                 interupt_dts.append(self.repeatdt)
             callbackdt = np.min(np.array(interupt_dts))
         time = _starttime
         if self.repeatdt:
             next_prelease = self.repeat_starttime + (abs(time - self.repeat_starttime) // self.repeatdt + 1) * self.repeatdt * np.sign(dt)
+            self._schedule_repeated_releases(next_prelease, endtime, dt)
         else:
             next_prelease = np.infty if dt > 0 else - np.infty
         next_output = time + outputdt if dt > 0 else time - outputdt
@@ -441,17 +587,21 @@ class BaseParticleSet(NDCluster):
         while (time < endtime and dt > 0) or (time > endtime and dt < 0) or dt == 0:
             if verbose_progress is None and time_module.time() - walltime_start > 10:
                 # Showing progressbar if runtime > 10 seconds
-                if output_file:
+                if getattr(output_file, 'tempwritedir_base', None):
                     logger.info('Temporary output files are stored in %s.' % output_file.tempwritedir_base)
                     logger.info('You can use "parcels_convert_npydir_to_netcdf %s" to convert these '
                                 'to a NetCDF file during the run.' % output_file.tempwritedir_base)
                 pbar = self.__create_progressbar(_starttime, endtime)
                 verbose_progress = True
 
+            next_output_stop = self._dense_output_stop(time, next_output, dt) if dense_output else next_output
             if dt > 0:
-                next_time = min(next_prelease, next_input, next_output, next_movie, next_callback, endtime)
+                next_time = min(next_prelease, next_input, next_output_stop, next_movie, next_callback, endtime)
             else:
-                next_time = max(next_prelease, next_input, next_output, next_movie, next_callback, endtime)
+                next_time = max(next_prelease, next_input, next_output_stop, next_movie, next_callback, endtime)
+            if dense_output and (next_time - next_output) * np.sign(dt) > tol:
+                # the particles pass an output time in this part of the loop
+                dense_state = self._dense_output_state()
 
             # If we don't perform interaction, only execute the normal kernel efficiently.
             if self.interaction_kernel is None:
@@ -478,17 +628,12 @@ class BaseParticleSet(NDCluster):
             # End of interaction specific code
             time = next_time
             if abs(time-next_prelease) < tol:
-                pset_new = self.__class__(
-                    fieldset=self.fieldset, time=time, lon=self.repeatlon,
-                    lat=self.repeatlat, depth=self.repeatdepth,
-                    pclass=self.repeatpclass,
-                    lonlatdepth_dtype=self.collection.lonlatdepth_dtype,
-                    partitions=False, pid_orig=self.repeatpid, **self.repeatkwargs)
-                for p in pset_new:
-                    p.dt = dt
-                self.add(pset_new)
+                self._release_repeated(time, dt)
                 next_prelease += self.repeatdt * np.sign(dt)
-            if abs(time - next_output) < tol or dt == 0:
+            output_reached = abs(time - next_output) < tol
+            if dense_output:
+                output_reached = (time - next_output) * np.sign(dt) > -tol
+            if output_reached or dt == 0:
                 for fld in self.fieldset.get_fields():
                     if hasattr(fld, 'to_write') and fld.to_write:
                         if fld.grid.tdim > 1:
@@ -496,7 +641,14 @@ class BaseParticleSet(NDCluster):
                         fldfilename = str(output_file.name).replace('.nc', '_%.4d' % fld.to_write)
                         fld.write(fldfilename)
                         fld.to_write += 1
-            if abs(time - next_output) < tol:
+            if output_reached and dense_output:
+                while (time - next_output) * np.sign(dt) > -tol:
+                    if abs(time - next_output) < tol:
+                        output_file.write(self, time)
+                    else:
+                        self._write_dense_output(output_file, next_output, dense_state)
+                    next_output += outputdt * np.sign(dt)
+            elif output_reached:
                 if output_file:
                     output_file.write(self, time)
                 next_output += outputdt * np.sign(dt)
@@ -510,6 +662,7 @@ class BaseParticleSet(NDCluster):
                         extFunc()
                 next_callback += callbackdt * np.sign(dt)
             if time != endtime:
+                yield time
                 next_input = self.fieldset.computeTimeChunk(time, dt)
             if dt == 0:
                 break
@@ -0,0 +1,82 @@
+from datetime import timedelta as delta
+
+import numpy as np
+
+from parcels.application_kernels.advection import AdvectionRK4
+
+__all__ = ['Ensemble']
+
+
+class Ensemble(object):
+    """Class to execute several ParticleSets that share one FieldSet in lockstep,
+    so that every snapshot of the FieldSet is loaded only once for all members.
+
+    Each member is a ParticleSet with its own kernel, ParticleFile and recovery map,
+    and possibly its own particle class and release times. During :meth:`execute`,
+    the member that is furthest behind in time is always advanced first, and the
+    FieldSet is only advanced to the next time chunk when all members need it.
+
+    :param members: Optional list of ParticleSets to add, with the default kernel (AdvectionRK4).
+           Use :meth:`add` to specify kernels, output and recovery per member
+    """
+
+    def __init__(self, members=None):
+        self.fieldset = None
+        self.members = []
+        if members is not None:
+            for pset in members:
+                self.add(pset)
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, pset, pyfunc=AdvectionRK4, output_file=None, recovery=None, pyfunc_inter=None):
+        """Add a ParticleSet to the Ensemble
+
+        :param pset: ParticleSet to execute. Its FieldSet must be the FieldSet of the other members
+        :param pyfunc: Kernel function to execute on this member (see :meth:`parcels.particleset.ParticleSet.execute`)
+        :param output_file: Optional :mod:`parcels.particlefile.ParticleFile` object for the output of this member
+        :param recovery: Optional dictionary with recovery kernels for this member
+        :param pyfunc_inter: Optional interaction kernel function for this member
+        """
+        if pset.fieldset is None:
+            raise ValueError('Members of an Ensemble need a FieldSet')
+        if self.fieldset is None:
+            self.fieldset = pset.fieldset
+        elif pset.fieldset is not self.fieldset:
+            raise ValueError('All members of an Ensemble must share the same FieldSet')
+        self.members.append({'pset': pset, 'pyfunc': pyfunc, 'output_file': output_file,
+                             'recovery': recovery, 'pyfunc_inter': pyfunc_inter})
+
+    def execute(self, endtime=None, runtime=None, dt=1., postIterationCallbacks=None, callbackdt=None):
+        """Execute all members of the Ensemble. The arguments have the same meaning as in
+        :meth:`parcels.particleset.ParticleSet.execute`; with `runtime`, every member runs for
+        `runtime` from its own start time. All members are executed with the same `dt`.
+
+        :param endtime: End time for the timestepping loop.
+        :param runtime: Length of the timestepping loop. Use instead of endtime.
+        :param dt: Timestep interval to be passed to the kernels.
+        :param postIterationCallbacks: (Optional) Array of functions that are called after each iteration of each member
+        :param callbackdt: (Optional) timestep interval on which to invoke the 'postIterationCallbacks'
+        """
+        if isinstance(dt, delta):
+            dt = dt.total_seconds()
+        sign_dt = -1 if dt < 0 else 1
+
+        loops = []
+        for member in self.members:
+            pset = member['pset']
+            starttime, m_endtime, m_dt, outputdt, _, m_callbackdt, execute_once = pset._prepare_execute(
+                member['pyfunc'], member['pyfunc_inter'], endtime, runtime, dt, None, member['output_file'], callbackdt)
+            loop = pset._timeloop(starttime, m_endtime, m_dt, outputdt=outputdt, callbackdt=m_callbackdt,
+                                  recovery=member['recovery'], output_file=member['output_file'], verbose_progress=False,
+                                  postIterationCallbacks=postIterationCallbacks, execute_once=execute_once)
+            loops.append([starttime, loop])
+
+        # Advance the member that is furthest behind, so that the FieldSet only moves forward in time
+        while len(loops) > 0:
+            i = int(np.argmin([sign_dt * time for time, _ in loops]))
+            try:
+                loops[i][0] = next(loops[i][1])
+            except StopIteration:
+                loops.pop(i)
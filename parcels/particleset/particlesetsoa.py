@@ -2,15 +2,19 @@ from datetime import date
 from datetime import datetime
 from datetime import timedelta as delta
 
+import multiprocessing
 import sys
+import traceback
 import numpy as np
 import xarray as xr
 from copy import copy
 
+from parcels.field import Field
 from parcels.grid import GridCode
 from parcels.grid import CurvilinearGrid
 from parcels.kernel import Kernel
 from parcels.particle import Variable, ScipyParticle, JITParticle  # noqa
+from parcels.particlefile import BaseParticleFile
 from parcels.particlefile import ParticleFile
 from parcels.tools.statuscodes import StateCode
 from parcels.particleset.baseparticleset import BaseParticleSet
@@ -23,7 +27,9 @@ from parcels.interaction.interactionkernelsoa import InteractionKernelSOA
 from parcels.interaction.neighborsearch import BruteSphericalNeighborSearch
 from parcels.interaction.neighborsearch import BruteFlatNeighborSearch
 from parcels.interaction.neighborsearch import KDTreeFlatNeighborSearch
-from parcels.interaction.neighborsearch import HashSphericalNeighborSearch
+from parcels.interaction.neighborsearch import KDTreeSphericalNeighborSearch
+from parcels.interaction.neighborsearch import VerletNeighborSearch
+import parcels.rng as ParcelsRandom
 try:
     from mpi4py import MPI
 except:
@@ -83,13 +89,17 @@ class ParticleSetSOA(BaseParticleSet):
            are distributed automatically on the processors
     :param periodic_domain_zonal: Zonal domain size, used to apply zonally periodic boundaries for particle-particle
            interaction. If None, no zonally periodic boundaries are applied
+    :param interaction_skin: Optional skin distance (or (vertical, horizontal) skin distances) for particle-particle
+           interaction. If given, the neighbors are kept in Verlet lists with interaction_distance + interaction_skin,
+           which are only rebuilt when a particle has moved more than half the skin
 
     Other Variables can be initialised using further arguments (e.g. v=... for a Variable named 'v')
     """
 
     def __init__(self, fieldset=None, pclass=JITParticle, lon=None, lat=None,
                  depth=None, time=None, repeatdt=None, lonlatdepth_dtype=None,
-                 pid_orig=None, interaction_distance=None, periodic_domain_zonal=None, **kwargs):
+                 pid_orig=None, interaction_distance=None, periodic_domain_zonal=None,
+                 interaction_skin=None, **kwargs):
         super(ParticleSetSOA, self).__init__()
 
         # ==== first: create a new subclass of the pclass that includes the required variables ==== #
@@ -210,7 +220,7 @@ class ParticleSetSOA(BaseParticleSet):
                 if len(self) < 1000:
                     interaction_class = BruteSphericalNeighborSearch
                 else:
-                    interaction_class = HashSphericalNeighborSearch
+                    interaction_class = KDTreeSphericalNeighborSearch
             elif mesh_type == "flat":
                 if len(self) < 1000:
                     interaction_class = BruteFlatNeighborSearch
@@ -228,10 +238,27 @@ class ParticleSetSOA(BaseParticleSet):
             except TypeError:
                 inter_dist_vert = interaction_distance
                 inter_dist_horiz = interaction_distance
-            self._neighbor_tree = interaction_class(
-                inter_dist_vert=inter_dist_vert,
-                inter_dist_horiz=inter_dist_horiz,
-                periodic_domain_zonal=periodic_domain_zonal)
+            if interaction_skin is not None:
+                try:
+                    if len(interaction_skin) == 2:
+                        skin_vert, skin_horiz = interaction_skin
+                    else:
+                        skin_vert = interaction_skin[0]
+                        skin_horiz = interaction_skin[0]
+                except TypeError:
+                    skin_vert = interaction_skin
+                    skin_horiz = interaction_skin
+                self._neighbor_tree = VerletNeighborSearch(
+                    interaction_class,
+                    inter_dist_vert=inter_dist_vert,
+                    inter_dist_horiz=inter_dist_horiz,
+                    skin_vert=skin_vert, skin_horiz=skin_horiz,
+                    periodic_domain_zonal=periodic_domain_zonal)
+            else:
+                self._neighbor_tree = interaction_class(
+                    inter_dist_vert=inter_dist_vert,
+                    inter_dist_horiz=inter_dist_horiz,
+                    periodic_domain_zonal=periodic_domain_zonal)
         # End of neighbor search data structure initialization.
 
         if self.repeatdt:
@@ -252,6 +279,8 @@ class ParticleSetSOA(BaseParticleSet):
                 mpi_comm = MPI.COMM_WORLD
                 mpi_rank = mpi_comm.Get_rank()
                 self.repeatpid = pid_orig[self._collection.pu_indicators == mpi_rank]
+        # Release times of the repeated releases that are reserved in the collection in advance
+        self._repeat_queue_times = np.zeros(0)
 
         self.kernel = None
 
@@ -265,6 +294,8 @@ class ParticleSetSOA(BaseParticleSet):
         :param value: New value to set the attribute of the particles to.
         """
         self.collection._data[name][:] = value
+        if name == 'id':
+            self.collection.invalidate_ID_index()
 
     def _impute_release_times(self, default):
         """Set attribute 'time' to default if encountering NaN values.
@@ -509,12 +540,26 @@ class ParticleSetSOA(BaseParticleSet):
     def neighbors_by_index(self, particle_idx):
         neighbor_idx, distances = self._neighbor_tree.find_neighbors_by_idx(
             particle_idx)
-        neighbor_idx = self._active_particle_idx[neighbor_idx]
         mask = (neighbor_idx != particle_idx)
-        neighbor_idx = neighbor_idx[mask]
-        if 'horiz_dist' in self._collection._ptype.variables:
-            self._collection.data['vert_dist'][neighbor_idx] = distances[0, mask]
-            self._collection.data['horiz_dist'][neighbor_idx] = distances[1, mask]
+        return self.neighbors_from_indices(neighbor_idx[mask], distances[:, mask])
+
+    def neighbors_by_indices(self, particle_idx):
+        """Returns the neighbours of several particles as CSR arrays: the neighbours of
+        the k-th particle in `particle_idx` are `indices[indptr[k]:indptr[k+1]]`, at
+        distances `vert_dist` and `horiz_dist` with the same indexing.
+
+        :param particle_idx: indices of the particles
+        :return: Tuple of (indptr, indices, vert_dist, horiz_dist)
+        """
+        indptr, indices, distances = self._neighbor_tree.find_all_neighbors(particle_idx)
+        return indptr, indices, distances[0], distances[1]
+
+    def neighbors_from_indices(self, neighbor_idx, distances):
+        """Returns an iterator over the neighbours with indices `neighbor_idx`, setting
+        their `vert_dist` and `horiz_dist` Variables (if present) to `distances`"""
+        if 'horiz_dist' in [v.name for v in self._collection._ptype.variables]:
+            self._collection.data['vert_dist'][neighbor_idx] = distances[0]
+            self._collection.data['horiz_dist'][neighbor_idx] = distances[1]
         return ParticleCollectionIterableSOA(self._collection, subset=neighbor_idx)
 
     def neighbors_by_coor(self, coor):
@@ -584,61 +629,200 @@ class ParticleSetSOA(BaseParticleSet):
         self._dirty_neighbor = True
         self.remove_indices(np.where(indices)[0])
 
-    def density(self, field_name=None, particle_val=None, relative=False, area_scale=False):
-        """Method to calculate the density of particles in a ParticleSet from their locations,
-        through a 2D histogram.
-
-        :param field: Optional :mod:`parcels.field.Field` object to calculate the histogram
-                      on. Default is `fieldset.U`
-        :param particle_val: Optional numpy-array of values to weigh each particle with,
-                             or string name of particle variable to use weigh particles with.
-                             Default is None, resulting in a value of 1 for each particle
-        :param relative: Boolean to control whether the density is scaled by the total
-                         weight of all particles. Default is False
-        :param area_scale: Boolean to control whether the density is scaled by the area
-                           (in m^2) of each grid cell. Default is False
+    def _prepare_execute(self, *args, **kwargs):
+        # The particle times may have been changed since the last execution
+        self._collection.invalidate_active_indices()
+        return super()._prepare_execute(*args, **kwargs)
+
+    def _schedule_repeated_releases(self, next_prelease, endtime, dt):
+        """Prepare all repeated releases from `next_prelease` up to (and including) `endtime` at once.
+
+        The particles of all release times are built as one collection from the `repeatlon`,
+        `repeatlat`, `repeatdepth` and `repeatkwargs` of this process, with the same IDs as when
+        they would be built one release at a time. They are reserved in the collection of this
+        ParticleSet (see :meth:`ParticleCollectionSOA.reserve`), from which :meth:`_release_repeated`
+        activates them at their release time; until then they are not part of the ParticleSet.
+        Releases that are still reserved from an earlier execute() are kept.
+        Variables initialised from a Field are sampled at release, so these particles are still
+        built one release at a time.
         """
+        sign = np.sign(dt)
+        if len(self._repeat_queue_times) > 0 and not np.isclose(self._repeat_queue_times[0], next_prelease):
+            self._collection.clear_reserved()
+            self._repeat_queue_times = np.zeros(0)
+        if dt == 0 or any(isinstance(v.initial, Field) for v in self._collection.ptype.variables):
+            return
+        if len(self._repeat_queue_times) > 0:
+            next_prelease = self._repeat_queue_times[-1] + self.repeatdt * sign
+        nreleases = max(int(np.floor((endtime - next_prelease) * sign / self.repeatdt + 1e-6)) + 1, 0)
+        npart = len(self.repeatlon)
+        if nreleases == 0 or npart == 0:
+            return
 
-        field_name = field_name if field_name else "U"
-        field = getattr(self.fieldset, field_name)
-
-        f_str = """
-def search_kernel(particle, fieldset, time):
-    x = fieldset.{}[time, particle.depth, particle.lat, particle.lon]
-        """.format(field_name)
-
-        k = Kernel(
-            self.fieldset,
-            self._collection.ptype,
-            funcname="search_kernel",
-            funcvars=["particle", "fieldset", "time", "x"],
-            funccode=f_str,
-        )
-        self.execute(pyfunc=k, runtime=0)
-
-        if isinstance(particle_val, str):
-            particle_val = self._collection._data[particle_val]
+        if MPI and self._collection.pu_indicators is not None:
+            pid = self.repeatpid
+            span = MPI.COMM_WORLD.allreduce(np.max(pid) if len(pid) > 0 else -1, op=MPI.MAX) + 1
         else:
-            particle_val = particle_val if particle_val else np.ones(self.size)
-        density = np.zeros((field.grid.lat.size, field.grid.lon.size), dtype=np.float32)
-
-        for i, p in enumerate(self):
-            try:  # breaks if either p.xi, p.yi, p.zi, p.ti do not exist (in scipy) or field not in fieldset
-                if p.ti[field.igrid] < 0:  # xi, yi, zi, ti, not initialised
-                    raise('error')
-                xi = p.xi[field.igrid]
-                yi = p.yi[field.igrid]
-            except:
-                _, _, _, xi, yi, _ = field.search_indices(p.lon, p.lat, p.depth, 0, 0, search2D=True)
-            density[yi, xi] += particle_val[i]
-
-        if relative:
-            density /= np.sum(particle_val)
-
-        if area_scale:
-            density /= field.cell_areas()
-
-        return density
+            pid = np.arange(npart)
+            span = npart
+        release_times = next_prelease + np.arange(nreleases) * self.repeatdt * sign
+        kwargs = {kwvar: np.tile(values, nreleases) for kwvar, values in self.repeatkwargs.items()}
+        released = ParticleCollectionSOA(
+            self._collection.pclass, lon=np.tile(self.repeatlon, nreleases), lat=np.tile(self.repeatlat, nreleases),
+            depth=np.tile(self.repeatdepth, nreleases), time=np.repeat(release_times, npart),
+            lonlatdepth_dtype=self._collection.lonlatdepth_dtype,
+            pid_orig=(pid[None, :] + span * np.arange(nreleases)[:, None]).ravel(), partitions=False,
+            ngrid=self.fieldset.gridset.size if self.fieldset is not None else 1, **kwargs)
+        self._collection.reserve(released)
+        self._repeat_queue_times = np.concatenate((self._repeat_queue_times, release_times))
+
+    def _release_repeated(self, time, dt):
+        """Activate the particles of the repeated release at `time`, which are reserved in the
+        collection by :meth:`_schedule_repeated_releases`"""
+        npart = len(self.repeatlon)
+        if len(self._repeat_queue_times) == 0 or not np.isclose(self._repeat_queue_times[0], time) \
+           or self._collection.nreserved < npart:
+            super()._release_repeated(time, dt)
+            return
+        self._collection.activate_reserved(npart)
+        self._collection.data['dt'][-npart:] = dt
+        self._repeat_queue_times = self._repeat_queue_times[1:]
+        # Adding particles invalidates the neighbor search structure.
+        self._dirty_neighbor = True
+
+    def _density_index_hints(self, field):
+        """The indices of the particles on the grid of `field` from their last sampling, as
+        first guesses for :meth:`density`"""
+        if field.igrid < 0 or field.igrid >= self._collection.data['xi'].shape[1]:
+            return None, None
+        return self._collection.data['xi'][:, field.igrid], self._collection.data['yi'][:, field.igrid]
+
+    def _dense_output_state(self):
+        """Copy of the particle Variables to be written, from which :meth:`_write_dense_output`
+        interpolates the particles at output times within the next integration step"""
+        data = self._collection.data
+        return {v.name: data[v.name].copy() for v in self._collection.ptype.variables
+                if v.to_write or v.name in ['id', 'time']}
+
+    def _write_dense_output(self, output_file, time, state):
+        """Write the particles to `output_file` at `time`, which lies within their last integration step.
+
+        The floating-point Variables of the particles that were advanced over `time` are linearly
+        interpolated between their values in `state` (taken by :meth:`_dense_output_state` at the start
+        of the step) and their current values, and restored after writing.
+        """
+        data = self._collection.data
+        ids = data['id']
+        sorter = np.argsort(state['id'])
+        if len(sorter) == 0 or len(ids) == 0:
+            output_file.write(self, time)
+            return
+        pos = sorter[np.minimum(np.searchsorted(state['id'], ids, sorter=sorter), len(sorter)-1)]
+        found = state['id'][pos] == ids
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = (time - state['time'][pos]) / (data['time'] - state['time'][pos])
+            idx = np.nonzero(found & (weight > 0) & (weight < 1))[0]
+        weight = weight[idx]
+
+        saved = {'time': data['time'][idx]}
+        for var, values in state.items():
+            if var in ['id', 'time', 'dt'] or not np.issubdtype(values.dtype, np.floating):
+                continue
+            saved[var] = data[var][idx]
+            data[var][idx] = (1 - weight) * values[pos[idx]] + weight * saved[var]
+        data['time'][idx] = time
+        try:
+            output_file.write(self, time)
+        finally:
+            for var, values in saved.items():
+                data[var][idx] = values
+
+    def _execute_on_workers(self, workers, starttime, endtime, dt, output_file=None, **kwargs):
+        """Run the time loop of :meth:`execute` on `workers` local processes, each advancing a
+        contiguous part of the particles, and gather the particles back into this ParticleSet.
+
+        The processes are forked, so that they inherit the compiled kernel and the loaded
+        FieldSet data (shared copy-on-write); deferred-loaded data is read by each process.
+        Particles released by `repeatdt` are advanced by the first worker. Each worker writes
+        its output to a separate subdirectory of the temporary output directory, which are
+        merged by the ParticleFile on export.
+        """
+        if MPI and MPI.COMM_WORLD.Get_size() > 1:
+            raise RuntimeError('Execution with workers can not be combined with MPI')
+        if output_file is not None and not isinstance(output_file, BaseParticleFile):
+            raise NotImplementedError('Execution with workers only supports output to a ParticleFile')
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise NotImplementedError('Execution with workers requires processes to be forked, which is not supported on this platform')
+
+        shards = np.array_split(np.arange(len(self)), workers)
+        seed = ParcelsRandom.randint(0, 2**30)
+        outdir = output_file.next_tempwritedir_index() if output_file else None
+        ctx = multiprocessing.get_context('fork')
+        connections = []
+        processes = []
+        for w in range(workers):
+            conn_recv, conn_send = ctx.Pipe(duplex=False)
+            windex = None if outdir is None else outdir + w
+            proc = ctx.Process(target=self._execute_worker,
+                               args=(w, shards[w], conn_send, seed + w, windex, starttime, endtime, dt, output_file),
+                               kwargs=kwargs)
+            proc.start()
+            conn_send.close()
+            connections.append(conn_recv)
+            processes.append(proc)
+        results = []
+        for conn in connections:
+            try:
+                results.append(conn.recv())
+            except EOFError:
+                results.append(RuntimeError('Worker process exited without returning its particles'))
+        for proc in processes:
+            proc.join()
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        self._collection.replace_data({v: np.concatenate([result['data'][v] for result in results])
+                                       for v in results[0]['data']})
+        # the reserved repeated releases have been released by the first worker
+        self._repeat_queue_times = np.zeros(0)
+        self._dirty_neighbor = True
+        self._collection.pclass.setLastID(max([result['lastID'] for result in results]))
+        if output_file:
+            output_file.lasttime_written = results[0]['lasttime_written']
+            if len(output_file.var_names_once) > 0:
+                output_file.written_once = sorted(set().union(*[result['written_once'] for result in results]))
+            # later output of this process goes after the output of the workers
+            output_file.dump_psetinfo_to_npy()
+            output_file.set_tempwritedir_index(outdir + workers)
+
+    def _execute_worker(self, w, shard, conn, seed, outdir_index, starttime, endtime, dt, output_file=None, **kwargs):
+        """Body of a worker process started by :meth:`_execute_on_workers`"""
+        try:
+            self.remove_booleanvector(~np.isin(np.arange(len(self)), shard))
+            if w > 0:
+                self.repeatdt = None
+            ParcelsRandom.seed(seed)
+            if self.fieldset is not None and self.fieldset.shared_memory is not None:
+                # deferred-loaded data is updated by each worker, so it can not stay in the shared buffers
+                for f in self.fieldset.get_fields():
+                    if getattr(f, 'shared_memory', None) is not None and f.grid.defer_load:
+                        f.data = np.array(f.data)
+                        f.shared_memory = None
+            if output_file:
+                output_file.set_tempwritedir_index(outdir_index)
+            self._execute_timeloop(starttime, endtime, dt, output_file=output_file, verbose_progress=False, **kwargs)
+            result = {'data': self._collection.data, 'lastID': self._collection.pclass.lastID}
+            if output_file:
+                output_file.dump_psetinfo_to_npy()
+                result['lasttime_written'] = output_file.lasttime_written
+                if len(output_file.var_names_once) > 0:
+                    result['written_once'] = output_file.written_once
+            conn.send(result)
+        except Exception:
+            conn.send(RuntimeError('Error in worker %d:\n%s' % (w, traceback.format_exc())))
+        finally:
+            conn.close()
 
     def Kernel(self, pyfunc, c_include="", delete_cfiles=True):
         """Wrapper method to convert a `pyfunc` into a :class:`parcels.kernel.Kernel` object
@@ -0,0 +1,26 @@
+"""Build the prebuilt libraries of the stock kernels."""
+import argparse
+
+from parcels.compilation.prebuilt import build_prebuilt_kernels
+from parcels.compilation.prebuilt import get_prebuilt_dir
+
+
+def main(directory=None):
+    """Compile the stock kernels for the standard JITParticle, so that these don't
+    have to be compiled at runtime.
+    """
+    if directory is None:
+        parser = argparse.ArgumentParser(
+            description="Build the prebuilt libraries of the Parcels stock kernels.")
+        parser.add_argument(
+            "--directory", default=None,
+            help="Where to put the libraries? (default: %s)" % get_prebuilt_dir())
+        args = parser.parse_args()
+        directory = args.directory
+
+    lib_files = build_prebuilt_kernels(directory)
+    print("Built %d kernel libraries" % len(set(lib_files)))
+
+
+if __name__ == "__main__":
+    main()
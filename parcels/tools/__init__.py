@@ -4,3 +4,4 @@ from .statuscodes import *  # noqa
 from .interpolation_utils import *  # noqa
 from .loggers import *  # noqa
 from .timer import *  # noqa
+from .sharedmemory import *  # noqa
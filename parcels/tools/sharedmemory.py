@@ -0,0 +1,177 @@
+"""Node-level shared memory for Field data"""
+import os
+import threading
+import uuid
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+import numpy as np
+try:
+    from mpi4py import MPI
+except:
+    MPI = None
+
+__all__ = ['SharedFieldMemory']
+
+_tracker_lock = threading.Lock()
+
+
+def _attach_untracked(name):
+    """Attaches to the existing POSIX shared memory segment `name` without registering it
+    with the resource tracker of this process. A registered segment is unlinked by the
+    tracker when the process exits, which would remove the leader's segment under it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        pass
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedFieldMemory(object):
+    """Store that places Field data in memory shared by all processes on a node,
+    so that the data of a FieldSet is held only once per node.
+
+    When running under MPI, the buffers are MPI-3 shared windows allocated on the
+    node-local communicator. Only the first rank on each node (the leader) reads
+    data from disk and writes it into the buffers; the other ranks map the same
+    buffers and skip the read. All sharing calls are collective on the node
+    communicator, which holds since every rank steps through the same
+    :meth:`parcels.fieldset.FieldSet.computeTimeChunk` calls.
+
+    Without MPI, the buffers are POSIX shared memory segments created by the
+    current process (which then acts as leader). A pickled copy of the store can be
+    passed to worker processes, which attach to the existing segments by name.
+    Worker processes only see the snapshots that were loaded when they attached, so
+    this mode is meant for FieldSets that are fully loaded (deferred_load=False).
+
+    :param comm: MPI communicator to split into node-local communicators (default MPI.COMM_WORLD)
+    :param prefix: Name prefix of the POSIX shared memory segments (default is unique per process)
+    """
+
+    def __init__(self, comm=None, prefix=None):
+        if MPI is not None:
+            comm = MPI.COMM_WORLD if comm is None else comm
+            self.nodecomm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+            self.is_leader = self.nodecomm.Get_rank() == 0
+        else:
+            self.nodecomm = None
+            self.is_leader = True
+        self.prefix = prefix if prefix is not None else 'parcels_%d_%s' % (os.getpid(), uuid.uuid4().hex[:8])
+        self._buffers = {}
+        self._nkeys = 0
+
+    def __getstate__(self):
+        if self.nodecomm is not None:
+            raise NotImplementedError('A SharedFieldMemory on an MPI node communicator cannot be pickled')
+        return {'prefix': self.prefix,
+                'layouts': {key: (shape, dtype) for key, (shape, dtype, _, _) in self._buffers.items()},
+                'nkeys': self._nkeys}
+
+    def __setstate__(self, state):
+        self.nodecomm = None
+        self.is_leader = False
+        self.prefix = state['prefix']
+        self._nkeys = state['nkeys']
+        self._buffers = {}
+        for key, (shape, dtype) in state['layouts'].items():
+            self._attach(key, shape, dtype)
+
+    def new_key(self, name):
+        """Returns a new buffer key for a Field. Keys are handed out in order,
+        so processes that register Fields in the same order get the same keys"""
+        self._nkeys += 1
+        return '%s%d' % (name, self._nkeys)
+
+    def barrier(self):
+        """Synchronises all processes on the node (no-op without MPI)"""
+        if self.nodecomm is not None:
+            self.nodecomm.Barrier()
+
+    def _segment_name(self, key):
+        return '%s_%s' % (self.prefix, key)
+
+    def _attach(self, key, shape, dtype):
+        segment = _attach_untracked(self._segment_name(key))
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        self._buffers[key] = (shape, dtype, segment, array)
+        return array
+
+    def _allocate(self, key, shape, dtype):
+        self.free(key)
+        nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        if self.nodecomm is not None:
+            itemsize = np.dtype(dtype).itemsize
+            segment = MPI.Win.Allocate_shared(nbytes if self.is_leader else 0, itemsize, comm=self.nodecomm)
+            buf, _ = segment.Shared_query(0)
+            array = np.ndarray(shape, dtype=dtype, buffer=buf)
+        else:
+            segment = shared_memory.SharedMemory(name=self._segment_name(key), create=True, size=nbytes)
+            array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        self._buffers[key] = (shape, dtype, segment, array)
+        return array
+
+    def share(self, key, data):
+        """Places data in the shared buffer `key` and returns the shared array.
+
+        Only the leader needs to provide data; the other processes pass None and
+        receive a view of the leader's buffer. Buffers are reused if the shape and
+        dtype do not change. Collective on the node communicator.
+
+        :param key: Name of the buffer, see :meth:`new_key`
+        :param data: numpy array with the data (only used on the leader)
+        """
+        if self.is_leader:
+            data = np.asarray(data)
+            layout = (data.shape, data.dtype.str)
+        else:
+            layout = None
+        if self.nodecomm is not None:
+            layout = self.nodecomm.bcast(layout, root=0)
+        elif not self.is_leader:
+            if key not in self._buffers:
+                raise RuntimeError('Shared buffer %s has not been created by the leading process' % key)
+            return self._buffers[key][3]
+        shape, dtype = layout
+        if key in self._buffers and self._buffers[key][:2] == (shape, dtype):
+            array = self._buffers[key][3]
+        else:
+            array = self._allocate(key, shape, dtype)
+        self.barrier()
+        if self.is_leader and data is not array:
+            array[...] = data
+        self.barrier()
+        return array
+
+    def get(self, key):
+        """Returns the shared array of buffer `key`"""
+        return self._buffers[key][3]
+
+    def __contains__(self, key):
+        return key in self._buffers
+
+    def free(self, key):
+        """Releases the shared buffer `key`. Arrays on the buffer must not be used afterwards"""
+        if key not in self._buffers:
+            return
+        segment = self._buffers.pop(key)[2]
+        if self.nodecomm is not None:
+            segment.Free()
+        else:
+            try:
+                segment.close()
+            except BufferError:
+                # numpy views on the buffer are still alive; the mapping is released once they are gone
+                pass
+            if self.is_leader:
+                segment.unlink()
+
+    def close(self):
+        """Releases all shared buffers"""
+        for key in list(self._buffers.keys()):
+            self.free(key)
@@ -0,0 +1,61 @@
+"""Benchmark of the neighbor search classes used for particle-particle interaction
+on a spherical mesh: the time to build the structure and to find the neighbors
+of all particles, for increasing numbers of particles."""
+from argparse import ArgumentParser
+import time as ostime
+
+import numpy as np
+
+from parcels.interaction.neighborsearch import BruteSphericalNeighborSearch
+from parcels.interaction.neighborsearch import HashSphericalNeighborSearch
+from parcels.interaction.neighborsearch import KDTreeSphericalNeighborSearch
+
+
+def spherical_positions(n_particles, max_depth):
+    """Particles uniformly distributed over the globe"""
+    yrange = 2*np.random.rand(n_particles)
+    lat = 180*(np.arccos(1-yrange)-0.5*np.pi)/np.pi
+    lon = 360*np.random.rand(n_particles)
+    depth = max_depth*np.random.rand(n_particles)
+    return np.array((depth, lat, lon))
+
+
+def benchmark(search_class, values, inter_dist_vert, inter_dist_horiz, periodic_domain_zonal):
+    """Returns the time to rebuild the structure, the time to find all neighbors
+    and the number of neighbor pairs"""
+    instance = search_class(inter_dist_vert=inter_dist_vert, inter_dist_horiz=inter_dist_horiz,
+                            periodic_domain_zonal=periodic_domain_zonal)
+    tic = ostime.time()
+    instance.rebuild(values)
+    toc = ostime.time()
+    _, neighbor_idx, _ = instance.find_all_neighbors()
+    return toc-tic, ostime.time()-toc, len(neighbor_idx)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Benchmark of the spherical neighbor search classes")
+    parser.add_argument("-n", "--nparticles", dest="nparticles", type=int, nargs='+', default=[10000, 100000, 1000000],
+                        help="numbers of particles to benchmark")
+    parser.add_argument("--horizontal", dest="inter_dist_horiz", type=float, default=20000,
+                        help="horizontal interaction distance in m")
+    parser.add_argument("--vertical", dest="inter_dist_vert", type=float, default=100,
+                        help="vertical interaction distance in m")
+    parser.add_argument("--max-depth", dest="max_depth", type=float, default=1000, help="maximum depth of the particles in m")
+    parser.add_argument("--max-brute", dest="max_brute", type=int, default=20000,
+                        help="maximum number of particles for the brute force search")
+    parser.add_argument("-p", "--periodic", dest="periodic", action='store_true', default=False,
+                        help="enable zonally periodic boundaries (360 degrees)")
+    args = parser.parse_args()
+
+    np.random.seed(1234)
+    periodic_domain_zonal = 360. if args.periodic else None
+    search_classes = [KDTreeSphericalNeighborSearch, HashSphericalNeighborSearch, BruteSphericalNeighborSearch]
+    print("%-32s %10s %12s %12s %12s" % ("class", "particles", "rebuild [s]", "search [s]", "pairs"))
+    for n_particles in args.nparticles:
+        values = spherical_positions(n_particles, args.max_depth)
+        for search_class in search_classes:
+            if search_class is BruteSphericalNeighborSearch and n_particles > args.max_brute:
+                continue
+            t_rebuild, t_search, n_pairs = benchmark(search_class, values, args.inter_dist_vert,
+                                                     args.inter_dist_horiz, periodic_domain_zonal)
+            print("%-32s %10d %12.3f %12.3f %12d" % (search_class.__name__, n_particles, t_rebuild, t_search, n_pairs))
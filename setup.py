@@ -1,9 +1,26 @@
 """Install Parcels and dependencies."""
 
+import os
+
 try:
     from setuptools import setup, find_packages
+    from setuptools.command.build_py import build_py
 except ImportError:
     from distutils.core import setup, find_packages
+    from distutils.command.build_py import build_py
+
+
+class BuildPyWithKernels(build_py):
+    """Also build the libraries of the stock kernels, if a compiler is available."""
+
+    def run(self):
+        super().run()
+        try:
+            from parcels.compilation.prebuilt import build_prebuilt_kernels
+            build_prebuilt_kernels(os.path.join(self.build_lib, 'parcels', 'prebuilt'))
+        except Exception as e:
+            print("Warning: could not build the prebuilt kernels (%s); these will be compiled at runtime" % e)
+
 
 setup(name='parcels',
       description="""Framework for Lagrangian tracking of virtual ocean particles in the petascale age.""",
@@ -13,7 +30,9 @@ setup(name='parcels',
       packages=find_packages(),
       package_data={'parcels': ['include/*',
                                 'examples/*']},
+      cmdclass={'build_py': BuildPyWithKernels},
       entry_points={'console_scripts': [
           'parcels_get_examples = parcels.scripts.get_examples:main',
-          'parcels_convert_npydir_to_netcdf = parcels.scripts.convert_npydir_to_netcdf:main']}
+          'parcels_convert_npydir_to_netcdf = parcels.scripts.convert_npydir_to_netcdf:main',
+          'parcels_build_kernels = parcels.scripts.build_kernels:main']}
       )
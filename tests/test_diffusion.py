@@ -1,5 +1,6 @@
 from parcels import (FieldSet, Field, RectilinearZGrid, JITParticle,
                      DiffusionUniformKh, AdvectionDiffusionM1, AdvectionDiffusionEM,
+                     AdvectionDiffusionM1_GradKh, AdvectionDiffusionEM_GradKh,
                      ScipyParticle, Variable)
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
@@ -91,6 +92,49 @@ def test_fieldKh_SpatiallyVaryingDiffusion(mesh, mode, pset_mode, kernel, xdim=2
     assert(stats.skew(lons) > stats.skew(lats))
 
 
+@pytest.mark.parametrize('mesh', ['spherical', 'flat'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('kernels', [(AdvectionDiffusionM1, AdvectionDiffusionM1_GradKh),
+                                     (AdvectionDiffusionEM, AdvectionDiffusionEM_GradKh)])
+def test_fieldKh_GradientFields(mesh, mode, kernels, xdim=200, ydim=100):
+    """Test that the advection-diffusion kernels with precomputed diffusivity gradients
+    follow the kernels that estimate the gradients, on a linear diffusivity field"""
+    mesh_conversion = 1/1852./60 if mesh == 'spherical' else 1
+    fieldset = zeros_fieldset(mesh=mesh, xdim=xdim, ydim=ydim, mesh_conversion=mesh_conversion)
+
+    lon, lat = np.meshgrid(fieldset.U.lon, fieldset.U.lat)
+    fieldset.add_field(Field('Kh_zonal', 100. + 2e-3*lon/mesh_conversion, grid=fieldset.U.grid))
+    fieldset.add_field(Field('Kh_meridional', 100. - 1e-3*lat/mesh_conversion, grid=fieldset.U.grid))
+    fieldset.add_constant('dres', fieldset.U.lon[1]-fieldset.U.lon[0])
+    fieldset.add_gradient_field('Kh_zonal', 'x')
+    fieldset.add_gradient_field('Kh_meridional', 'y')
+    assert np.allclose(fieldset.dKh_zonal_dx.data, 2e-3/mesh_conversion, rtol=1e-3)
+    assert np.allclose(fieldset.dKh_meridional_dy.data, -1e-3/mesh_conversion, rtol=1e-3)
+
+    lons = []
+    for kernel in kernels:
+        ParcelsRandom.seed(1636)
+        pset = ParticleSetSOA(fieldset=fieldset, pclass=ptype[mode], lon=np.zeros(10), lat=np.zeros(10))
+        pset.execute(pset.Kernel(kernel), runtime=delta(hours=6), dt=delta(hours=1))
+        lons.append((pset.lon, pset.lat))
+    assert np.allclose(lons[0], lons[1], atol=1*mesh_conversion)
+
+
+def test_gradient_field_landmask():
+    data = np.array([[1., 2., 4., 0., 3., 5.]], dtype=np.float32).repeat(3, axis=0)
+    fieldset = FieldSet.from_data({'U': data, 'V': data, 'P': data},
+                                  {'lon': np.arange(6, dtype=np.float32), 'lat': np.arange(3, dtype=np.float32)}, mesh='flat')
+    fieldset.add_gradient_field('P', 'x')
+    fieldset.add_gradient_field('P', 'y', name='dPdy')
+    assert np.allclose(fieldset.dP_dx.data[0, 0, :], [1, 1.5, 2, 0, 2, 2])
+    assert np.allclose(fieldset.dPdy.data, 0)
+
+    landmask = np.zeros((3, 6), dtype=bool)
+    landmask[:, 1] = True
+    fieldset.add_gradient_field('P', 'x', name='dPdx_masked', landmask=landmask)
+    assert np.allclose(fieldset.dPdx_masked.data[0, 0, :], [0, 0, -4, -0.5, 2.5, 2])
+
+
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('lambd', [1, 5])
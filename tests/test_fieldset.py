@@ -1,4 +1,4 @@
-from parcels import FieldSet, ScipyParticle, JITParticle, Variable, AdvectionRK4, AdvectionRK4_3D, RectilinearZGrid, ErrorCode, OutOfTimeError
+from parcels import FieldSet, ScipyParticle, JITParticle, Variable, AdvectionRK4, AdvectionRK4_3D, RectilinearZGrid, ErrorCode, OutOfTimeError, GridCode
 from parcels.field import Field, VectorField
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
@@ -16,6 +16,9 @@ import gc
 import psutil
 import os
 import sys
+import pickle
+import subprocess
+import time
 
 pset_modes = ['soa', 'aos']
 ptype = {'scipy': ScipyParticle, 'jit': JITParticle}
@@ -500,6 +503,16 @@ def test_fieldset_cellareas(mesh):
             assert np.allclose(cell_areas[y, :], cell_areas[y, 0], rtol=1e-3)
 
 
+@pytest.mark.parametrize('mesh', ['flat', 'spherical'])
+def test_fieldset_cellareas_curvilinear(mesh):
+    data, dimensions = generate_fieldset(10, 7)
+    fieldset = FieldSet.from_data(data, dimensions, mesh=mesh)
+    lon, lat = np.meshgrid(dimensions['lon'], dimensions['lat'])
+    fieldset_curvilinear = FieldSet.from_data(data, {'lon': lon, 'lat': lat}, mesh=mesh)
+    assert fieldset_curvilinear.V.grid.gtype == GridCode.CurvilinearZGrid
+    assert np.allclose(fieldset_curvilinear.V.cell_areas(), fieldset.V.cell_areas(), rtol=1e-5)
+
+
 def addConst(particle, fieldset, time):
     particle.lon = particle.lon + fieldset.movewest + fieldset.moveeast
 
@@ -1028,3 +1041,111 @@ def test_deferredload_simplefield(pset_mode, mode, direction, time_extrapolation
     runtime = tdim*2 if time_extrapolation else None
     pset.execute(SampleU, dt=direction, runtime=runtime)
     assert pset.p == tdim-1 if time_extrapolation else tdim-2
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('chunksize', [False, {'lon': ('x', 2), 'lat': ('y', 2)}])
+def test_fieldset_derived_field(mode, chunksize, tmpdir, filename='test_derived', tdim=5):
+    filepath = tmpdir.join(filename)
+    data, dims = generate_fieldset(5, 4, zdim=3, tdim=tdim)
+    dims['time'] = np.arange(tdim) * 3600.
+    dims['depth'] = np.arange(3, dtype=np.float32)
+    data['T'] = np.tile(np.arange(tdim, dtype=np.float32).reshape(tdim, 1, 1, 1), (1, 3, 4, 5))
+    data['S'] = np.ones((tdim, 3, 4, 5), dtype=np.float32)
+    FieldSet.from_data(data, dims).write(filepath)
+
+    fieldset = FieldSet.from_parcels(filepath, extra_fields={'T': 'T', 'S': 'S'}, chunksize=chunksize)
+    fieldset.add_derived_field('rho', lambda T, S, depth: 1000 + 2*T + S + depth, ['T', 'S', 'depth'])
+    assert fieldset.rho.grid is fieldset.T.grid
+
+    class SampleParticle(ptype[mode]):
+        rho = Variable('rho', dtype=np.float32)
+
+    def SampleRho(particle, fieldset, time):
+        particle.rho = fieldset.rho[time, particle.depth, particle.lat, particle.lon]
+
+    pset = ParticleSetSOA(fieldset, pclass=SampleParticle, lon=[2, 8], lat=[3, 7], depth=[0, 1.5])
+    for t in range(3):
+        pset.execute(SampleRho, runtime=3600, dt=3600)
+        assert np.allclose(pset.rho, 1000 + 2*t + 1 + np.array([0, 1.5]))
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_fieldset_share_memory(mode, tmpdir, tdim=10):
+    filename = tmpdir.join("sharedfield_deferredload.nc")
+    data = np.zeros((tdim, 2, 2))
+    for ti in range(tdim):
+        data[ti, :, :] = ti
+    ds = xr.Dataset({"U": (("t", "y", "x"), data), "V": (("t", "y", "x"), data)},
+                    coords={"x": [0, 1], "y": [0, 1], "t": np.arange(tdim)})
+    ds.to_netcdf(filename)
+
+    fieldset = FieldSet.from_netcdf(filename, {'U': 'U', 'V': 'V'}, {'lon': 'x', 'lat': 'y', 'time': 't'},
+                                    deferred_load=True, mesh='flat')
+    fieldset.add_constant_field('K', 2.)
+    shared = fieldset.share_memory()
+    assert fieldset.K.data.base is not None
+    assert np.allclose(fieldset.K.data, 2.)
+
+    class SamplingParticle(ptype[mode]):
+        p = Variable('p')
+        k = Variable('k')
+    pset = ParticleSetSOA(fieldset, SamplingParticle, lon=0.5, lat=0.5)
+
+    def SampleUK(particle, fieldset, time):
+        particle.p = fieldset.U[particle]
+        particle.k = fieldset.K[particle]
+
+    pset.execute(SampleUK, dt=1, runtime=tdim-2)
+    assert np.allclose(pset.p, tdim-3)
+    assert np.allclose(pset.k, 2.)
+    assert np.allclose(fieldset.U.data, shared.get(fieldset.U._shared_key))
+    shared.close()
+
+
+def test_fieldset_share_memory_child_process():
+    data, dimensions = generate_fieldset(10, 10)
+    fieldset = FieldSet.from_data(data, dimensions, mesh='flat')
+    shared = fieldset.share_memory()
+    key = fieldset.U._shared_key
+
+    # A separate interpreter has its own resource tracker, which must not unlink the segments on exit
+    child = "import pickle, sys; store = pickle.loads(sys.stdin.buffer.read()); print(store.get('%s').sum())" % key
+    out = subprocess.run([sys.executable, '-c', child], input=pickle.dumps(shared), capture_output=True, check=True)
+    assert np.isclose(float(out.stdout.split()[-1]), fieldset.U.data.sum())
+    time.sleep(0.5)  # the tracker of the child cleans up asynchronously
+
+    attached = pickle.loads(pickle.dumps(shared))
+    assert np.allclose(attached.get(key), fieldset.U.data)
+    attached.close()
+    shared.close()
+
+
+@pytest.mark.parametrize('pset_mode', pset_modes)
+def test_fieldset_cached_cstruct(pset_mode):
+    data, dimensions = generate_fieldset(10, 10)
+    data['P'] = np.zeros((10, 10), dtype=np.float32)
+    fieldset = FieldSet.from_data(data, dimensions, mesh='flat')
+
+    class SamplingParticle(JITParticle):
+        p = Variable('p')
+    pset = pset_type[pset_mode]['pset'](fieldset, SamplingParticle, lon=5, lat=5)
+
+    def SampleP(particle, fieldset, time):
+        particle.p = fieldset.P[particle]
+
+    pset.execute(SampleP, dt=1, runtime=1)
+    cstruct, grid_cstruct = fieldset.P.ctypes_struct, fieldset.P.grid.ctypes_struct
+    pset.execute(SampleP, dt=1, runtime=1)
+    assert fieldset.P.ctypes_struct is cstruct
+    assert fieldset.P.grid.ctypes_struct is grid_cstruct
+    assert np.allclose(pset.p, 0)
+
+    fieldset.P.data[:] = 1  # changed in place
+    pset.execute(SampleP, dt=1, runtime=1)
+    assert np.allclose(pset.p, 1)
+
+    fieldset.P.data = 2 * np.ones_like(fieldset.P.data)  # replaced
+    pset.execute(SampleP, dt=1, runtime=1)
+    assert fieldset.P.ctypes_struct is not cstruct
+    assert np.allclose(pset.p, 2)
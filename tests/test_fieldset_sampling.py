@@ -1,5 +1,5 @@
 from parcels import (FieldSet, Field, NestedField, ScipyParticle, JITParticle, Geographic,
-                     AdvectionRK4, AdvectionRK4_3D, Variable, ErrorCode)
+                     AdvectionRK4, AdvectionRK4_3D, Variable, ErrorCode, FieldOutOfBoundError)
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
 import numpy as np
@@ -165,6 +165,44 @@ def test_variable_init_from_field(pset_mode, mode, npart=9):
     assert np.all([abs(pset.a[i] - fieldset.P[pset.time[i], pset.depth[i], pset.lat[i], pset.lon[i]]) < 1e-6 for i in range(pset.size)])
 
 
+@pytest.mark.parametrize('mesh', ['flat', 'spherical'])
+@pytest.mark.parametrize('interp_method', ['linear', 'nearest', 'cgrid_tracer'])
+@pytest.mark.parametrize('zdim', [1, 4])
+def test_field_eval_vectorised(mesh, interp_method, zdim, npart=100):
+    np.random.seed(1234)
+    lon = np.linspace(-20, 30, 11, dtype=np.float32)
+    lat = np.linspace(-10, 40, 6, dtype=np.float32)
+    depth = np.linspace(0, 30, zdim, dtype=np.float32)
+    time = np.array([0., 10., 30.])
+    shape = (len(time), zdim, len(lat), len(lon)) if zdim > 1 else (len(time), len(lat), len(lon))
+    field = Field('P', np.random.rand(*shape).astype(np.float32), lon=lon, lat=lat, depth=depth, time=time,
+                  mesh=mesh, interp_method=interp_method)
+    x = np.append(np.random.uniform(-20, 30, npart), lon[:3])
+    y = np.append(np.random.uniform(-10, 40, npart), lat[:3])
+    z = np.append(np.random.uniform(0, 30, npart), depth[:3] if zdim > 1 else [0, 0, 0])
+    for t in [0., 5., 30.]:
+        values = field.eval_vectorised(t, z, y, x)
+        assert np.allclose(values, [field.eval(t, z[i], y[i], x[i]) for i in range(len(x))], rtol=1e-5)
+
+    with pytest.raises(FieldOutOfBoundError):
+        field.eval_vectorised(0., [0, 0], [0, 50], [0, 0])
+
+
+def test_variable_init_from_field_release_times():
+    dimensions = {'lon': np.linspace(0., 1., 5, dtype=np.float32), 'lat': np.linspace(0., 1., 4, dtype=np.float32),
+                  'time': np.array([0., 2.])}
+    P = np.zeros((2, 4, 5), dtype=np.float32)
+    P[1, :, :] = np.arange(5)
+    data = {'U': np.zeros((2, 4, 5), dtype=np.float32), 'V': np.zeros((2, 4, 5), dtype=np.float32), 'P': P}
+    fieldset = FieldSet.from_data(data, dimensions, mesh='flat')
+
+    class VarParticle(ScipyParticle):
+        a = Variable('a', dtype=np.float32, initial=fieldset.P)
+
+    pset = ParticleSetSOA(fieldset, pclass=VarParticle, lon=[0.5, 0.5, 1, 1], lat=[0.2, 0.8, 0.2, 0.8], time=[0, 1, 2, 1])
+    assert np.allclose(pset.a, [0, 1, 4, 2])
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pset_from_field(pset_mode, mode, xdim=10, ydim=20, npart=10000):
@@ -736,6 +774,36 @@ def test_sampling_multigrids_non_vectorfield(pset_mode, mode, npart):
             assert np.alltrue([p.yi[0] < ydim for p in pset])
 
 
+@pytest.mark.parametrize('pset_mode', pset_modes)
+def test_sampling_same_grid_shared_search(pset_mode, npart=50):
+    """Fields on the same grid share their index search in JIT mode, which should
+    give the same results as separate searches in Scipy mode"""
+    xdim, ydim, zdim = 30, 40, 5
+    lon, lat = np.meshgrid(np.linspace(0., 1., xdim, dtype=np.float32), np.linspace(0., 1., ydim, dtype=np.float32))
+    depth = np.linspace(0., 10., zdim, dtype=np.float32)
+    data = {name: np.random.RandomState(seed).rand(zdim, ydim, xdim).astype(np.float32)
+            for seed, name in enumerate(['U', 'V', 'T', 'P'])}
+    fieldset = FieldSet.from_data(data, {'lon': lon, 'lat': lat, 'depth': depth}, mesh='flat')
+    fieldset.P.interp_method = 'nearest'
+    assert fieldset.U.grid is fieldset.T.grid
+
+    def SampleMove(particle, fieldset, time):
+        (u, v) = fieldset.UV[time, particle.depth, particle.lat, particle.lon]
+        particle.u = u + fieldset.T[time, particle.depth, particle.lat, particle.lon]
+        particle.lon += 0.01
+        particle.v = v + fieldset.T[time, particle.depth, particle.lat, particle.lon]
+        particle.p = fieldset.P[time, particle.depth, particle.lat, particle.lon]
+
+    results = {}
+    for mode in ['scipy', 'jit']:
+        pset = pset_type[pset_mode]['pset'](fieldset, pclass=pclass(mode), lon=np.linspace(0.1, 0.5, npart),
+                                            lat=np.linspace(0.2, 0.8, npart), depth=np.linspace(1., 9., npart))
+        pset.execute(SampleMove, runtime=3, dt=1)
+        results[mode] = [np.array(getattr(pset, var)) for var in ['u', 'v', 'p', 'lon']]
+    for scipy_result, jit_result in zip(results['scipy'], results['jit']):
+        assert np.allclose(scipy_result, jit_result, rtol=1e-5)
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('mode', ['jit', 'scipy'])
 @pytest.mark.parametrize('ugridfactor', [1, 10])
@@ -905,3 +973,27 @@ def test_nestedfields(pset_mode, mode, k_sample_p):
     assert np.isclose(pset.lat[0], -1)
     assert np.isclose(pset.p[0], 999)
     assert np.allclose(fieldset.UV[0][0, 0, 0, 0], [.1, .2])
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_nestedfields_outside_inner_nest(mode, k_sample_p):
+    xdim, ydim = 10, 20
+    lon = np.linspace(0., 1., xdim, dtype=np.float32)
+    lat = np.linspace(0., 1., ydim, dtype=np.float32)
+    P1 = Field('P1', 0.1*np.ones((ydim, xdim), dtype=np.float32), lon=lon, lat=lat)
+    P2 = Field('P2', 0.2*np.ones((ydim, xdim), dtype=np.float32), lon=lon+.5, lat=lat+.5)
+    P3 = Field('P3', 0.3*np.ones((ydim, xdim), dtype=np.float32), lon=4*lon-1, lat=4*lat-1)
+    fieldset = FieldSet.from_data({'U': np.zeros((ydim, xdim), dtype=np.float32),
+                                   'V': np.zeros((ydim, xdim), dtype=np.float32)},
+                                  {'lon': 4*lon-1, 'lat': 4*lat-1}, mesh='flat')
+    fieldset.add_field(NestedField('P', [P1, P2, P3]))
+
+    assert not P1.outside_bounding_box(.5, .5)
+    assert P1.outside_bounding_box(1.2, .5)
+    assert P1.outside_bounding_box(.5, -.2)
+
+    lons = [.2, 1.2, .8, -.5, 2.5]
+    lats = [.2, 1.2, .8, 2.5, -.5]
+    pset = ParticleSetSOA(fieldset, pclass=pclass(mode), lon=lons, lat=lats)
+    pset.execute(k_sample_p, endtime=1, dt=1)
+    assert np.allclose(pset.p, [.1, .2, .1, .3, .3])
@@ -1,16 +1,20 @@
+import threading
+
 import numpy as np
 import pytest
 
 from parcels import (
-    FieldSet, ParticleSet, JITParticle, StateCode, Field
+    FieldSet, ParticleSet, StateCode, OperationCode, Field
 )
-from parcels.particle import ScipyInteractionParticle, Variable, ScipyParticle
+from parcels.particle import ScipyInteractionParticle, JITInteractionParticle, Variable, ScipyParticle
 from parcels.application_kernels.interaction import NearestNeighborWithinRange
 from parcels.application_kernels.interaction import AsymmetricAttraction
 from parcels.application_kernels.interaction import MergeWithNearestNeighbor
 from parcels.application_kernels.advection import AdvectionRK4
+from parcels.interaction.haloexchange import halo_mask
+from parcels.interaction.mutationbuffer import MutationBuffer
 
-ptype = {'scipy': ScipyInteractionParticle, 'jit': JITParticle}
+ptype = {'scipy': ScipyInteractionParticle, 'jit': JITInteractionParticle}
 
 
 def DummyMoveNeighbor(particle, fieldset, time, neighbors, mutator):
@@ -51,12 +55,20 @@ class MergeParticle(ScipyInteractionParticle):
     mass = Variable('mass', initial=1, dtype=np.float32)
 
 
+class JITMergeParticle(JITInteractionParticle):
+    nearest_neighbor = Variable('nearest_neighbor', dtype=np.int64, to_write=False)
+    mass = Variable('mass', initial=1, dtype=np.float32)
+
+
+merge_ptype = {'scipy': MergeParticle, 'jit': JITMergeParticle}
+
+
 @pytest.fixture(name="fieldset")
 def fieldset_fixture(xdim=20, ydim=20):
     return fieldset(xdim=xdim, ydim=ydim)
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_simple_interaction_kernel(fieldset, mode):
     lons = [0.0, 0.1, 0.25, 0.44]
     lats = [0.0, 0.0, 0.0, 0.0]
@@ -68,7 +80,7 @@ def test_simple_interaction_kernel(fieldset, mode):
     assert np.allclose(pset.lat, [0.1, 0.2, 0.1, 0.0], rtol=1e-5)
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 @pytest.mark.parametrize('mesh', ['spherical', 'flat'])
 @pytest.mark.parametrize('periodic_domain_zonal', [False, True])
 def test_zonal_periodic_distance(mode, mesh, periodic_domain_zonal):
@@ -85,7 +97,7 @@ def test_zonal_periodic_distance(mode, mesh, periodic_domain_zonal):
         assert np.allclose([p.lat for p in pset], 0.5)
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_concatenate_interaction_kernels(fieldset, mode):
     lons = [0.0, 0.1, 0.25, 0.44]
     lats = [0.0, 0.0, 0.0, 0.0]
@@ -104,7 +116,7 @@ def test_concatenate_interaction_kernels(fieldset, mode):
     assert np.allclose(pset.lat, [0.2, 0.4, 0.1, 0.0], rtol=1e-5)
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_concatenate_interaction_kernels_as_pyfunc(fieldset, mode):
     lons = [0.0, 0.1, 0.25, 0.44]
     lats = [0.0, 0.0, 0.0, 0.0]
@@ -122,13 +134,13 @@ def test_concatenate_interaction_kernels_as_pyfunc(fieldset, mode):
     assert np.allclose(pset.lat, [0.2, 0.4, 0.1, 0.0], rtol=1e-5)
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_neighbor_merge(fieldset, mode):
     lons = [0.0, 0.1, 0.25, 0.44]
     lats = [0.0, 0.0, 0.0, 0.0]
     # Distance in meters R_earth*0.2 degrees
     interaction_distance = 6371000*5.5*np.pi/180
-    pset = ParticleSet(fieldset, pclass=MergeParticle, lon=lons, lat=lats,
+    pset = ParticleSet(fieldset, pclass=merge_ptype[mode], lon=lons, lat=lats,
                        interaction_distance=interaction_distance)
     pyfunc_inter = (pset.InteractionKernel(NearestNeighborWithinRange)
                     + MergeWithNearestNeighbor)
@@ -139,17 +151,69 @@ def test_neighbor_merge(fieldset, mode):
     assert len(pset) == 1
 
 
+class StockParticle(ScipyInteractionParticle):
+    attractor = Variable('attractor', dtype=np.int32)
+    nearest_neighbor = Variable('nearest_neighbor', dtype=np.int64, to_write=False)
+    mass = Variable('mass', initial=1, dtype=np.float32)
+
+
+class JITStockParticle(JITInteractionParticle):
+    attractor = Variable('attractor', dtype=np.int32)
+    nearest_neighbor = Variable('nearest_neighbor', dtype=np.int64, to_write=False)
+    mass = Variable('mass', initial=1, dtype=np.float32)
+
+
+stock_ptype = {'scipy': StockParticle, 'jit': JITStockParticle}
+
+
+def test_stock_interaction_kernels_jit_equals_scipy(fieldset, npart=40):
+    """The C implementations of the stock interaction kernels must agree with the Python kernels"""
+    np.random.seed(1873)
+    lons, lats = np.random.rand(npart), np.random.rand(npart)
+    depths = np.random.rand(npart)
+    attractor = np.random.rand(npart) < 0.3
+    mass = 1 + np.random.rand(npart)
+    interaction_distance = 6371000*0.15*np.pi/180
+
+    results = {}
+    for mode in ['scipy', 'jit']:
+        pset = ParticleSet(fieldset, pclass=stock_ptype[mode], lon=lons, lat=lats, depth=depths, time=np.zeros(npart),
+                           attractor=attractor, mass=mass, interaction_distance=interaction_distance)
+        pset.collection.data['dt'][:] = 1.
+        kernel = pset.InteractionKernel(NearestNeighborWithinRange) + MergeWithNearestNeighbor + AsymmetricAttraction
+        if mode == 'jit':
+            kernel.compile(compiler=pset._jit_compiler())
+            kernel.load_lib()
+        kernel.execute_interactions(pset, 1., 1., use_jit=(mode == 'jit'))
+        data = pset.collection.data
+        results[mode] = {var: np.array(data[var]) for var in ['lat', 'lon', 'depth', 'mass', 'state']}
+        # IDs differ between the ParticleSets, so the neighbours are compared by index
+        found = data['nearest_neighbor'] >= 0
+        results[mode]['nearest_neighbor'] = np.where(found, data['nearest_neighbor'] - data['id'][0], -1)
+
+    assert np.any(results['scipy']['state'] == OperationCode.Delete)
+    for var in results['scipy']:
+        assert np.allclose(results['jit'][var], results['scipy'][var], rtol=1e-5), var
+
+
 class AttractingParticle(ScipyInteractionParticle):
     attractor = Variable('attractor', dtype=np.bool_, to_write='once')
 
 
-@pytest.mark.parametrize('mode', ['scipy'])
+class JITAttractingParticle(JITInteractionParticle):
+    attractor = Variable('attractor', dtype=np.int32, to_write='once')
+
+
+attracting_ptype = {'scipy': AttractingParticle, 'jit': JITAttractingParticle}
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_asymmetric_attraction(fieldset, mode):
     lons = [0.0, 0.1, 0.2]
     lats = [0.0, 0.0, 0.0]
     # Distance in meters R_earth*0.2 degrees
     interaction_distance = 6371000*5.5*np.pi/180
-    pset = ParticleSet(fieldset, pclass=AttractingParticle, lon=lons, lat=lats,
+    pset = ParticleSet(fieldset, pclass=attracting_ptype[mode], lon=lons, lat=lats,
                        interaction_distance=interaction_distance,
                        attractor=[True, False, False])
     pyfunc_inter = pset.InteractionKernel(AsymmetricAttraction)
@@ -161,6 +225,47 @@ def test_asymmetric_attraction(fieldset, mode):
     assert len(pset) == 3
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_interaction_skin(fieldset, mode):
+    np.random.seed(1873261)
+    lons = np.random.rand(50)
+    lats = np.random.rand(50)
+    interaction_distance = 6371000*0.1*np.pi/180
+    psets = []
+    for interaction_skin in [None, interaction_distance/2]:
+        pset = ParticleSet(fieldset, pclass=ptype[mode], lon=lons, lat=lats,
+                           interaction_distance=interaction_distance,
+                           interaction_skin=interaction_skin)
+        pset.execute(DoNothing, pyfunc_inter=DummyMoveNeighbor, runtime=5., dt=1.)
+        psets.append(pset)
+    assert np.allclose(psets[0].lat, psets[1].lat)
+    assert psets[1]._neighbor_tree.n_rebuilds > 1
+
+
+def test_mutation_buffer(fieldset):
+    pset = ParticleSet(fieldset, pclass=MergeParticle, lon=[0.1, 0.2, 0.3, 0.4], lat=[0.5]*4,
+                       mass=[1., 3., 1., 1.])
+    ids = pset.id
+    mutator = MutationBuffer()
+    mutator.merge(ids[0], ids[1])
+    mutator.set(ids[2], 'lat', 0.6)
+    mutator.set(ids[2], 'lat', 0.7)
+    mutator.add(ids[3], 'lat', 0.1)
+    mutator.add(ids[3], 'lat', 0.1)
+    mutator.delete(ids[3])
+    mutator.set(ids.max()+1, 'lat', 0.)  # not in the ParticleSet
+
+    def f(p, dlon):
+        p.lon += dlon
+    mutator[ids[2]].append((f, [0.5]))
+    mutator.apply(pset)
+
+    assert np.allclose(pset.lon, [0.175, 0.2, 0.8, 0.4])
+    assert np.allclose(pset.lat, [0.5, 0.5, 0.7, 0.7])
+    assert np.allclose(pset.mass, [4., 3., 1., 1.])
+    assert np.all((pset.collection.state == OperationCode.Delete) == [False, True, False, True])
+
+
 def ConstantMoveInteraction(particle, fieldset, time, neighbors, mutator):
     def f(p):
         p.lat += p.dt
@@ -194,3 +299,118 @@ def test_pseudo_interaction(runtime, dt):
     assert np.all(pset.lon == pset2.lon)
     assert np.all(pset2.lat == pset2.lon)
     assert np.all(pset2._collection.data["time"][0] == pset._collection.data["time"][0])
+
+
+@pytest.mark.parametrize('spherical', [True, False])
+def test_halo_mask(spherical):
+    # Particles to the east of, to the north of, and far from the box [0, 1] x [0, 1]
+    values = np.array([[0., 0., 0., 50.],
+                       [0.5, 1.5, 5., 0.5],
+                       [1.5, 0.5, 5., 0.5]])
+    bbox = [0., 10., 0., 1., 0., 1.]
+    inter_dist = 1852*60 if spherical else 1
+    mask = halo_mask(values, bbox, inter_dist_vert=10, inter_dist_horiz=inter_dist, spherical=spherical)
+    assert np.all(mask == [True, True, False, False])
+
+
+class FakeComm(object):
+    """In-process stand-in for an MPI communicator, with one thread per rank"""
+
+    def __init__(self, rank, slots, barrier):
+        self.rank = rank
+        self.slots = slots
+        self.barrier = barrier
+
+    def Get_rank(self):
+        return self.rank
+
+    def Get_size(self):
+        return len(self.slots)
+
+    def _exchange(self, value):
+        self.slots[self.rank] = value
+        self.barrier.wait()
+        values = list(self.slots)
+        self.barrier.wait()
+        return values
+
+    def allgather(self, value):
+        return self._exchange(value)
+
+    def alltoall(self, values):
+        return [sent[self.rank] for sent in self._exchange(values)]
+
+
+def run_on_fake_ranks(kernel, psets):
+    """Runs the interaction kernel once on each ParticleSet as one rank of a FakeComm"""
+    slots = [None] * len(psets)
+    barrier = threading.Barrier(len(psets), timeout=60)
+    errors = []
+
+    def run(rank):
+        try:
+            kernel.execute_interactions(psets[rank], 1., 1., comm=FakeComm(rank, slots, barrier))
+        except Exception as e:
+            errors.append(e)
+            barrier.abort()
+    threads = [threading.Thread(target=run, args=(rank,)) for rank in range(len(psets))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+class HaloParticle(ScipyInteractionParticle):
+    attractor = Variable('attractor', dtype=np.bool_)
+    nearest_neighbor = Variable('nearest_neighbor', dtype=np.int64, to_write=False)
+    mass = Variable('mass', initial=1, dtype=np.float32)
+
+
+def FeedNeighbors(particle, fieldset, time, neighbors, mutator):
+    """Attractors pass unit mass on to the non-attractors around them"""
+    if particle.attractor:
+        for n in neighbors:
+            if not n.attractor:
+                mutator.add(n.id, 'mass', 1.)
+    return StateCode.Success
+
+
+@pytest.mark.parametrize('pyfuncs', [(FeedNeighbors, AsymmetricAttraction),
+                                     (NearestNeighborWithinRange, MergeWithNearestNeighbor)])
+def test_halo_exchange(pyfuncs):
+    # Rank 0 owns the particles in the west, rank 1 those in the east; all lie within each other's halo
+    lons = [[0.3, 0.48, 0.55], [0.7, 0.45, 0.52]]
+    attractor = [[True, False, False], [True, False, False]]
+    mass = [[np.inf, 1., 1.], [np.inf, 1., 3.]]  # the attractors are infinitely heavy
+    fset = fieldset(mesh='flat')
+
+    def make_pset(rank):
+        select = slice(None) if rank is None else slice(rank, rank+1)
+        lon = sum(lons[select], [])
+        pset = ParticleSet(fset, pclass=HaloParticle, lon=lon, lat=[0.5]*len(lon), time=[0.]*len(lon),
+                           attractor=sum(attractor[select], []), mass=sum(mass[select], []),
+                           interaction_distance=0.35)
+        pset.collection.data['dt'][:] = 1.
+        return pset
+    psets = [make_pset(0), make_pset(1)]
+    reference = make_pset(None)
+    kernel = reference.InteractionKernel(pyfuncs[0]) + pyfuncs[1]
+    kernel.execute_interactions(reference, 1., 1.)
+    run_on_fake_ranks(kernel, psets)
+
+    for var in ['lon', 'lat', 'mass', 'state']:
+        distributed = np.concatenate([getattr(pset.collection, var) for pset in psets])
+        assert np.allclose(distributed, getattr(reference.collection, var)), var
+    if pyfuncs[0] is FeedNeighbors:
+        # Each non-attractor received increments from the attractors of both ranks
+        assert np.all(psets[0].mass == [np.inf, 3., 3.]) and np.all(psets[1].mass == [np.inf, 3., 5.])
+        assert np.all(psets[0].lon[1:] != lons[0][1:]) and np.all(psets[1].lon[1:] != lons[1][1:])
+    else:
+        # Both non-attractors of rank 1 merge into those of rank 0, and the deletions of the ghosts are returned
+        neighbors = np.concatenate([pset.collection.nearest_neighbor - pset.collection.id for pset in psets])
+        assert np.all(neighbors == reference.collection.nearest_neighbor - reference.collection.id)
+        assert np.all(psets[0].collection.state != OperationCode.Delete)
+        assert np.all((psets[1].collection.state == OperationCode.Delete) == [False, True, True])
+        assert np.allclose(psets[0].lon[1:], [0.465, 0.5275]) and np.all(psets[0].mass[1:] == [2., 4.])
@@ -1,7 +1,7 @@
 from os import path
 from parcels import (
     FieldSet, ScipyParticle, JITParticle, StateCode, OperationCode, ErrorCode, KernelError,
-    OutOfBoundsError, AdvectionRK4
+    OutOfBoundsError, AdvectionRK4, Variable
 )
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
@@ -302,3 +302,67 @@ def test_execution_keep_cfiles_and_nocompilation_warnings(pset_mode, fieldset, d
         assert path.exists(cfile)
         with open(logfile) as f:
             assert 'warning' not in f.read(), 'Compilation WARNING in log file'
+
+
+def test_execution_prebuilt_kernel(fieldset, tmpdir, monkeypatch):
+    """Test that a prebuilt stock kernel is used instead of compiling it"""
+    from parcels.compilation.prebuilt import build_prebuilt_kernels
+    lon, lat = np.linspace(0.1, 0.4, 5), np.linspace(0.2, 0.5, 5)
+
+    monkeypatch.setenv('PARCELS_PREBUILT_DIR', '')
+    pset = ParticleSetSOA(fieldset, pclass=JITParticle, lon=lon, lat=lat)
+    pset.execute(AdvectionRK4, runtime=0.5, dt=0.1)
+    assert not pset.kernel._prebuilt
+
+    monkeypatch.setenv('PARCELS_PREBUILT_DIR', str(tmpdir))
+    build_prebuilt_kernels(kernels=[AdvectionRK4], meshes=['flat'])
+    pset_prebuilt = ParticleSetSOA(fieldset, pclass=JITParticle, lon=lon, lat=lat)
+    pset_prebuilt.execute(AdvectionRK4, runtime=0.5, dt=0.1)
+    assert pset_prebuilt.kernel._prebuilt
+    assert np.allclose(pset_prebuilt.lon, pset.lon) and np.allclose(pset_prebuilt.lat, pset.lat)
+    lib_file = pset_prebuilt.kernel.lib_file
+    pset_prebuilt.kernel.remove_lib()
+    assert path.isfile(lib_file)
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('dt', [1., -1.])
+def test_execution_staggered_release_active_indices(fieldset, mode, dt):
+    """Test that the kernel loop only visits the released particles, also when particles are deleted"""
+    class CountParticle(ptype[mode]):
+        nsteps = Variable('nsteps', dtype=np.int32, initial=0)
+
+    def CountAndDelete(particle, fieldset, time):
+        particle.nsteps += 1
+        if particle.lat < 0.3 and particle.nsteps == 2:
+            particle.delete()
+
+    npart = 20
+    index = np.arange(npart)
+    lat = np.where(index % 2 == 0, 0.25, 0.75)  # even particles are deleted after two steps
+    pset = ParticleSetSOA(fieldset, pclass=CountParticle, lon=0.1 + 0.04 * index, lat=lat, time=index * dt)
+
+    for runtime, endtime in [(10, 10), (5, 15)]:
+        pset.execute(CountAndDelete, runtime=runtime, dt=dt)
+        index = np.round((pset.lon - 0.1) / 0.04).astype(int)
+        assert np.all(pset.nsteps == np.maximum(endtime - index, 0))
+        assert len(pset) == npart - np.count_nonzero((np.arange(npart) % 2 == 0) & (np.arange(npart) <= endtime - 2))
+        assert len(pset.collection.active_indices(endtime * dt, dt)) == np.count_nonzero(index < endtime)
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_execution_recovery_skips_unreleased(fieldset, mode):
+    """Test that only the particles visited by the kernel loop are recovered"""
+    def MoveRight(particle, fieldset, time):
+        fieldset.U[time, particle.depth, particle.lat, particle.lon + 0.1]
+        particle.lon += 0.1
+
+    def MoveLeft(particle, fieldset, time):
+        particle.lon -= 1.
+
+    pset = ParticleSetSOA(fieldset, pclass=ptype[mode], lon=[0.95, 0.5], lat=[0.5, 0.5], time=[0., 20.])
+    pset.collection.state[1] = ErrorCode.ErrorOutOfBounds  # left over, e.g. from an earlier execute
+    pset.execute(MoveRight, endtime=10., dt=1., recovery={ErrorCode.ErrorOutOfBounds: MoveLeft})
+    assert len(pset) == 2
+    assert pset.lon[1] == 0.5
+    assert pset.collection.state[1] == ErrorCode.ErrorOutOfBounds
@@ -6,6 +6,8 @@ from parcels.interaction.neighborsearch import BruteSphericalNeighborSearch
 from parcels.interaction.neighborsearch import HashFlatNeighborSearch
 from parcels.interaction.neighborsearch import HashSphericalNeighborSearch
 from parcels.interaction.neighborsearch import KDTreeFlatNeighborSearch
+from parcels.interaction.neighborsearch import KDTreeSphericalNeighborSearch
+from parcels.interaction.neighborsearch import VerletNeighborSearch
 from parcels.interaction.neighborsearch.basehash import BaseHashNeighborSearch
 
 
@@ -59,7 +61,8 @@ def create_flat_positions(n_particle):
 
 
 @pytest.mark.parametrize(
-    "test_class", [BruteSphericalNeighborSearch, HashSphericalNeighborSearch])
+    "test_class", [BruteSphericalNeighborSearch, HashSphericalNeighborSearch,
+                   KDTreeSphericalNeighborSearch])
 def test_spherical_neighbors(test_class):
     np.random.seed(9837452)
     ref_class = BruteSphericalNeighborSearch
@@ -109,7 +112,8 @@ def test_flat_update(test_class):
 
 
 @pytest.mark.parametrize(
-    "test_class", [BruteSphericalNeighborSearch, HashSphericalNeighborSearch])
+    "test_class", [BruteSphericalNeighborSearch, HashSphericalNeighborSearch,
+                   KDTreeSphericalNeighborSearch])
 def test_spherical_update(test_class):
     np.random.seed(9182741)
     n_particle = 1000
@@ -134,3 +138,114 @@ def test_spherical_update(test_class):
         for particle_idx in test_particles:
             ref_result, _ = ref_instance.find_neighbors_by_idx(particle_idx)
             compare_results_by_idx(test_instance, particle_idx, ref_result, active_idx=active_idx)
+
+
+@pytest.mark.parametrize(
+    "test_class,mesh", [(KDTreeFlatNeighborSearch, 'flat'), (HashFlatNeighborSearch, 'flat'),
+                        (BruteFlatNeighborSearch, 'flat'), (BruteSphericalNeighborSearch, 'spherical'),
+                        (HashSphericalNeighborSearch, 'spherical'), (KDTreeSphericalNeighborSearch, 'spherical')])
+@pytest.mark.parametrize("periodic_domain_zonal", [None, 1.])
+def test_find_all_neighbors(test_class, mesh, periodic_domain_zonal):
+    np.random.seed(2398472)
+    n_particle = 1000
+    if mesh == 'flat':
+        positions = create_flat_positions(n_particle)
+        inter_dist = {'inter_dist_vert': 0.3, 'inter_dist_horiz': 0.1}
+        ref_class = BruteFlatNeighborSearch
+    else:
+        positions = create_spherical_positions(n_particle)
+        inter_dist = {'inter_dist_vert': 100000, 'inter_dist_horiz': 1000000}
+        ref_class = BruteSphericalNeighborSearch
+        periodic_domain_zonal = 360. if periodic_domain_zonal else None
+    active_mask = np.random.rand(n_particle) > 0.2
+    instance = test_class(periodic_domain_zonal=periodic_domain_zonal, **inter_dist)
+    instance.rebuild(positions, active_mask)
+    ref_instance = ref_class(periodic_domain_zonal=periodic_domain_zonal, **inter_dist)
+    ref_instance.rebuild(positions, active_mask)
+
+    particle_idx = np.random.choice(np.where(active_mask)[0], 100, replace=False)
+    indptr, neighbor_idx, distances = instance.find_all_neighbors(particle_idx, block_size=10000)
+    assert len(indptr) == len(particle_idx) + 1
+    assert distances.shape == (2, len(neighbor_idx))
+    for k, idx in enumerate(particle_idx):
+        ref_result, ref_distances = ref_instance.find_neighbors_by_idx(idx)
+        ref_distances = ref_distances[:, ref_result != idx]
+        ref_result = ref_result[ref_result != idx]
+        order = np.argsort(neighbor_idx[indptr[k]:indptr[k+1]])
+        assert np.all(neighbor_idx[indptr[k]:indptr[k+1]][order] == np.sort(ref_result))
+        assert np.allclose(distances[:, indptr[k]:indptr[k+1]][:, order], ref_distances[:, np.argsort(ref_result)])
+
+
+@pytest.mark.parametrize(
+    "search_class,mesh", [(KDTreeFlatNeighborSearch, 'flat'), (HashFlatNeighborSearch, 'flat'),
+                          (HashSphericalNeighborSearch, 'spherical'), (KDTreeSphericalNeighborSearch, 'spherical')])
+@pytest.mark.parametrize("periodic_domain_zonal", [None, 1.])
+def test_verlet_update(search_class, mesh, periodic_domain_zonal):
+    np.random.seed(8127364)
+    n_particle = 1000
+    if mesh == 'flat':
+        positions = create_flat_positions(n_particle)
+        inter_dist = {'inter_dist_vert': 0.3, 'inter_dist_horiz': 0.1}
+        skin = {'skin_vert': 0.06, 'skin_horiz': 0.02}
+        step = np.array([[0.002], [0.0005], [0.0005]])
+        ref_class = BruteFlatNeighborSearch
+    else:
+        positions = create_spherical_positions(n_particle)
+        inter_dist = {'inter_dist_vert': 100000, 'inter_dist_horiz': 1000000}
+        skin = {'skin_vert': 20000, 'skin_horiz': 200000}
+        step = np.array([[500], [0.05], [0.05]])
+        ref_class = BruteSphericalNeighborSearch
+        periodic_domain_zonal = 360. if periodic_domain_zonal else None
+    instance = VerletNeighborSearch(search_class, periodic_domain_zonal=periodic_domain_zonal, **inter_dist, **skin)
+    ref_instance = ref_class(periodic_domain_zonal=periodic_domain_zonal, **inter_dist)
+
+    active_mask = np.random.rand(n_particle) > 0.2
+    for i in range(20):
+        positions = positions + step*(2*np.random.rand(3, n_particle)-1)
+        if i == 10:
+            active_mask = np.random.rand(n_particle) > 0.2
+        instance.update_values(positions, active_mask)
+        ref_instance.update_values(positions, active_mask)
+
+        active_idx = np.where(active_mask)[0]
+        particle_idx = np.random.choice(active_idx, 20, replace=False)
+        indptr, neighbor_idx, distances = instance.find_all_neighbors(particle_idx)
+        for k, idx in enumerate(particle_idx):
+            ref_result, _ = ref_instance.find_neighbors_by_idx(idx)
+            assert set(neighbor_idx[indptr[k]:indptr[k+1]]) == set(ref_result) - {idx}
+            compare_results_by_idx(instance, idx, ref_result, active_idx=active_idx)
+    # The lists are only rebuilt when the particles have moved too far or are activated.
+    assert 1 < instance.n_rebuilds < 20
+
+
+@pytest.mark.parametrize(
+    "test_class,mesh", [(HashFlatNeighborSearch, 'flat'), (HashSphericalNeighborSearch, 'spherical')])
+def test_hash_small_moves(test_class, mesh):
+    np.random.seed(1298371)
+    n_particle = 1000
+    if mesh == 'flat':
+        positions = create_flat_positions(n_particle)
+        inter_dist = {'inter_dist_vert': 0.1, 'inter_dist_horiz': 0.1}
+        step = np.array([[0.01], [0.01], [0.01]])
+        ref_class = BruteFlatNeighborSearch
+    else:
+        positions = create_spherical_positions(n_particle, max_depth=1000)
+        inter_dist = {'inter_dist_vert': 200, 'inter_dist_horiz': 1000000}
+        step = np.array([[20], [1], [1]])
+        ref_class = BruteSphericalNeighborSearch
+    instance = test_class(**inter_dist)
+    ref_instance = ref_class(**inter_dist)
+
+    for _ in range(5):
+        # Only the particles that change cells are re-sorted.
+        positions = positions + step*(2*np.random.rand(3, n_particle)-1)
+        active_mask = np.random.rand(n_particle) > 0.2
+        instance.update_values(positions, active_mask)
+        ref_instance.update_values(positions, active_mask)
+        instance.consistency_check()
+
+        indptr, neighbor_idx, _ = instance.find_all_neighbors()
+        ref_indptr, ref_neighbor_idx, _ = ref_instance.find_all_neighbors()
+        assert np.all(indptr == ref_indptr)
+        for k in range(len(indptr)-1):
+            assert set(neighbor_idx[indptr[k]:indptr[k+1]]) == set(ref_neighbor_idx[ref_indptr[k]:ref_indptr[k+1]])
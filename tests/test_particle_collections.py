@@ -61,8 +61,58 @@ def test_pset_get_single_by_ID(fieldset, pset_mode, npart=10):
     assert np.all(np.isclose([pset.collection.get_single_by_ID(np.int64(i)).lon for i in ids], np.linspace(0, 1, npart)))
 
 
+def test_pset_indices_by_IDs(fieldset, npart=10):
+    pset = ParticleSetSOA(fieldset, lon=np.linspace(0, 1, npart), lat=np.zeros(npart), pclass=ScipyParticle)
+    pset.add(ParticleSetSOA(fieldset, lon=np.linspace(0, 1, npart), lat=np.ones(npart), pclass=ScipyParticle))
+    pset.collection.add_same(ParticleSetSOA(fieldset, lon=np.zeros(2), lat=np.zeros(2), pclass=ScipyParticle,
+                                            pid_orig=np.array([-5, -4]) - ScipyParticle.lastID).collection)
+    pset.remove_indices([0, 3, 12])
+    ids = pset.collection._data['id']
+    assert ids[0] == -4  # the particles with smaller IDs are prepended
+    query = ids[::-1]
+    indices, found = pset.collection.indices_by_IDs(np.append(query, ids.max()+1))
+    assert np.all(found[:-1]) and not found[-1]
+    assert np.all(ids[indices[:-1]] == query)
+
+    pset.collection.remove_multi_by_IDs(ids[[1, 5]])
+    assert len(pset) == 2*npart - 3 + 2 - 2
+    assert pset.collection.get_single_by_ID(ids[0]).id == -4
+    with pytest.raises(ValueError):
+        pset.collection.get_single_by_ID(ids[1])
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 def test_pset_getattr(fieldset, pset_mode, npart=10):
     lats = np.random.random(npart)
     pset = pset_type[pset_mode]['pset'](fieldset, lon=np.linspace(0, 1, npart), lat=lats, pclass=JITParticle)
     assert np.allclose(pset.lat, lats)
+
+
+def test_pset_reserve_activate(fieldset, npart=10, nreleases=50):
+    pset = ParticleSetSOA(fieldset, lon=np.linspace(0, 1, npart), lat=np.zeros(npart), pclass=ScipyParticle)
+    reserved = ParticleSetSOA(fieldset, lon=np.tile(np.linspace(0, 1, npart), nreleases), lat=np.ones(npart*nreleases),
+                              pclass=ScipyParticle)
+    pset.collection.reserve(reserved.collection)
+    assert len(pset) == npart and pset.collection.nreserved == npart*nreleases
+    assert np.all(pset.lat == 0)
+
+    # activating reserved particles only extends the views on the arrays in which they are reserved
+    lon = pset.collection.data['lon']
+    pset.collection.activate_reserved(npart)
+    assert len(pset) == 2*npart and np.shares_memory(pset.collection.data['lon'], lon)
+    assert pset.collection.nreserved == npart*(nreleases-1)
+
+    # after a removal, the particles are copied into the free capacity, which is independent of the reserved particles
+    pset.remove_indices([0, 1])
+    pset.collection.activate_reserved(npart)
+    lon = pset.collection.data['lon']
+    for i in range(2, 4):
+        pset.collection.activate_reserved(npart)
+        assert np.shares_memory(pset.collection.data['lon'], lon)
+    assert lon.base.shape[0] < npart*nreleases
+    assert len(pset) == 5*npart - 2
+    assert np.all(pset.lat[npart-2:] == 1)
+    assert np.all(np.diff(pset.collection.data['id']) > 0)
+    assert pset.collection.get_single_by_ID(reserved.collection.data['id'][3*npart]).lat == 1
+    with pytest.raises(ValueError):
+        pset.collection.get_single_by_ID(reserved.collection.data['id'][4*npart])
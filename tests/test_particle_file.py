@@ -1,5 +1,5 @@
 from parcels import (FieldSet, ScipyParticle, JITParticle, Variable, ErrorCode)
-from parcels.particlefile import _set_calendar
+from parcels.particlefile import _set_calendar, OnlineAccumulator, ConnectivityAccumulator
 from parcels.tools.converters import _get_cftime_calendars, _get_cftime_datetimes
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
@@ -303,3 +303,95 @@ def test_reset_dt(fieldset, pset_mode, mode, tmpdir):
     pset.execute(pset.Kernel(Update_lon), endtime=0.1, dt=0.02, output_file=ofile)
 
     assert np.allclose(pset.lon, .6)
+
+
+@pytest.mark.parametrize('pset_mode', pset_modes)
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_online_accumulator(fieldset, pset_mode, mode, tmpdir):
+    filepath = tmpdir.join("accumulator")
+
+    class AgeParticle(ptype[mode]):
+        age = Variable('age', dtype=np.float32, initial=0.)
+
+    def Age(particle, fieldset, time):
+        particle.age += particle.dt
+
+    def DeleteOld(particle, fieldset, time):
+        if particle.age > 2.5 and particle.lat > 0:
+            particle.delete()
+
+    lon = [0.5, 0.5, 0.5]
+    lat = [-30, -30, 30]
+    pset = pset_type[pset_mode]['pset'](fieldset, pclass=AgeParticle, lon=lon, lat=lat)
+    accumulator = OnlineAccumulator(filepath, pset, outputdt=1, variables=['age'], period=2)
+    pset.execute(pset.Kernel(Age) + DeleteOld, runtime=4, dt=1, output_file=accumulator)
+    accumulator.close()
+
+    xi, yi, _ = fieldset.U.search_indices_2d(lon, lat)
+    ages = {0: [0, 1], 1: [2, 3], 2: [4]}  # ages at the writes in each period
+    totals = {0: 6, 1: 5, 2: 2}  # the third particle is deleted before the write at time 3
+    for period, period_ages in ages.items():
+        with Dataset(filepath + '_%.4d.nc' % period) as ds:
+            count = ds['count'][0]
+            assert count.sum() == totals[period]
+            assert count[yi[0], xi[0]] == 2 * len(period_ages)
+            assert np.allclose(ds['age_mean'][0, yi[0], xi[0]], np.mean(period_ages))
+            assert np.allclose(ds['age_std'][0, yi[0], xi[0]], np.std(period_ages))
+            assert ds['age_min'][0, yi[0], xi[0]] == min(period_ages)
+            assert ds['age_max'][0, yi[0], xi[0]] == max(period_ages)
+            assert ds['age_mean'][0, 0, 0] is np.ma.masked
+            assert np.allclose(ds['time_bounds'][0], [2 * period, min(2 * period + 1, 4)])
+
+
+@pytest.mark.parametrize('pset_mode', pset_modes)
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_connectivity_accumulator(fieldset, pset_mode, mode, tmpdir):
+    filepath = tmpdir.join("connectivity.nc")
+
+    def MoveNorth(particle, fieldset, time):
+        particle.lat += 20
+
+    regions = np.where(fieldset.U.grid.lat < 0, 0, 1)[:, None] * np.ones((1, fieldset.U.grid.xdim))
+    pset = pset_type[pset_mode]['pset'](fieldset, pclass=ptype[mode], lon=[0.5, 0.5, 0.5], lat=[-50, -50, 10])
+    connectivity = ConnectivityAccumulator(filepath, pset, regions, lags=[1, 3], outputdt=1)
+    pset.execute(MoveNorth, runtime=3, dt=1, output_file=connectivity)
+    connectivity.close()
+
+    # after lag 1 the particles are at -30, -30 and 30, after lag 3 at 10, 10 and outside the grid
+    assert np.all(connectivity.matrix(0).toarray() == [[2, 0], [0, 1]])
+    assert np.all(connectivity.matrix(1).toarray() == [[0, 2], [0, 0]])
+    with Dataset(filepath) as ds:
+        assert np.all(ds['released'][:] == [2, 1])
+        assert np.allclose(ds['lag'][:], [1, 3])
+        transitions = set(zip(ds['lag_index'][:], ds['source'][:], ds['destination'][:], ds['count'][:]))
+        assert transitions == {(0, 0, 0, 2), (0, 1, 1, 1), (1, 0, 1, 2)}
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_dense_output(mode, tmpdir):
+    dimensions = {'lon': np.arange(4.) * 1000, 'lat': np.arange(3.) * 1000}
+    data = {'U': np.ones((3, 4), dtype=np.float32), 'V': np.zeros((3, 4), dtype=np.float32)}
+    fieldset = FieldSet.from_data(data, dimensions, mesh='flat')
+
+    class CountParticle(ptype[mode]):
+        nsteps = Variable('nsteps', dtype=np.int32, initial=0, to_write=False)
+
+    def Move(particle, fieldset, time):
+        particle.lon += fieldset.U[time, particle.depth, particle.lat, particle.lon] * particle.dt
+        particle.nsteps += 1
+
+    pset = ParticleSetSOA(fieldset, pclass=CountParticle, lon=[10, 20], lat=[500, 600])
+    filepath = tmpdir.join("pfile_dense_output.nc")
+    ofile = pset.ParticleFile(name=filepath, outputdt=0.3)
+    pset.execute(Move, runtime=6, dt=1, output_file=ofile, dense_output=True)
+    ofile.close()
+
+    assert np.all(pset.nsteps == 6)  # the time steps are not cut at the output times
+    with Dataset(filepath) as ds:
+        assert np.allclose(ds['time'][0], np.arange(0, 6.01, 0.3))
+        assert np.allclose(ds['lon'][:], np.array([[10], [20]]) + np.arange(0, 6.01, 0.3), atol=1e-4)
+
+    pset = ParticleSetAOS(fieldset, pclass=CountParticle, lon=[10, 20], lat=[500, 600])
+    ofile = pset.ParticleFile(name=tmpdir.join("pfile_dense_output_aos.nc"), outputdt=0.3)
+    with pytest.raises(NotImplementedError):
+        pset.execute(Move, runtime=6, dt=1, output_file=ofile, dense_output=True)
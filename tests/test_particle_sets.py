@@ -1,9 +1,11 @@
 from parcels import (FieldSet, Field, ScipyParticle, JITParticle,
-                     Variable, StateCode, OperationCode, CurvilinearZGrid)
+                     Variable, StateCode, OperationCode, CurvilinearZGrid, Ensemble)
 from parcels import ParticleSetSOA, ParticleFileSOA, KernelSOA  # noqa
 from parcels import ParticleSetAOS, ParticleFileAOS, KernelAOS  # noqa
+from netCDF4 import Dataset
 import numpy as np
 import pytest
+import xarray as xr
 
 pset_modes = ['soa', 'aos']
 ptype = {'scipy': ScipyParticle, 'jit': JITParticle}
@@ -233,6 +235,44 @@ def test_pset_repeatdt_custominit(fieldset, pset_mode, mode):
     assert np.allclose([p.sample_var for p in pset], 5.)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('dt', [-1, 1])
+def test_pset_repeatdt_schedule(fieldset, mode, dt):
+    pset = ParticleSetSOA(fieldset, lon=[0, 0.5], lat=[0, 0], pclass=ptype[mode], repeatdt=2, time=0 if dt > 0 else 6)
+    sizes = []
+
+    def MoveLon(particle, fieldset, time):
+        particle.lon += 0.1
+
+    pset.execute(MoveLon, dt=dt, runtime=6, postIterationCallbacks=[lambda: sizes.append(len(pset))], callbackdt=1)
+    assert sizes == [2, 4, 4, 6, 6, 8]  # the prepared releases are only added at their release time
+    assert np.all(pset.id - pset.id[0] == np.arange(8))
+    assert np.allclose(pset.time, 6 if dt > 0 else 0)
+    # the particles of each release are only advanced from their release time
+    assert np.allclose(pset.lon, [0.6, 1.1, 0.4, 0.9, 0.2, 0.7, 0, 0.5], rtol=1e-5)
+
+
+def test_pset_repeatdt_schedule_interrupted(fieldset):
+    pset = ParticleSetSOA(fieldset, lon=[0, 0.5], lat=[0, 0], pclass=ScipyParticle, repeatdt=2, time=0)
+
+    def Interrupt():
+        if pset.time[0] >= 3:
+            raise RuntimeError('interrupted')
+
+    def DoNothing(particle, fieldset, time):
+        pass
+
+    with pytest.raises(RuntimeError):
+        pset.execute(DoNothing, dt=1, runtime=10, postIterationCallbacks=[Interrupt], callbackdt=1)
+    assert len(pset) == 4  # the releases after the interruption are not in the ParticleSet
+    assert np.allclose(pset.time, 3)
+
+    pset.execute(DoNothing, dt=1, runtime=3)
+    assert len(pset) == 8
+    assert np.all(pset.id - pset.id[0] == np.arange(8))
+    assert np.allclose(pset.time, 6)
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 def test_pset_stop_simulation(fieldset, pset_mode, mode):
@@ -417,6 +457,92 @@ def test_pset_multi_execute_delete(fieldset, pset_mode, mode, npart=10, n=5):
     assert np.allclose([p.lat - n*0.1 for p in pset], np.zeros(npart - n), rtol=1e-12)
 
 
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+@pytest.mark.parametrize('repeatdt', [None, 2])
+def test_pset_execute_workers(fieldset, mode, repeatdt, tmpdir, npart=10, n=3):
+    filepath = tmpdir.join("pfile_workers.nc")
+
+    class IncrParticle(ptype[mode]):
+        count = Variable('count', dtype=np.int32, initial=0, to_write='once')
+
+    def AddLat(particle, fieldset, time):
+        particle.lat += 0.1
+        particle.count += 1
+
+    lon = np.linspace(0, 1, npart)
+    pset = ParticleSetSOA(fieldset, pclass=IncrParticle, lon=lon, lat=np.zeros(npart), repeatdt=repeatdt)
+    pfile = pset.ParticleFile(filepath, outputdt=1)
+    for _ in range(n):
+        pset.execute(AddLat, runtime=2., dt=1.0, output_file=pfile, workers=3)
+    pfile.close()
+
+    nrepeat = 0 if repeatdt is None else 2*n // repeatdt
+    assert len(pset) == npart * (1 + nrepeat)
+    assert len(np.unique(pset.id)) == len(pset)
+    first = np.argsort(pset.id)[:npart]  # the particles of the first release
+    assert np.allclose(pset.lat[first], 2*n*0.1, rtol=1e-5)
+    assert np.allclose(pset.lon[first], lon)
+    assert np.all(pset.count[first] == 2*n)
+
+    ncfile = Dataset(filepath, 'r', 'NETCDF4')
+    assert ncfile.variables['lat'].shape == (len(pset), 2*n + 1)
+    assert np.allclose(ncfile.variables['lat'][:npart, :], np.arange(2*n + 1)*0.1, rtol=1e-5)
+    assert np.all(ncfile.variables['count'][:npart] == 0)
+    ncfile.close()
+
+
+@pytest.mark.parametrize('mode', ['scipy', 'jit'])
+def test_ensemble_execute(mode, tmpdir, tdim=10):
+    filename = tmpdir.join("ensemble_deferredload.nc")
+    data = np.zeros((tdim, 2, 2))
+    for ti in range(tdim):
+        data[ti, :, :] = ti
+    ds = xr.Dataset({"U": (("t", "y", "x"), data), "V": (("t", "y", "x"), data)},
+                    coords={"x": [0, 1], "y": [0, 1], "t": np.arange(tdim)})
+    ds.to_netcdf(filename)
+    fieldset = FieldSet.from_netcdf(filename, {'U': 'U', 'V': 'V'}, {'lon': 'x', 'lat': 'y', 'time': 't'},
+                                    deferred_load=True, mesh='flat')
+
+    nreads = [0]
+    computeTimeChunk = fieldset.U.computeTimeChunk
+
+    def counting_computeTimeChunk(data, tindex):
+        nreads[0] += 1
+        return computeTimeChunk(data, tindex)
+    fieldset.U.computeTimeChunk = counting_computeTimeChunk
+
+    class SamplingParticle(ptype[mode]):
+        p = Variable('p')
+
+    def SampleU(particle, fieldset, time):
+        particle.p = fieldset.U[particle]
+
+    def CountSteps(particle, fieldset, time):
+        particle.p += 1
+
+    def MoveEast(particle, fieldset, time):
+        particle.lon += 0.01
+
+    ensemble = Ensemble()
+    psets = [ParticleSetSOA(fieldset, SamplingParticle, lon=0.5, lat=0.5, time=0),
+             ParticleSetSOA(fieldset, SamplingParticle, lon=[0.2, 0.8], lat=[0.5, 0.5], time=[3, 3]),
+             ParticleSetSOA(fieldset, ptype[mode], lon=0.5, lat=0.5, time=0)]
+    pfile = psets[1].ParticleFile(tmpdir.join("ensemble_member.nc"), outputdt=1)
+    ensemble.add(psets[0], SampleU)
+    ensemble.add(psets[1], CountSteps, output_file=pfile)
+    ensemble.add(psets[2], MoveEast)
+    ensemble.execute(endtime=tdim-2, dt=1)
+    pfile.close()
+
+    assert nreads[0] == tdim - 1  # every snapshot up to endtime+1 is read once
+    assert np.allclose(psets[0].p, tdim-3) and np.allclose(psets[0].time, tdim-2)
+    assert np.allclose(psets[1].p, tdim-5) and np.allclose(psets[1].time, tdim-2)
+    assert np.allclose(psets[2].lon, 0.5 + (tdim-2)*0.01)
+    ncfile = Dataset(tmpdir.join("ensemble_member.nc"), 'r', 'NETCDF4')
+    assert ncfile.variables['time'].shape == (2, tdim-4)
+    ncfile.close()
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('mode', ['scipy', 'jit'])
 @pytest.mark.parametrize('area_scale', [True, False])
@@ -434,6 +560,42 @@ def test_density(fieldset, pset_mode, mode, area_scale):
             assert np.allclose(fieldset.U.lat[inds[0][i]], pset[i].lat, atol=fieldset.U.lat[1]-fieldset.U.lat[0])
 
 
+@pytest.mark.parametrize('pset_mode', pset_modes)
+@pytest.mark.parametrize('curvilinear', [False, True])
+def test_density_weights_timebins(pset_mode, curvilinear, xdim=40, ydim=100):
+    lon = np.linspace(0, 1, xdim, dtype=np.float32)
+    lat = np.linspace(-60, 60, ydim, dtype=np.float32)
+    if curvilinear:
+        lon, lat = np.meshgrid(lon, lat)
+    fieldset = FieldSet.from_data({'U': np.zeros((ydim, xdim), dtype=np.float32), 'V': np.zeros((ydim, xdim), dtype=np.float32)},
+                                  {'lon': lon, 'lat': lat}, mesh='flat')
+
+    class WeightParticle(JITParticle):
+        mass = Variable('mass', dtype=np.float32)
+
+    lons = np.array([0.01, 0.01, 0.5, 0.99, 2.])
+    lats = np.array([-59.9, -59.9, 0.1, 59.9, 0.])
+    pset = pset_type[pset_mode]['pset'](fieldset, pclass=WeightParticle, lon=lons, lat=lats, mass=[1, 2, 3, 4, 5], time=[0, 0, 10, 10, 10])
+
+    count, mass = pset.density(particle_val=[None, 'mass'])
+    assert pset.kernel is None  # density does not compile and execute a kernel
+    assert count.shape == (ydim, xdim)
+    assert count.sum() == 4  # the last particle is outside the grid
+    assert count[0, 0] == 2 and mass[0, 0] == 3
+    assert mass[ydim//2 - 1, xdim//2 - 1] == 3 and mass[-2, -2] == 4
+
+    assert pset.density(particle_val=[None]).shape == (1, ydim, xdim)
+    assert np.all(pset.density(particle_val=[None, None]) == count)
+    assert np.all(pset.density(particle_val=[1, 2, 3, 4, 5]) == mass)  # one weight per particle
+    weighted = pset.density(particle_val=[[1, 2, 3, 4, 5], [1, 1, 1, 1, 1], np.zeros(5)])
+    assert weighted.shape == (3, ydim, xdim)
+    assert np.all(weighted[0] == mass) and np.all(weighted[1] == count) and np.all(weighted[2] == 0)
+
+    binned = pset.density(particle_val='mass', relative=True, time_bins=[0, 5, 15])
+    assert binned.shape == (2, ydim, xdim)
+    assert np.isclose(binned[0, 0, 0], 1) and np.isclose(binned[1].sum(), 1)
+
+
 @pytest.mark.parametrize('pset_mode', pset_modes)
 @pytest.mark.parametrize('staggered_grid', ['Agrid', 'Cgrid'])
 def test_from_field_exact_val(pset_mode, staggered_grid):